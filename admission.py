@@ -0,0 +1,98 @@
+"""
+Admission control for generation requests that would go upstream
+
+Work is admitted while the number of upstream-bound generations stays under
+a cap and the scheduler's queue delay stays under a target. The delay is
+CoDel-style: the smallest wait granted during the last interval (a standing
+queue, not a burst), or the age of the oldest waiter when nothing is being
+granted at all. Past either limit new work is shed or degraded to the
+fallback, per policy, so latency stays bounded instead of growing with load.
+"""
+import logging
+import math
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SHED = "shed"
+FALLBACK = "fallback"
+POLICIES = (SHED, FALLBACK)
+
+class AdmissionController:
+    """Decides whether a new upstream-bound generation may start"""
+
+    def __init__(self, max_in_flight: int = 64, max_queue_delay: float = 5.0, policy: str = FALLBACK,
+                 interval: float = 1.0, oldest_wait: Optional[Callable[[], float]] = None,
+                 retry_after: float = 5.0):
+        if policy not in POLICIES:
+            logger.warning(f"⚠️ Unknown admission policy '{policy}', using '{FALLBACK}'")
+            policy = FALLBACK
+        self.max_in_flight = max_in_flight
+        self.max_queue_delay = max_queue_delay
+        self.policy = policy
+        self.interval = interval
+        self.oldest_wait = oldest_wait or (lambda: 0.0)
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._window_start = time.monotonic()
+        self._window_min: Optional[float] = None
+        self._standing_delay = 0.0
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {"in_flight": 0, "queue_delay": 0}
+
+    def observe_wait(self, seconds: float) -> None:
+        """Feed the queue wait of every granted upstream call"""
+        self._roll(time.monotonic())
+        if self._window_min is None or seconds < self._window_min:
+            self._window_min = seconds
+
+    def _roll(self, now: float) -> None:
+        if now - self._window_start < self.interval:
+            return
+        # A window without grants (or long past) keeps no standing delay; the oldest waiter covers a stalled queue
+        stale = now - self._window_start >= 2 * self.interval
+        self._standing_delay = 0.0 if stale else self._window_min or 0.0
+        self._window_min = None
+        self._window_start = now
+
+    def queue_delay(self) -> float:
+        self._roll(time.monotonic())
+        return max(self._standing_delay, self.oldest_wait())
+
+    def check(self) -> Optional[str]:
+        """None to admit, otherwise the reason the request is over the limit"""
+        if self.in_flight >= self.max_in_flight:
+            reason = "in_flight"
+        elif self.queue_delay() > self.max_queue_delay:
+            reason = "queue_delay"
+        else:
+            return None
+        self.rejected[reason] += 1
+        return reason
+
+    def retry_after_seconds(self) -> int:
+        """Retry-After hint for shed requests: roughly how long the queue needs to drain"""
+        return max(1, math.ceil(max(self.retry_after, self.queue_delay())))
+
+    @contextmanager
+    def track(self):
+        """Count an admitted generation for as long as it runs"""
+        self.in_flight += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "policy": self.policy,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_delay": round(self.queue_delay(), 3),
+            "max_queue_delay": self.max_queue_delay,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected)
+        }
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the per-IP rate limiter
+
+Compares the token-bucket limiter against the previous per-IP timestamp-list
+approach: time per check and number of keys retained after idle clients leave.
+
+Usage: python3 benchmarks/bench_rate_limiter.py [--ops 200000] [--clients 5000]
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import TokenBucketLimiter  # noqa: E402
+
+def legacy_check(store: dict, client_ip: str, limit: int) -> bool:
+    """The original list-of-timestamps limiter, kept here for comparison"""
+    now = time.time()
+    minute_ago = now - 60
+    store[client_ip] = [t for t in store[client_ip] if t > minute_ago]
+    if len(store[client_ip]) >= limit:
+        return False
+    store[client_ip].append(now)
+    return True
+
+def bench(name: str, check, keys: list, ops: int) -> float:
+    start = time.perf_counter()
+    n = len(keys)
+    for i in range(ops):
+        check(keys[i % n])
+    elapsed = time.perf_counter() - start
+    print(f"{name:<14} {elapsed / ops * 1e9:>9.0f} ns/check   {ops / elapsed:>12,.0f} checks/s")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate limiter microbenchmark")
+    parser.add_argument("--ops", type=int, default=200000)
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=60)
+    args = parser.parse_args()
+
+    keys = [f"10.0.{i // 256}.{i % 256}" for i in range(args.clients)]
+    hot_keys = keys[:10]
+
+    print(f"🧪 Rate limiter microbenchmark ({args.ops:,} checks, {args.clients:,} clients)")
+    print("=" * 60)
+
+    # Many clients, each well under the limit
+    legacy_store = defaultdict(list)
+    bench("legacy/many", lambda k: legacy_check(legacy_store, k, args.limit), keys, args.ops)
+    bucket = TokenBucketLimiter(args.limit)
+    bench("bucket/many", lambda k: bucket.allow(k), keys, args.ops)
+
+    # A few hot clients sitting at the limit (legacy rebuilds a full list each time)
+    legacy_store = defaultdict(list)
+    bench("legacy/hot", lambda k: legacy_check(legacy_store, k, args.limit), hot_keys, args.ops)
+    bucket = TokenBucketLimiter(args.limit)
+    bench("bucket/hot", lambda k: bucket.allow(k), hot_keys, args.ops)
+
+    # Idle-key retention: legacy never drops keys, bucket evicts after idle_ttl
+    legacy_store = defaultdict(list)
+    bucket = TokenBucketLimiter(args.limit, idle_ttl=0.05)
+    for k in keys:
+        legacy_check(legacy_store, k, args.limit)
+        bucket.allow(k)
+    time.sleep(0.1)
+    legacy_check(legacy_store, "late-client", args.limit)
+    bucket.allow("late-client")
+    print("=" * 60)
+    print(f"Retained keys after idle period: legacy={len(legacy_store)} bucket={bucket.stats()['tracked_keys']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Local Groq/OpenAI-compatible stub server for offline benchmarks
+
+Serves /openai/v1/chat/completions (plain and stream=true) and /openai/v1/models
+with a configurable latency distribution plus injected 5xx errors and 429s,
+so the app can be load-tested without touching api.groq.com.
+
+Usage: python3 benchmarks/groq_stub.py [--port 9100] [--latency-median 0.8]
+       [--latency-sigma 0.4] [--error-rate 0.0] [--throttle-rate 0.0]
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+MODELS = ["llama-3.3-70b-versatile", "llama-3.1-8b-instant", "whisper-large-v3"]
+
+app = FastAPI(title="Groq stub", docs_url=None, redoc_url=None)
+app.state.options = argparse.Namespace(
+    latency_median=0.8, latency_sigma=0.4, latency_max=30.0, error_rate=0.0,
+    throttle_rate=0.0, retry_after=2, tokens_per_second=400.0, seed=None
+)
+app.state.counters = {"requests": 0, "errors": 0, "throttled": 0, "streams": 0}
+
+def sample_latency(options) -> float:
+    """Log-normal latency around the configured median, capped at latency_max"""
+    if options.latency_median <= 0:
+        return 0.0
+    value = options.latency_median * math.exp(random.gauss(0.0, options.latency_sigma))
+    return min(value, options.latency_max)
+
+def fake_ideas(num_ideas: int, model: str) -> str:
+    """Deterministic-looking numbered ideas in the format the app parses"""
+    ideas = []
+    for i in range(1, num_ideas + 1):
+        ideas.append(
+            f"{i}. **Stub Thesis Idea {i}**\n"
+            f"This thesis examines benchmark scenario {i} served by {model}. "
+            "It argues that measurable latency targets improve system design, "
+            "and evaluates the claim with reproducible load tests."
+        )
+    return "\n\n".join(ideas)
+
+def requested_ideas(payload: dict) -> int:
+    """Recover the idea count from max_tokens (base + per-idea budget in the app)"""
+    max_tokens = int(payload.get("max_tokens") or 500)
+    return max(1, min(10, round((max_tokens - 150) / 350)))
+
+def injected_failure(options) -> Optional[Response]:
+    """A 429 or 5xx response when the dice say so, otherwise None"""
+    roll = random.random()
+    if roll < options.throttle_rate:
+        app.state.counters["throttled"] += 1
+        return JSONResponse(
+            status_code=429,
+            content={"error": {"message": "Rate limit reached (stub)", "type": "rate_limit_exceeded"}},
+            headers={"Retry-After": str(options.retry_after)}
+        )
+    if roll < options.throttle_rate + options.error_rate:
+        app.state.counters["errors"] += 1
+        return JSONResponse(status_code=503, content={"error": {"message": "Service unavailable (stub)"}})
+    return None
+
+@app.api_route("/openai/v1/models", methods=["GET", "HEAD"])
+async def list_models():
+    return {"object": "list", "data": [{"id": model, "object": "model", "owned_by": "stub"} for model in MODELS]}
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    options = app.state.options
+    app.state.counters["requests"] += 1
+    payload = await request.json()
+    model = payload.get("model", MODELS[0])
+
+    failure = injected_failure(options)
+    latency = sample_latency(options)
+    if failure is not None:
+        await asyncio.sleep(min(latency, 0.05))
+        return failure
+
+    content = fake_ideas(requested_ideas(payload), model)
+    prompt_tokens = sum(len(message.get("content", "")) // 4 for message in payload.get("messages", []))
+    completion_tokens = len(content) // 4
+    usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+             "total_tokens": prompt_tokens + completion_tokens}
+    created = int(time.time())
+
+    if not payload.get("stream"):
+        await asyncio.sleep(latency)
+        return {
+            "id": f"chatcmpl-stub-{created}",
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage
+        }
+
+    app.state.counters["streams"] += 1
+
+    async def events():
+        # Time to first token is a fraction of the sampled latency; the rest is paced by tokens_per_second
+        await asyncio.sleep(latency * 0.3)
+        words = content.split(" ")
+        delay = 4.0 / options.tokens_per_second if options.tokens_per_second > 0 else 0.0
+        for i, word in enumerate(words):
+            piece = word if i == 0 else " " + word
+            chunk = {"id": f"chatcmpl-stub-{created}", "object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+            if delay:
+                await asyncio.sleep(delay)
+        final = {"id": f"chatcmpl-stub-{created}", "object": "chat.completion.chunk", "model": model,
+                 "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "x_groq": {"usage": usage}}
+        yield f"data: {json.dumps(final)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.get("/stub/stats")
+async def stub_stats():
+    return app.state.counters
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Groq-compatible stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-median", type=float, default=0.8, help="Median completion latency (seconds)")
+    parser.add_argument("--latency-sigma", type=float, default=0.4, help="Log-normal spread (0 = fixed latency)")
+    parser.add_argument("--latency-max", type=float, default=30.0, help="Cap on sampled latency (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of completions answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of completions answered with 429")
+    parser.add_argument("--retry-after", type=int, default=2, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0, help="Streaming pace")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser
+
+def main():
+    options = build_parser().parse_args()
+    if options.seed is not None:
+        random.seed(options.seed)
+    app.state.options = options
+    print(f"🧪 Groq stub on http://{options.host}:{options.port}/openai/v1 "
+          f"(median {options.latency_median}s, errors {options.error_rate:.0%}, 429s {options.throttle_rate:.0%})")
+    uvicorn.run(app, host=options.host, port=options.port, log_level="warning", access_log=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Offline load test for the app against the local Groq stub
+
+Starts benchmarks/groq_stub.py and the app (uvicorn main:app) with
+GROQ_BASE_URL pointed at the stub, drives each scenario at the given
+concurrency, and reports p50/p95/p99 latency and throughput. Results are
+written as JSON; pass --baseline to compare against an earlier run.
+
+Usage: python3 benchmarks/load_test.py [--concurrency 16] [--requests 200]
+       [--scenarios generate,index,static,models,health] [--save results.json]
+       [--baseline benchmarks/results/baseline.json] [--fail-on-regression]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+FIELDS = ["machine learning", "marine biology", "urban planning", "medieval history", "behavioral economics"]
+THESIS_TYPES = ["argumentative", "analytical", "expository", "comparative"]
+TONES = ["academic", "persuasive", "neutral", "critical"]
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(p * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def generate_form(i: int, unique_ratio: float, scenario: str) -> dict:
+    """Form data for request i; a unique_ratio share of requests miss the result cache"""
+    unique = (i % 100) < unique_ratio * 100
+    return {
+        "field_of_study": f"{scenario} benchmark topic {i}" if unique else FIELDS[i % len(FIELDS)],
+        "num_ideas": str(1 + i % 3),
+        "thesis_type": THESIS_TYPES[i % len(THESIS_TYPES)],
+        "tone": TONES[i % len(TONES)]
+    }
+
+def build_scenarios(args) -> Dict[str, Callable[[httpx.AsyncClient, int], Awaitable[dict]]]:
+    """Scenario name -> coroutine issuing request i and returning {status, ...}"""
+
+    async def generate(client: httpx.AsyncClient, i: int) -> dict:
+        response = await client.post("/generate", data=generate_form(i, args.unique_ratio, "generate"))
+        fallback = response.status_code == 200 and "Fallback" in response.json().get("api_used", "")
+        return {"status": response.status_code, "fallback": fallback, "cache": response.headers.get("x-cache")}
+
+    async def stream(client: httpx.AsyncClient, i: int) -> dict:
+        started = time.perf_counter()
+        first_byte = None
+        body = []
+        form = generate_form(i, args.unique_ratio, "stream")
+        async with client.stream("POST", "/generate/stream", data=form) as response:
+            async for chunk in response.aiter_bytes():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started
+                body.append(chunk)
+        fallback = b"Fallback" in b"".join(body)
+        return {"status": response.status_code, "ttfb": first_byte, "fallback": fallback}
+
+    def simple_get(path: str):
+        async def get(client: httpx.AsyncClient, i: int) -> dict:
+            response = await client.get(path)
+            return {"status": response.status_code}
+        return get
+
+    return {
+        "generate": generate,
+        "stream": stream,
+        "index": simple_get("/"),
+        "static": simple_get("/static/styles.css"),
+        "models": simple_get("/models"),
+        "health": simple_get("/health")
+    }
+
+async def run_scenario(client: httpx.AsyncClient, name: str, request_fn, total: int, concurrency: int) -> dict:
+    """Issue total requests with at most concurrency in flight; summarize latencies"""
+    latencies: List[float] = []
+    ttfbs: List[float] = []
+    statuses: Dict[str, int] = {}
+    fallbacks = 0
+    failures = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, fallbacks, failures
+        while next_index < total:
+            i = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                outcome = await request_fn(client, i)
+            except httpx.HTTPError as e:
+                outcome = {"status": type(e).__name__}
+            latencies.append(time.perf_counter() - started)
+            status = str(outcome["status"])
+            statuses[status] = statuses.get(status, 0) + 1
+            if not status.startswith("2") and status != "304":
+                failures += 1
+            if outcome.get("fallback"):
+                fallbacks += 1
+            if outcome.get("ttfb") is not None:
+                ttfbs.append(outcome["ttfb"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    summary = {
+        "requests": total,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2) if ordered else 0.0,
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        "error_rate": round(failures / total, 4) if total else 0.0,
+        "fallback_rate": round(fallbacks / total, 4) if total else 0.0,
+        "statuses": statuses
+    }
+    if ttfbs:
+        ttfbs.sort()
+        summary["ttfb_p50_ms"] = round(percentile(ttfbs, 0.50) * 1000, 2)
+        summary["ttfb_p95_ms"] = round(percentile(ttfbs, 0.95) * 1000, 2)
+    print(
+        f"{name:<10} {summary['rps']:>9.1f} req/s   p50 {summary['p50_ms']:>8.1f} ms   "
+        f"p95 {summary['p95_ms']:>8.1f} ms   p99 {summary['p99_ms']:>8.1f} ms   "
+        f"errors {summary['error_rate']:.1%}   fallback {summary['fallback_rate']:.1%}"
+    )
+    return summary
+
+def start_process(command: List[str], env: Optional[dict] = None) -> subprocess.Popen:
+    # Logs go to a file: the app logs every request, which would fill (and block) a pipe
+    log = tempfile.NamedTemporaryFile(prefix="thesis-bench-", suffix=".log", delete=False)
+    process = subprocess.Popen(command, cwd=REPO_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    process.log_path = log.name
+    return process
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 20.0) -> None:
+    """Poll url until it answers; fail early if the process died"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            with open(process.log_path, errors="replace") as f:
+                raise RuntimeError(f"{url} exited early: {f.read()[-2000:]}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+def stop_process(process: Optional[subprocess.Popen]) -> None:
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """Print per-scenario deltas; return the regressions beyond threshold"""
+    regressions = []
+    print(f"\n📏 Compared with baseline {baseline.get('meta', {}).get('revision') or ''} "
+          f"({baseline.get('meta', {}).get('timestamp', 'unknown time')})")
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            print(f"{name:<10} (no baseline)")
+            continue
+        deltas = []
+        for metric, higher_is_worse in (("p50_ms", True), ("p95_ms", True), ("p99_ms", True), ("rps", False)):
+            old, new = before.get(metric, 0.0), result.get(metric, 0.0)
+            change = (new - old) / old if old else 0.0
+            worse = change > threshold if higher_is_worse else change < -threshold
+            deltas.append(f"{metric} {change:+.1%}{' ⚠️' if worse else ''}")
+            if worse and metric in ("p95_ms", "rps"):
+                regressions.append(f"{name} {metric}: {old} -> {new}")
+        print(f"{name:<10} " + "   ".join(deltas))
+    return regressions
+
+async def run(args) -> dict:
+    scenarios = build_scenarios(args)
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in scenarios]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)} (choose from {', '.join(scenarios)})")
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.app_url, limits=limits, timeout=120.0) as client:
+        results = {}
+        for name in selected:
+            # A short warm-up so connection setup and first-hit caches don't skew the numbers
+            await run_scenario_quietly(client, scenarios[name], min(args.warmup, args.requests), args.concurrency)
+            results[name] = await run_scenario(client, name, scenarios[name], args.requests, args.concurrency)
+        return results
+
+async def run_scenario_quietly(client: httpx.AsyncClient, request_fn, total: int, concurrency: int) -> None:
+    async def one(i: int):
+        try:
+            await request_fn(client, 1_000_000 + i)
+        except httpx.HTTPError:
+            pass
+    for start in range(0, total, concurrency):
+        await asyncio.gather(*(one(i) for i in range(start, min(total, start + concurrency))))
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test against a local Groq stub")
+    parser.add_argument("--scenarios", default="generate,index,static,models,health",
+                        help="Comma-separated: generate, stream, index, static, models, health")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests before each scenario")
+    parser.add_argument("--unique-ratio", type=float, default=1.0,
+                        help="Share of /generate requests with a unique topic (cache misses)")
+    parser.add_argument("--app-url", default=None, help="Use an already running app instead of starting one")
+    parser.add_argument("--app-port", type=int, default=8101)
+    parser.add_argument("--workers", type=int, default=1, help="WEB_CONCURRENCY for the started app")
+    parser.add_argument("--stub-port", type=int, default=9101)
+    parser.add_argument("--latency-median", type=float, default=0.2, help="Stub completion latency median (s)")
+    parser.add_argument("--latency-sigma", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Stub 503 rate")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Stub 429 rate")
+    parser.add_argument("--save", default=os.path.join(BENCH_DIR, "results", "latest.json"))
+    parser.add_argument("--baseline", default=None, help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    stub = app = None
+    try:
+        if args.app_url is None:
+            stub = start_process([
+                sys.executable, os.path.join(BENCH_DIR, "groq_stub.py"),
+                "--port", str(args.stub_port),
+                "--latency-median", str(args.latency_median),
+                "--latency-sigma", str(args.latency_sigma),
+                "--error-rate", str(args.error_rate),
+                "--throttle-rate", str(args.throttle_rate)
+            ])
+            wait_until_ready(f"http://127.0.0.1:{args.stub_port}/openai/v1/models", stub)
+
+            # Benchmark state and idea history stay out of the real databases
+            data_dir = tempfile.mkdtemp(prefix="thesis-bench-")
+            env = {
+                **os.environ,
+                "GROQ_BASE_URL": f"http://127.0.0.1:{args.stub_port}/openai/v1",
+                # Never send a real key anywhere during benchmarks
+                "GROQ_API_KEY": "stub-key",
+                "MAX_REQUESTS_PER_MINUTE": "100000000",
+                # The stub has no account limits; keep the scheduler's concurrency cap but not its budgets
+                "GROQ_REQUESTS_PER_MINUTE": os.environ.get("GROQ_REQUESTS_PER_MINUTE", "0"),
+                "GROQ_TOKENS_PER_MINUTE": os.environ.get("GROQ_TOKENS_PER_MINUTE", "0"),
+                "WEB_CONCURRENCY": str(args.workers),
+                "STATE_DB_PATH": os.path.join(data_dir, "state.sqlite3"),
+                "HISTORY_DB_PATH": os.path.join(data_dir, "history.sqlite3")
+            }
+            app = start_process([
+                sys.executable, "-m", "uvicorn", "main:app",
+                "--host", "127.0.0.1", "--port", str(args.app_port),
+                "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"
+            ], env=env)
+            args.app_url = f"http://127.0.0.1:{args.app_port}"
+            wait_until_ready(f"{args.app_url}/health", app)
+
+        print(f"🏁 Load test: {args.requests} requests/scenario at concurrency {args.concurrency} against {args.app_url}")
+        print("=" * 100)
+        scenarios = asyncio.run(run(args))
+    finally:
+        stop_process(app)
+        stop_process(stub)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "revision": git_revision(),
+            "python": sys.version.split()[0],
+            "options": {key: value for key, value in vars(args).items() if key not in ("save", "baseline")}
+        },
+        "scenarios": scenarios
+    }
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results saved to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            print("\n❌ Regressions: " + "; ".join(regressions))
+            if args.fail_on_regression:
+                sys.exit(1)
+        else:
+            print("\n✅ No regressions beyond threshold")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Circuit breaker and adaptive timeouts for upstream Groq calls
+"""
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets a probe through after recovery_timeout"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self.short_circuited = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        now = time.monotonic()
+        if self._state == OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+            self._opened_at = now
+            logger.info(f"🔌 Circuit '{self.name}' half-open, probing upstream")
+        elif self._state == HALF_OPEN and now - self._opened_at >= self.recovery_timeout:
+            # A probe that never reported back (e.g. cancelled) must not wedge the breaker
+            self._half_open_calls = 0
+            self._opened_at = now
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a call may go upstream now"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return True
+        self.short_circuited += 1
+        return False
+
+    def record_success(self) -> None:
+        if self._state != CLOSED:
+            logger.info(f"✅ Circuit '{self.name}' closed, upstream recovered")
+        self._state = CLOSED
+        self._consecutive_failures = 0
+
+    def record_cancelled(self) -> None:
+        """A call that was abandoned says nothing about upstream health; free its probe slot"""
+        if self._state == HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self._state != OPEN:
+                self.times_opened += 1
+                logger.error(f"❌ Circuit '{self.name}' opened after {self._consecutive_failures} failures")
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited
+        }
+
+class LatencyTracker:
+    """Recent upstream latencies, used to derive a timeout from an observed percentile"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, p: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(p * len(ordered)))
+        return ordered[index]
+
+    def adaptive_timeout(self, percentile: float, multiplier: float, minimum: float,
+                         maximum: float, min_samples: int) -> float:
+        """multiplier x observed percentile, clamped; the maximum until enough samples exist"""
+        if len(self._samples) < min_samples:
+            return maximum
+        return max(minimum, min(maximum, self.percentile(percentile) * multiplier))
+
+    def stats(self) -> dict:
+        return {
+            "samples": len(self._samples),
+            "p50": round(self.percentile(0.50), 3),
+            "p95": round(self.percentile(0.95), 3),
+            "p99": round(self.percentile(0.99), 3)
+        }
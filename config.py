@@ -2,6 +2,7 @@
 Production configuration for Thesis Brainstorming Tool
 """
 import os
+import tempfile
 from typing import List, Optional
 
 class Settings:
@@ -18,12 +19,128 @@ class Settings:
     
     # API Configuration
     GROQ_API_KEY: Optional[str] = os.getenv("GROQ_API_KEY")
-    GROQ_BASE_URL: str = "https://api.groq.com/openai/v1"
+    GROQ_BASE_URL: str = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1").rstrip("/")
     DEFAULT_MODEL: str = "llama-3.3-70b-versatile"
     
     # Rate Limiting
     MAX_REQUESTS_PER_MINUTE: int = int(os.getenv("MAX_REQUESTS_PER_MINUTE", "10"))
     REQUEST_TIMEOUT: int = int(os.getenv("REQUEST_TIMEOUT", "30"))
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", "0"))  # 0 = same as per-minute limit
+    RATE_LIMIT_LIGHT_COST: float = float(os.getenv("RATE_LIMIT_LIGHT_COST", "0.2"))
+    RATE_LIMIT_IDLE_TTL: float = float(os.getenv("RATE_LIMIT_IDLE_TTL", "300"))
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+    # Upstream HTTP client (shared, pooled connection to Groq)
+    UPSTREAM_MAX_CONNECTIONS: int = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "20"))
+    UPSTREAM_MAX_KEEPALIVE: int = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "10"))
+    UPSTREAM_KEEPALIVE_EXPIRY: float = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "60"))
+    UPSTREAM_CONNECT_TIMEOUT: float = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "5"))
+    UPSTREAM_READ_TIMEOUT: float = float(os.getenv("UPSTREAM_READ_TIMEOUT", os.getenv("REQUEST_TIMEOUT", "30")))
+    UPSTREAM_HTTP2: bool = os.getenv("UPSTREAM_HTTP2", "false").lower() in ("1", "true", "yes")
+    UPSTREAM_PREWARM_CONNECTIONS: int = int(os.getenv("UPSTREAM_PREWARM_CONNECTIONS", "2"))
+
+    # Fair-share upstream scheduler: Groq account limits (0 disables a budget), split across workers
+    UPSTREAM_MAX_CONCURRENCY: int = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "8"))
+    GROQ_REQUESTS_PER_MINUTE: float = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+    GROQ_TOKENS_PER_MINUTE: float = float(os.getenv("GROQ_TOKENS_PER_MINUTE", "12000"))
+    SCHEDULER_BACKOFF_JITTER: float = float(os.getenv("SCHEDULER_BACKOFF_JITTER", "0.25"))
+    SCHEDULER_MAX_RETRY_WAIT: float = float(os.getenv("SCHEDULER_MAX_RETRY_WAIT", "10"))
+    SCHEDULER_PREGEN_WEIGHT: float = float(os.getenv("SCHEDULER_PREGEN_WEIGHT", "0.25"))
+
+    # Circuit breaker, latency budget and adaptive upstream timeouts
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RECOVERY_TIMEOUT: float = float(os.getenv("CIRCUIT_RECOVERY_TIMEOUT", "30"))
+    GENERATION_LATENCY_BUDGET: float = float(os.getenv("GENERATION_LATENCY_BUDGET", "20"))
+    ADAPTIVE_TIMEOUT_PERCENTILE: float = float(os.getenv("ADAPTIVE_TIMEOUT_PERCENTILE", "0.99"))
+    ADAPTIVE_TIMEOUT_MULTIPLIER: float = float(os.getenv("ADAPTIVE_TIMEOUT_MULTIPLIER", "1.5"))
+    ADAPTIVE_TIMEOUT_MIN: float = float(os.getenv("ADAPTIVE_TIMEOUT_MIN", "5"))
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES: int = int(os.getenv("ADAPTIVE_TIMEOUT_MIN_SAMPLES", "20"))
+
+    # Model routing: honor the requested model, fail over to faster ones when it is slow or throttled
+    ROUTER_FAILOVER_MODELS: List[str] = [
+        model.strip() for model in os.getenv(
+            "ROUTER_FAILOVER_MODELS", "llama-3.3-70b-versatile,llama-3.1-8b-instant"
+        ).split(",") if model.strip()
+    ]
+    ROUTER_SLOW_LATENCY: float = float(os.getenv("ROUTER_SLOW_LATENCY", "8"))
+    ROUTER_MAX_ERROR_RATE: float = float(os.getenv("ROUTER_MAX_ERROR_RATE", "0.5"))
+    ROUTER_THROTTLE_COOLDOWN: float = float(os.getenv("ROUTER_THROTTLE_COOLDOWN", "30"))
+    ROUTER_MAX_ATTEMPTS: int = int(os.getenv("ROUTER_MAX_ATTEMPTS", "2"))
+
+    # Completion sizing: large requests run as parallel chunks of GENERATION_CHUNK_SIZE ideas (0 disables)
+    GENERATION_CHUNK_SIZE: int = int(os.getenv("GENERATION_CHUNK_SIZE", "2"))
+    COMPLETION_BASE_TOKENS: int = int(os.getenv("COMPLETION_BASE_TOKENS", "150"))
+    COMPLETION_TOKENS_PER_IDEA: int = int(os.getenv("COMPLETION_TOKENS_PER_IDEA", "350"))
+    
+    # Batch generation (/generate/batch)
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "50"))
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "4"))
+    
+    # Asynchronous jobs (/jobs): bounded worker pool, records kept in the state backend
+    JOBS_CONCURRENCY: int = int(os.getenv("JOBS_CONCURRENCY", "4"))
+    JOBS_MAX_PENDING: int = int(os.getenv("JOBS_MAX_PENDING", "100"))
+    JOBS_TTL: int = int(os.getenv("JOBS_TTL", "3600"))
+    JOBS_STALE_AFTER: float = float(os.getenv("JOBS_STALE_AFTER", "120"))
+    JOBS_POLL_INTERVAL: float = float(os.getenv("JOBS_POLL_INTERVAL", "0.5"))
+    
+    # Searchable history of generated ideas (/history/search), SQLite FTS5 shared by all workers
+    HISTORY_ENABLED: bool = os.getenv("HISTORY_ENABLED", "true").lower() in ("1", "true", "yes")
+    HISTORY_DB_PATH: str = os.getenv(
+        "HISTORY_DB_PATH",
+        os.path.join(tempfile.gettempdir(), "thesis_history.sqlite3")
+    )
+    HISTORY_MAX_ENTRIES: int = int(os.getenv("HISTORY_MAX_ENTRIES", "50000"))
+    HISTORY_MAX_AGE_DAYS: float = float(os.getenv("HISTORY_MAX_AGE_DAYS", "90"))
+    HISTORY_MAX_PAGE_SIZE: int = int(os.getenv("HISTORY_MAX_PAGE_SIZE", "50"))
+    
+    # Result cache for /generate (in-memory LRU in front of the state backend)
+    RESULT_CACHE_ENABLED: bool = os.getenv("RESULT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    RESULT_CACHE_MAX_ENTRIES: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "512"))
+    RESULT_CACHE_TTL: int = int(os.getenv("RESULT_CACHE_TTL", "3600"))
+    
+    # Upstream snapshots (/models, /check-api-status) with stale-while-revalidate
+    MODELS_CACHE_TTL: int = int(os.getenv("MODELS_CACHE_TTL", "300"))
+    MODELS_CACHE_MAX_STALE: int = int(os.getenv("MODELS_CACHE_MAX_STALE", "86400"))
+    MODELS_CACHE_ERROR_TTL: int = int(os.getenv("MODELS_CACHE_ERROR_TTL", "15"))
+    STATUS_CACHE_TTL: int = int(os.getenv("STATUS_CACHE_TTL", "30"))
+    
+    # Admission control for upstream-bound generations (per worker); "fallback" degrades, "shed" answers 503
+    ADMISSION_POLICY: str = os.getenv("ADMISSION_POLICY", "fallback").lower()
+    ADMISSION_MAX_IN_FLIGHT: int = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64"))
+    ADMISSION_MAX_QUEUE_DELAY: float = float(os.getenv("ADMISSION_MAX_QUEUE_DELAY", "5"))
+    ADMISSION_RETRY_AFTER: float = float(os.getenv("ADMISSION_RETRY_AFTER", "5"))
+    
+    # Background pre-generation for popular field/type/tone combinations, within a share of GROQ_REQUESTS_PER_MINUTE
+    PREGEN_ENABLED: bool = os.getenv("PREGEN_ENABLED", "true").lower() in ("1", "true", "yes")
+    PREGEN_BUDGET_SHARE: float = float(os.getenv("PREGEN_BUDGET_SHARE", "0.1"))
+    PREGEN_MIN_HITS: int = int(os.getenv("PREGEN_MIN_HITS", "3"))
+    PREGEN_TOP_K: int = int(os.getenv("PREGEN_TOP_K", "20"))
+    PREGEN_BATCHES_PER_KEY: int = int(os.getenv("PREGEN_BATCHES_PER_KEY", "2"))
+    PREGEN_NUM_IDEAS: int = int(os.getenv("PREGEN_NUM_IDEAS", "5"))
+    PREGEN_INTERVAL: float = float(os.getenv("PREGEN_INTERVAL", "5"))
+    PREGEN_TTL: int = int(os.getenv("PREGEN_TTL", "3600"))
+    PREGEN_WARMUP: List[str] = [  # "field" or "field/thesis_type/tone", separated by ";"
+        entry.strip() for entry in os.getenv("PREGEN_WARMUP", "").split(";") if entry.strip()
+    ]
+    
+    # Speculative prefetch of the next "Generate New Ideas" batch, one per browser session
+    PREFETCH_ENABLED: bool = os.getenv("PREFETCH_ENABLED", "true").lower() in ("1", "true", "yes")
+    PREFETCH_BUDGET_SHARE: float = float(os.getenv("PREFETCH_BUDGET_SHARE", "0.2"))
+    PREFETCH_TTL: float = float(os.getenv("PREFETCH_TTL", "600"))
+    PREFETCH_MAX_SESSIONS: int = int(os.getenv("PREFETCH_MAX_SESSIONS", "1000"))
+    
+    # Multi-worker serving and shared state ("sqlite" is shared by all workers, "memory" is per process)
+    WORKERS: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    STATE_BACKEND: str = os.getenv("STATE_BACKEND", "sqlite").lower()
+    STATE_DB_PATH: str = os.getenv(
+        "STATE_DB_PATH",
+        os.path.join(tempfile.gettempdir(), "thesis_state.sqlite3")
+    )
+    # Shared buckets only help when the backend is shared; in process memory the per-IP LRU limiter is the bounded one
+    SHARED_RATE_LIMIT: bool = os.getenv(
+        "SHARED_RATE_LIMIT",
+        "true" if int(os.getenv("WEB_CONCURRENCY", "1")) > 1 and STATE_BACKEND == "sqlite" else "false"
+    ).lower() in ("1", "true", "yes")
     
     # Security
     ALLOWED_ORIGINS: List[str] = (
@@ -0,0 +1,632 @@
+"""
+Idea corpus for the offline fallback engine
+
+Each field lists related keywords (used for matching free-text fields of study)
+and thesis titles per thesis type.
+"""
+
+FIELDS = {
+    "machine learning": {
+        "keywords": "artificial intelligence ai deep learning neural networks data science nlp computer vision",
+        "argumentative": [
+            "Federated Learning Privacy-Preservation is Essential for Healthcare AI Adoption",
+            "Explainable AI Should Be Mandatory for Financial Decision-Making Systems",
+            "Quantum Machine Learning Will Revolutionize Drug Discovery Processes",
+            "Large Language Models Should Be Licensed Before Deployment in Public Services"
+        ],
+        "analytical": [
+            "Decomposing the Impact of Bias in Facial Recognition Systems Across Demographics",
+            "Analyzing the Convergence Properties of Neural Architecture Search Algorithms",
+            "Examining the Trade-offs Between Model Accuracy and Computational Efficiency in Edge AI",
+            "Analyzing Data Drift as a Cause of Silent Failure in Production Machine Learning Models"
+        ],
+        "expository": [
+            "Understanding the Mathematical Foundations of Transformer Architecture",
+            "Exploring the Evolution of Reinforcement Learning from Q-Learning to Deep RL",
+            "Illuminating the Role of Attention Mechanisms in Natural Language Processing",
+            "Explaining How Diffusion Models Generate Images from Noise"
+        ],
+        "comparative": [
+            "Comparing Supervised vs. Unsupervised Learning Approaches for Anomaly Detection",
+            "Contrasting Classical Optimization with Evolutionary Algorithms in Neural Network Training",
+            "Evaluating Centralized vs. Decentralized Learning in Multi-Agent Systems",
+            "Comparing Fine-Tuning and Retrieval Augmentation for Domain-Specific Language Models"
+        ]
+    },
+    "computer science": {
+        "keywords": "software engineering programming algorithms distributed systems databases networking cloud computing",
+        "argumentative": [
+            "Blockchain Technology is Overhyped and Unsuitable for Most Enterprise Applications",
+            "Open Source Software Development Models Produce Higher Quality Code Than Proprietary Methods",
+            "Quantum Computing Will Make Current Cryptographic Standards Obsolete Within a Decade",
+            "Memory-Safe Languages Should Replace C and C++ in Critical Infrastructure Software"
+        ],
+        "analytical": [
+            "Analyzing the Scalability Bottlenecks in Distributed Database Systems",
+            "Examining the Security Vulnerabilities in Internet of Things (IoT) Networks",
+            "Decomposing the Performance Trade-offs in Microservices Architecture",
+            "Analyzing Tail Latency Amplification in Fan-Out Cloud Services"
+        ],
+        "expository": [
+            "Understanding the Principles of Distributed Consensus Algorithms",
+            "Exploring the Evolution of Programming Paradigms from Procedural to Functional",
+            "Illuminating the Role of Compilers in Modern Software Development",
+            "Explaining How Garbage Collectors Balance Throughput and Pause Times"
+        ],
+        "comparative": [
+            "Comparing SQL vs. NoSQL Database Performance in Big Data Applications",
+            "Contrasting Agile vs. Waterfall Methodologies in Large-Scale Software Projects",
+            "Evaluating Cloud vs. Edge Computing for Real-Time Data Processing",
+            "Comparing Static and Dynamic Typing Effects on Long-Term Code Maintainability"
+        ]
+    },
+    "cybersecurity": {
+        "keywords": "security information security cryptography privacy network security malware hacking",
+        "argumentative": [
+            "Zero Trust Architecture is the Only Viable Security Model for Modern Enterprises",
+            "Biometric Authentication Systems Create More Security Risks Than They Solve",
+            "Artificial Intelligence in Cybersecurity Will Replace Human Security Analysts",
+            "Software Vendors Should Bear Legal Liability for Exploitable Security Flaws"
+        ],
+        "analytical": [
+            "Analyzing the Attack Vectors in 5G Network Infrastructure",
+            "Examining the Effectiveness of Machine Learning in Malware Detection",
+            "Decomposing the Root Causes of Data Breaches in Healthcare Organizations",
+            "Analyzing Software Supply Chain Attacks Through Compromised Open Source Packages"
+        ],
+        "expository": [
+            "Understanding the Technical Mechanisms of Advanced Persistent Threats",
+            "Exploring the Cryptographic Principles Behind Secure Communication Protocols",
+            "Illuminating the Role of Social Engineering in Modern Cyber Attacks",
+            "Explaining Post-Quantum Cryptography and the Migration Path for Public Key Infrastructure"
+        ],
+        "comparative": [
+            "Comparing Signature-Based vs. Behavior-Based Intrusion Detection Systems",
+            "Contrasting Public Key vs. Symmetric Key Cryptography for Different Use Cases",
+            "Evaluating Network-Based vs. Host-Based Security Monitoring Approaches",
+            "Comparing Password Managers and Passkeys for Consumer Account Security"
+        ]
+    },
+    "renewable energy": {
+        "keywords": "solar wind energy sustainability power systems batteries grid hydrogen photovoltaic clean energy",
+        "argumentative": [
+            "Grid-Scale Battery Storage Must Be Subsidized to Reach Net-Zero Electricity Targets",
+            "Offshore Wind Offers a Stronger Decarbonization Return Than New Nuclear Capacity",
+            "Community-Owned Solar Projects Accelerate Public Acceptance of Renewable Energy"
+        ],
+        "analytical": [
+            "Analyzing Curtailment Losses in Wind-Heavy Electricity Grids",
+            "Examining the Lifecycle Emissions of Lithium-Ion Battery Manufacturing",
+            "Analyzing the Effect of Feed-In Tariffs on Residential Solar Adoption Rates"
+        ],
+        "expository": [
+            "Understanding How Perovskite Materials Improve Photovoltaic Cell Efficiency",
+            "Exploring the Role of Green Hydrogen in Decarbonizing Heavy Industry",
+            "Explaining Demand Response and Its Role in Balancing Renewable Power Grids"
+        ],
+        "comparative": [
+            "Comparing Pumped Hydro and Battery Storage for Long-Duration Grid Balancing",
+            "Contrasting Rooftop and Utility-Scale Solar in Cost per Delivered Kilowatt-Hour",
+            "Evaluating Onshore vs. Offshore Wind Farms for Energy Yield and Community Impact"
+        ]
+    },
+    "environmental science": {
+        "keywords": "climate change ecology pollution conservation biodiversity ecosystems sustainability environment",
+        "argumentative": [
+            "Carbon Pricing is More Effective Than Regulation for Reducing Industrial Emissions",
+            "Rewilding Programs Should Take Priority Over Tree-Planting Pledges",
+            "Microplastic Pollution Requires a Global Treaty Rather Than National Bans"
+        ],
+        "analytical": [
+            "Analyzing the Drivers of Urban Heat Islands in Rapidly Growing Cities",
+            "Examining Pesticide Runoff as a Cause of Freshwater Biodiversity Loss",
+            "Analyzing the Effectiveness of Marine Protected Areas for Fish Stock Recovery"
+        ],
+        "expository": [
+            "Understanding Ocean Acidification and Its Effects on Coral Reef Ecosystems",
+            "Exploring Feedback Loops in Permafrost Thaw and Methane Release",
+            "Explaining How Wetlands Sequester Carbon and Mitigate Flooding"
+        ],
+        "comparative": [
+            "Comparing Reforestation and Direct Air Capture as Carbon Removal Strategies",
+            "Contrasting Urban and Rural Air Quality Policies in Their Health Outcomes",
+            "Evaluating Organic vs. Conventional Farming for Soil Health and Yield"
+        ]
+    },
+    "biology": {
+        "keywords": "genetics molecular biology genomics bioinformatics biotechnology microbiology cell biology evolution marine biology",
+        "argumentative": [
+            "CRISPR Germline Editing Should Remain Prohibited Until Long-Term Effects Are Known",
+            "Synthetic Biology Offers the Most Scalable Path to Sustainable Chemical Production",
+            "Open Genomic Data Sharing Outweighs the Privacy Risks to Research Participants"
+        ],
+        "analytical": [
+            "Analyzing Horizontal Gene Transfer in the Spread of Antibiotic Resistance",
+            "Examining the Role of the Gut Microbiome in Metabolic Disease",
+            "Analyzing Gene Expression Changes in Coral Under Thermal Stress"
+        ],
+        "expository": [
+            "Understanding How CRISPR-Cas9 Achieves Targeted Genome Editing",
+            "Exploring Epigenetic Inheritance Across Generations",
+            "Explaining Protein Folding and the Impact of Structure Prediction Models"
+        ],
+        "comparative": [
+            "Comparing Short-Read and Long-Read Sequencing for Structural Variant Detection",
+            "Contrasting Model Organisms in Their Relevance to Human Disease Research",
+            "Evaluating Phage Therapy vs. Antibiotics for Multidrug-Resistant Infections"
+        ]
+    },
+    "public health": {
+        "keywords": "medicine healthcare epidemiology nursing clinical hospital disease health policy pharmacy",
+        "argumentative": [
+            "Sugar Taxes Are a Cost-Effective Tool Against Childhood Obesity",
+            "Telemedicine Should Be a Permanent Part of Rural Primary Care",
+            "Universal Vaccination Mandates Are Justified for School Enrollment"
+        ],
+        "analytical": [
+            "Analyzing Social Determinants Behind Regional Differences in Life Expectancy",
+            "Examining Nurse Staffing Ratios and Their Effect on Patient Outcomes",
+            "Analyzing the Spread of Health Misinformation on Social Media During Outbreaks"
+        ],
+        "expository": [
+            "Understanding How Herd Immunity Thresholds Depend on Transmission Dynamics",
+            "Exploring the Role of Community Health Workers in Low-Resource Settings",
+            "Explaining How Clinical Trials Establish Drug Safety and Efficacy"
+        ],
+        "comparative": [
+            "Comparing Single-Payer and Multi-Payer Health Systems on Access and Cost",
+            "Contrasting Digital and In-Person Interventions for Smoking Cessation",
+            "Evaluating Preventive Screening Programs Across High- and Low-Income Countries"
+        ]
+    },
+    "psychology": {
+        "keywords": "cognitive behavioral mental health neuroscience therapy development social psychology",
+        "argumentative": [
+            "Social Media Use is a Primary Driver of Rising Adolescent Anxiety",
+            "Mindfulness Training Should Be Part of the Standard School Curriculum",
+            "Replication Failures Require Mandatory Preregistration in Psychological Research"
+        ],
+        "analytical": [
+            "Analyzing the Cognitive Effects of Chronic Sleep Deprivation in Students",
+            "Examining Attachment Styles as Predictors of Workplace Relationships",
+            "Analyzing Decision Fatigue in High-Stakes Professional Environments"
+        ],
+        "expository": [
+            "Understanding the Neuroscience of Habit Formation",
+            "Exploring How Memory Reconsolidation Changes Recalled Experiences",
+            "Explaining the Mechanisms of Cognitive Behavioral Therapy"
+        ],
+        "comparative": [
+            "Comparing Cognitive Behavioral Therapy and Medication for Moderate Depression",
+            "Contrasting Individualist and Collectivist Cultures in Expressions of Wellbeing",
+            "Evaluating Online vs. In-Person Therapy Outcomes for Anxiety Disorders"
+        ]
+    },
+    "economics": {
+        "keywords": "finance markets macroeconomics microeconomics behavioral economics monetary policy trade banking inflation",
+        "argumentative": [
+            "Universal Basic Income Would Strengthen Labor Market Resilience",
+            "Central Bank Digital Currencies Threaten Commercial Bank Stability",
+            "Minimum Wage Increases Reduce Poverty Without Significant Job Losses"
+        ],
+        "analytical": [
+            "Analyzing the Transmission of Interest Rate Changes to Housing Markets",
+            "Examining the Gig Economy's Effect on Income Volatility",
+            "Analyzing Nudges and Default Options in Retirement Savings Decisions"
+        ],
+        "expository": [
+            "Understanding How Quantitative Easing Affects Asset Prices",
+            "Exploring the Economics of Platform Monopolies and Network Effects",
+            "Explaining Inflation Expectations and Their Role in Monetary Policy"
+        ],
+        "comparative": [
+            "Comparing Fiscal Stimulus Outcomes Across Advanced Economies After 2008",
+            "Contrasting Tariffs and Subsidies as Tools of Industrial Policy",
+            "Evaluating Cryptocurrency vs. Gold as Inflation Hedges"
+        ]
+    },
+    "business": {
+        "keywords": "management marketing entrepreneurship organizational behavior strategy leadership accounting supply chain",
+        "argumentative": [
+            "Four-Day Work Weeks Increase Productivity in Knowledge-Work Firms",
+            "Stakeholder Capitalism Produces Better Long-Term Returns Than Shareholder Primacy",
+            "Remote-First Organizations Outperform Office-Centric Competitors in Talent Retention"
+        ],
+        "analytical": [
+            "Analyzing Supply Chain Resilience Strategies After Global Disruptions",
+            "Examining the Influence of Employer Branding on Recruitment Outcomes",
+            "Analyzing Pricing Strategies of Subscription-Based Businesses"
+        ],
+        "expository": [
+            "Understanding How Startups Find Product-Market Fit",
+            "Exploring the Role of Organizational Culture in Mergers and Acquisitions",
+            "Explaining Environmental, Social and Governance Reporting Frameworks"
+        ],
+        "comparative": [
+            "Comparing Franchise and Company-Owned Expansion Models in Retail",
+            "Contrasting Influencer Marketing and Traditional Advertising in Brand Awareness",
+            "Evaluating Lean vs. Six Sigma Approaches to Operational Improvement"
+        ]
+    },
+    "education": {
+        "keywords": "pedagogy teaching learning schools curriculum edtech higher education students literacy",
+        "argumentative": [
+            "Standardized Testing Should Be Replaced by Portfolio-Based Assessment",
+            "Early Childhood Education Delivers the Highest Return of Any Public Investment",
+            "Generative AI Tools Should Be Integrated Into Writing Instruction, Not Banned"
+        ],
+        "analytical": [
+            "Analyzing the Effect of Class Size on Student Achievement in Primary Schools",
+            "Examining Dropout Patterns in Massive Open Online Courses",
+            "Analyzing Teacher Retention Factors in Under-Resourced Schools"
+        ],
+        "expository": [
+            "Understanding Spaced Repetition and Retrieval Practice in Long-Term Learning",
+            "Exploring Universal Design for Learning in Inclusive Classrooms",
+            "Explaining the Flipped Classroom Model and Its Implementation"
+        ],
+        "comparative": [
+            "Comparing Online and Face-to-Face Instruction in University Mathematics",
+            "Contrasting Montessori and Traditional Approaches to Early Literacy",
+            "Evaluating Bilingual Immersion vs. Transitional Programs for Language Learners"
+        ]
+    },
+    "history": {
+        "keywords": "historical medieval modern ancient colonial war empire archives historiography",
+        "argumentative": [
+            "Economic Factors Outweighed Ideology in the Collapse of the Soviet Union",
+            "The Printing Press Did More to Shape the Reformation Than Theological Debate",
+            "Colonial Borders Remain the Primary Cause of Post-Independence Conflicts in Africa"
+        ],
+        "analytical": [
+            "Analyzing Propaganda Techniques in World War I Recruitment Campaigns",
+            "Examining Trade Networks Along the Silk Road and Their Cultural Effects",
+            "Analyzing the Role of Women in Industrial Revolution Labor Movements"
+        ],
+        "expository": [
+            "Understanding the Causes and Consequences of the Black Death in Europe",
+            "Exploring the Origins of the Cold War Through Diplomatic Archives",
+            "Explaining the Administrative Systems of the Roman Empire"
+        ],
+        "comparative": [
+            "Comparing the French and American Revolutions in Their Ideas of Citizenship",
+            "Contrasting Decolonization in India and Algeria",
+            "Evaluating Meiji Japan and Tsarist Russia as Late Modernizers"
+        ]
+    },
+    "political science": {
+        "keywords": "politics international relations government policy democracy elections diplomacy public administration",
+        "argumentative": [
+            "Ranked-Choice Voting Reduces Political Polarization",
+            "Economic Sanctions Rarely Achieve Their Stated Foreign Policy Goals",
+            "Social Media Platforms Should Be Regulated as Public Utilities"
+        ],
+        "analytical": [
+            "Analyzing the Rise of Populist Parties in European Parliaments",
+            "Examining Voter Turnout Effects of Automatic Registration",
+            "Analyzing Climate Negotiations Through Coalition Bargaining Theory"
+        ],
+        "expository": [
+            "Understanding the Institutional Design of the European Union",
+            "Exploring How Gerrymandering Shapes Legislative Representation",
+            "Explaining Soft Power and Its Use in Modern Diplomacy"
+        ],
+        "comparative": [
+            "Comparing Presidential and Parliamentary Systems in Crisis Response",
+            "Contrasting Federal and Unitary States in Pandemic Policy Coordination",
+            "Evaluating Proportional vs. Majoritarian Electoral Systems for Minority Representation"
+        ]
+    },
+    "sociology": {
+        "keywords": "society social inequality culture gender race migration urban communities anthropology",
+        "argumentative": [
+            "Gentrification Harms Long-Term Residents More Than It Benefits Neighborhoods",
+            "Remote Work is Reshaping Social Class Boundaries",
+            "Affordable Housing Policy Is the Most Effective Lever Against Social Mobility Decline"
+        ],
+        "analytical": [
+            "Analyzing Online Communities as Sources of Social Support for Migrants",
+            "Examining Intergenerational Mobility Across Urban and Rural Regions",
+            "Analyzing Gender Division of Household Labor in Dual-Career Families"
+        ],
+        "expository": [
+            "Understanding the Sociology of Moral Panics in the Digital Age",
+            "Exploring Social Capital and Its Role in Community Resilience",
+            "Explaining Intersectionality as a Framework for Studying Inequality"
+        ],
+        "comparative": [
+            "Comparing Integration Policies for Refugees in Germany and Canada",
+            "Contrasting Urban and Rural Experiences of Loneliness Among Older Adults",
+            "Evaluating Meritocracy Beliefs Across Different Education Systems"
+        ]
+    },
+    "literature": {
+        "keywords": "english literary studies fiction poetry novels writing criticism drama",
+        "argumentative": [
+            "Dystopian Fiction Shapes Public Attitudes Toward Surveillance Technology",
+            "Postcolonial Literature Should Be Central to the Secondary School Canon",
+            "Serialized Online Fiction Represents a Legitimate Literary Form"
+        ],
+        "analytical": [
+            "Analyzing Unreliable Narration in Twentieth-Century Modernist Novels",
+            "Examining Representations of Climate Crisis in Contemporary Fiction",
+            "Analyzing Memory and Trauma in Post-War Poetry"
+        ],
+        "expository": [
+            "Understanding the Development of the Gothic Novel",
+            "Exploring Magical Realism in Latin American Literature",
+            "Explaining Reader-Response Theory and Its Critics"
+        ],
+        "comparative": [
+            "Comparing Shakespearean and Modern Adaptations of Tragedy",
+            "Contrasting Victorian and Contemporary Portrayals of Childhood",
+            "Evaluating Translation Choices in Competing Editions of a Classic Novel"
+        ]
+    },
+    "philosophy": {
+        "keywords": "ethics moral philosophy logic metaphysics epistemology philosophy of mind bioethics",
+        "argumentative": [
+            "Moral Responsibility Is Compatible With a Deterministic Universe",
+            "Autonomous Weapons Systems Are Ethically Impermissible",
+            "Future Generations Have Enforceable Moral Claims on Present Climate Policy"
+        ],
+        "analytical": [
+            "Analyzing the Trolley Problem as a Model for Autonomous Vehicle Ethics",
+            "Examining Consent Requirements in Data-Driven Medical Research",
+            "Analyzing Personal Identity Through Thought Experiments on Memory"
+        ],
+        "expository": [
+            "Understanding Virtue Ethics and Its Revival in Contemporary Thought",
+            "Exploring the Hard Problem of Consciousness",
+            "Explaining Rawls's Veil of Ignorance and Its Applications"
+        ],
+        "comparative": [
+            "Comparing Utilitarian and Deontological Approaches to Resource Allocation in Healthcare",
+            "Contrasting Eastern and Western Conceptions of the Self",
+            "Evaluating Realist vs. Anti-Realist Accounts of Moral Facts"
+        ]
+    },
+    "law": {
+        "keywords": "legal jurisprudence constitutional criminal justice human rights regulation intellectual property",
+        "argumentative": [
+            "Algorithmic Risk Scores Should Be Inadmissible in Sentencing Decisions",
+            "Copyright Law Must Adapt to Protect Works Used to Train Generative AI",
+            "Restorative Justice Programs Reduce Recidivism More Than Incarceration"
+        ],
+        "analytical": [
+            "Analyzing the Enforcement of Data Protection Regulation Across Member States",
+            "Examining Plea Bargaining Pressures on Defendants With Limited Resources",
+            "Analyzing Legal Personhood Claims for Rivers and Ecosystems"
+        ],
+        "expository": [
+            "Understanding the Doctrine of Judicial Review",
+            "Exploring the Legal Framework of International Refugee Protection",
+            "Explaining Smart Contracts and Their Enforceability"
+        ],
+        "comparative": [
+            "Comparing Common Law and Civil Law Approaches to Precedent",
+            "Contrasting Privacy Regulation in the European Union and the United States",
+            "Evaluating Jury Trials vs. Bench Trials in Complex Fraud Cases"
+        ]
+    },
+    "urban planning": {
+        "keywords": "civil engineering architecture cities transportation infrastructure housing smart cities construction",
+        "argumentative": [
+            "Congestion Pricing is the Most Effective Tool for Reducing Urban Traffic",
+            "Single-Family Zoning Should Be Abolished to Address Housing Shortages",
+            "Mass Timber Construction Should Replace Concrete in Mid-Rise Buildings"
+        ],
+        "analytical": [
+            "Analyzing the Impact of Bike Lane Networks on Urban Commuting Patterns",
+            "Examining Structural Health Monitoring Data for Aging Bridges",
+            "Analyzing Transit-Oriented Development and Property Values"
+        ],
+        "expository": [
+            "Understanding the Fifteen-Minute City Concept",
+            "Exploring Sponge City Design for Flood Resilience",
+            "Explaining How Building Information Modeling Changes Construction Projects"
+        ],
+        "comparative": [
+            "Comparing Bus Rapid Transit and Light Rail for Mid-Sized Cities",
+            "Contrasting European and North American Approaches to Suburban Design",
+            "Evaluating Passive House vs. Conventional Building Standards for Energy Use"
+        ]
+    },
+    "engineering": {
+        "keywords": "mechanical electrical robotics automation manufacturing aerospace control systems electronics",
+        "argumentative": [
+            "Collaborative Robots Will Benefit Small Manufacturers More Than Large Ones",
+            "Electric Aviation Is Viable for Regional Flights Within the Next Decade",
+            "Right-to-Repair Laws Should Apply to Agricultural and Industrial Equipment"
+        ],
+        "analytical": [
+            "Analyzing Failure Modes in Additively Manufactured Metal Components",
+            "Examining Energy Efficiency of Industrial Motor Drive Systems",
+            "Analyzing Sensor Fusion Errors in Autonomous Vehicle Localization"
+        ],
+        "expository": [
+            "Understanding Model Predictive Control in Modern Robotics",
+            "Exploring Digital Twins for Predictive Maintenance",
+            "Explaining Power Electronics in Electric Vehicle Drivetrains"
+        ],
+        "comparative": [
+            "Comparing Lidar and Camera-Based Perception for Autonomous Navigation",
+            "Contrasting Hydraulic and Electric Actuation in Heavy Machinery",
+            "Evaluating Solid-State vs. Lithium-Ion Batteries for Electric Vehicles"
+        ]
+    },
+    "physics": {
+        "keywords": "astronomy astrophysics quantum mechanics particle physics cosmology optics condensed matter",
+        "argumentative": [
+            "Dark Matter Searches Should Prioritize Axions Over WIMPs",
+            "Quantum Error Correction Is the Decisive Barrier to Practical Quantum Computing",
+            "Space-Based Telescopes Deliver More Scientific Value Than Ground-Based Observatories"
+        ],
+        "analytical": [
+            "Analyzing Gravitational Wave Signals From Neutron Star Mergers",
+            "Examining Decoherence Sources in Superconducting Qubits",
+            "Analyzing Exoplanet Atmospheres Through Transmission Spectroscopy"
+        ],
+        "expository": [
+            "Understanding Quantum Entanglement and Bell Inequality Tests",
+            "Exploring the Physics of High-Temperature Superconductors",
+            "Explaining the Cosmic Microwave Background and What It Reveals"
+        ],
+        "comparative": [
+            "Comparing Trapped-Ion and Superconducting Approaches to Quantum Computing",
+            "Contrasting Tokamak and Stellarator Designs for Fusion Energy",
+            "Evaluating Standard Candles vs. Gravitational Lensing for Measuring Cosmic Expansion"
+        ]
+    },
+    "chemistry": {
+        "keywords": "materials science chemical engineering organic inorganic polymers catalysis nanotechnology",
+        "argumentative": [
+            "Green Chemistry Principles Should Be Mandatory in Industrial Process Design",
+            "Biodegradable Polymers Are Not Yet a Sustainable Replacement for Conventional Plastics",
+            "Machine-Learned Potentials Will Replace Classical Force Fields in Molecular Simulation"
+        ],
+        "analytical": [
+            "Analyzing Catalyst Degradation in Hydrogen Fuel Cells",
+            "Examining Nanoparticle Toxicity in Consumer Products",
+            "Analyzing Recycling Pathways for Mixed Plastic Waste"
+        ],
+        "expository": [
+            "Understanding Metal-Organic Frameworks for Carbon Capture",
+            "Exploring the Chemistry of Lithium-Ion Battery Electrolytes",
+            "Explaining Self-Healing Materials and Their Mechanisms"
+        ],
+        "comparative": [
+            "Comparing Electrochemical and Thermal Routes for Ammonia Synthesis",
+            "Contrasting Graphene and Carbon Nanotubes for Flexible Electronics",
+            "Evaluating Enzymatic vs. Chemical Catalysis in Pharmaceutical Manufacturing"
+        ]
+    },
+    "mathematics": {
+        "keywords": "statistics probability applied mathematics data analysis optimization modeling number theory",
+        "argumentative": [
+            "Bayesian Methods Should Replace Null Hypothesis Significance Testing in Research",
+            "Computer-Assisted Proofs Deserve Equal Standing With Traditional Proofs",
+            "Statistical Literacy Should Be Prioritized Over Calculus in Secondary Education"
+        ],
+        "analytical": [
+            "Analyzing the Robustness of Epidemic Models to Parameter Uncertainty",
+            "Examining Sampling Bias in Online Survey Data",
+            "Analyzing Convergence of Stochastic Gradient Methods on Non-Convex Problems"
+        ],
+        "expository": [
+            "Understanding the Mathematics of Public Key Cryptography",
+            "Exploring Graph Theory Applications in Social Network Analysis",
+            "Explaining Causal Inference With Directed Acyclic Graphs"
+        ],
+        "comparative": [
+            "Comparing Frequentist and Bayesian Approaches to Clinical Trial Analysis",
+            "Contrasting Agent-Based and Differential Equation Models of Disease Spread",
+            "Evaluating Bootstrap vs. Analytical Confidence Intervals in Small Samples"
+        ]
+    },
+    "linguistics": {
+        "keywords": "language languages sociolinguistics phonetics syntax translation bilingualism applied linguistics",
+        "argumentative": [
+            "Endangered Language Revitalization Requires Digital-First Strategies",
+            "Bilingual Education Improves Cognitive Flexibility in Early Childhood",
+            "Machine Translation Cannot Replace Human Translators in Literary Work"
+        ],
+        "analytical": [
+            "Analyzing Code-Switching Patterns in Multilingual Online Communities",
+            "Examining Language Change in Social Media Slang",
+            "Analyzing Accent Bias in Hiring Decisions"
+        ],
+        "expository": [
+            "Understanding How Children Acquire Grammar Without Explicit Instruction",
+            "Exploring the Sapir-Whorf Hypothesis and Modern Evidence",
+            "Explaining How Speech Recognition Systems Model Phonetics"
+        ],
+        "comparative": [
+            "Comparing Second Language Acquisition in Children and Adults",
+            "Contrasting Tonal and Non-Tonal Languages in Speech Perception",
+            "Evaluating Immersion vs. Classroom Learning for Language Fluency"
+        ]
+    },
+    "media studies": {
+        "keywords": "communication journalism film music art design digital media social media advertising culture",
+        "argumentative": [
+            "Algorithmic News Feeds Undermine Democratic Deliberation",
+            "Streaming Platforms Have Devalued Music as Creative Labor",
+            "Public Service Broadcasting Remains Essential in the Digital Era"
+        ],
+        "analytical": [
+            "Analyzing Visual Rhetoric in Climate Change Campaigns",
+            "Examining Parasocial Relationships Between Audiences and Online Creators",
+            "Analyzing Representation of Disability in Contemporary Film"
+        ],
+        "expository": [
+            "Understanding the Attention Economy and Platform Design",
+            "Exploring the History of Photojournalism and Its Ethics",
+            "Explaining How Recommendation Algorithms Shape Cultural Taste"
+        ],
+        "comparative": [
+            "Comparing Public and Commercial Broadcasters in Election Coverage",
+            "Contrasting Short-Form and Long-Form Video in Audience Engagement",
+            "Evaluating Print vs. Digital Journalism Business Models"
+        ]
+    }
+}
+
+# Used when a field matches nothing in the corpus; {field} is the user's own field of study
+GENERIC_TITLES = {
+    "argumentative": [
+        "Digital Transformation Is Redefining Core Practices in {field}",
+        "Interdisciplinary Methods Should Become Standard in {field} Research",
+        "Open Data Policies Would Accelerate Progress in {field}",
+        "Sustainability Considerations Must Shape the Future of {field}"
+    ],
+    "analytical": [
+        "Analyzing the Key Drivers of Recent Change in {field}",
+        "Examining Barriers to Adopting Emerging Technologies in {field}",
+        "Analyzing Inequalities in Access and Outcomes Within {field}",
+        "Examining How Policy and Regulation Shape Practice in {field}"
+    ],
+    "expository": [
+        "Understanding the Foundational Theories of {field}",
+        "Exploring Emerging Research Directions in {field}",
+        "Explaining the Role of Data and Measurement in {field}",
+        "Illuminating Ethical Questions Facing Practitioners in {field}"
+    ],
+    "comparative": [
+        "Comparing Traditional and Emerging Approaches in {field}",
+        "Contrasting International Practices and Outcomes in {field}",
+        "Evaluating Qualitative vs. Quantitative Methods in {field} Research",
+        "Comparing Public and Private Sector Perspectives on {field}"
+    ]
+}
+
+METHODOLOGIES = [
+    "Literature review, empirical analysis, and case study methodology",
+    "Mixed-methods approach combining quantitative analysis and qualitative interviews",
+    "Experimental design with control groups and statistical validation",
+    "Systematic literature review and meta-analysis of existing research",
+    "Prototype development and comparative performance evaluation",
+    "Survey research and statistical modeling techniques",
+    "Longitudinal study with repeated measurements over an extended period",
+    "Comparative case studies drawing on archival and interview data",
+    "Simulation modeling validated against observed data"
+]
+
+CONTRIBUTIONS = [
+    "providing new theoretical frameworks for understanding complex systems",
+    "developing novel methods with improved efficiency and accuracy",
+    "establishing best practices for real-world implementation",
+    "bridging the gap between theoretical research and practical applications",
+    "offering comprehensive solutions to persistent challenges in the field",
+    "advancing the state-of-the-art through innovative methodological approaches",
+    "producing an openly available dataset for future research",
+    "informing evidence-based policy recommendations"
+]
+
+# Opening of the research overview, by tone
+TONE_OPENINGS = {
+    "academic": "This {thesis_type} thesis addresses a critical question in {field}",
+    "persuasive": "This {thesis_type} thesis makes the case for a pressing question in {field}",
+    "neutral": "This {thesis_type} thesis investigates an open question in {field}",
+    "critical": "This {thesis_type} thesis critically interrogates established assumptions in {field}"
+}
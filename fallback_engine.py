@@ -0,0 +1,205 @@
+"""
+Retrieval-based fallback engine: BM25 over an idea corpus with a trigram index for fuzzy terms
+"""
+import hashlib
+import logging
+import math
+import random
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from fallback_corpus import CONTRIBUTIONS, FIELDS, GENERIC_TITLES, METHODOLOGIES, TONE_OPENINGS
+
+logger = logging.getLogger(__name__)
+
+THESIS_TYPES = ("argumentative", "analytical", "expository", "comparative")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or the to with vs versus its their "
+    "study studies research field fields thesis".split()
+)
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+def stem(token: str) -> str:
+    """Crude plural folding so 'networks' matches 'network'"""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+def tokenize(text: str) -> List[str]:
+    return [stem(token) for token in TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+def trigrams(term: str) -> set:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class IdeaDoc:
+    """One corpus idea with its precomputed term frequencies"""
+
+    __slots__ = ("title", "field", "thesis_type", "length", "tf")
+
+    def __init__(self, title: str, field: str, thesis_type: str, text: str):
+        self.title = title
+        self.field = field
+        self.thesis_type = thesis_type
+        tokens = tokenize(text)
+        self.length = len(tokens)
+        self.tf: Dict[str, int] = defaultdict(int)
+        for token in tokens:
+            self.tf[token] += 1
+
+class FallbackEngine:
+    """Built once; ranks corpus ideas for a free-text field of study in well under a millisecond"""
+
+    def __init__(self, fields: dict = FIELDS, k1: float = 1.2, b: float = 0.75,
+                 fuzzy_threshold: float = 0.45, min_relative_score: float = 0.4):
+        started = time.perf_counter()
+        self.k1 = k1
+        self.b = b
+        self.fuzzy_threshold = fuzzy_threshold
+        self.min_relative_score = min_relative_score
+
+        self.docs: List[IdeaDoc] = []
+        for field, entry in fields.items():
+            # Field name and keywords count towards every idea of that field
+            context = f"{field} {field} {entry.get('keywords', '')}"
+            for thesis_type in THESIS_TYPES:
+                for title in entry.get(thesis_type, []):
+                    self.docs.append(IdeaDoc(title, field, thesis_type, f"{title} {context}"))
+
+        # Inverted index: term -> [(doc_id, tf)]
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for doc_id, doc in enumerate(self.docs):
+            for term, tf in doc.tf.items():
+                self.postings[term].append((doc_id, tf))
+        self.avg_length = sum(doc.length for doc in self.docs) / max(1, len(self.docs))
+        n = len(self.docs)
+        self.idf = {
+            term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+        # Trigram index over the vocabulary, for misspelled or partial query terms
+        self.term_trigrams: Dict[str, set] = {term: trigrams(term) for term in self.postings}
+        self.trigram_index: Dict[str, List[str]] = defaultdict(list)
+        for term, grams in self.term_trigrams.items():
+            for gram in grams:
+                self.trigram_index[gram].append(term)
+
+        self.build_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"📚 Fallback engine indexed {len(self.docs)} ideas, {len(self.postings)} terms "
+                    f"in {self.build_ms:.1f}ms")
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """The term itself if indexed, else vocabulary terms with similar trigrams (weighted)"""
+        if term in self.postings:
+            return [(term, 1.0)]
+        grams = trigrams(term)
+        overlap: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for candidate in self.trigram_index.get(gram, ()):
+                overlap[candidate] += 1
+        matches = []
+        for candidate, shared in overlap.items():
+            similarity = shared / len(grams | self.term_trigrams[candidate])
+            if similarity >= self.fuzzy_threshold:
+                matches.append((candidate, similarity))
+        matches.sort(key=lambda match: -match[1])
+        return matches[:3]
+
+    def score(self, query: str) -> Dict[int, float]:
+        """BM25 score per matching doc id"""
+        scores: Dict[int, float] = defaultdict(float)
+        for token in set(tokenize(query)):
+            for term, weight in self._expand(token):
+                idf = self.idf[term]
+                for doc_id, tf in self.postings[term]:
+                    length_norm = 1 - self.b + self.b * self.docs[doc_id].length / self.avg_length
+                    scores[doc_id] += weight * idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+        return scores
+
+    def select_titles(self, research_field: str, thesis_type: str, num_ideas: int,
+                      rng: random.Random) -> List[str]:
+        """Best matching titles of the requested type, topped up with field-specific generic titles"""
+        thesis_type = thesis_type if thesis_type in THESIS_TYPES else "argumentative"
+        scores = self.score(research_field)
+        # Random tie-breaker drawn from the seeded generator keeps the order deterministic
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], rng.random()))
+        if ranked:
+            # Weak partial matches read worse than field-specific generic titles
+            cutoff = ranked[0][1] * self.min_relative_score
+            ranked = [item for item in ranked if item[1] >= cutoff]
+
+        same_type = [self.docs[doc_id].title for doc_id, _ in ranked if self.docs[doc_id].thesis_type == thesis_type]
+        titles = same_type[:num_ideas]
+
+        field_label = " ".join(word[:1].upper() + word[1:] for word in research_field.split()) or "the Field"
+        generic = [template.format(field=field_label) for template in GENERIC_TITLES[thesis_type]]
+        for title in generic:
+            if len(titles) >= num_ideas:
+                break
+            titles.append(title)
+
+        if len(titles) < num_ideas:
+            other = [self.docs[doc_id].title for doc_id, _ in ranked if self.docs[doc_id].thesis_type != thesis_type]
+            titles.extend(other[:num_ideas - len(titles)])
+        for other_type in THESIS_TYPES:
+            if other_type == thesis_type:
+                continue
+            for template in GENERIC_TITLES[other_type]:
+                if len(titles) >= num_ideas:
+                    return titles
+                titles.append(template.format(field=field_label))
+        return titles
+
+    def generate(self, research_field: str, num_ideas: int, tone: str, thesis_type: str,
+                 seed: Optional[str] = None) -> str:
+        """Markdown ideas in the same format as the live API fallback always produced"""
+        field = " ".join(research_field.split())
+        key = seed or f"{field.lower()}|{num_ideas}|{tone}|{thesis_type}"
+        rng = random.Random(hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+        opening = TONE_OPENINGS.get(tone, TONE_OPENINGS["academic"]).format(thesis_type=thesis_type, field=field)
+        methodologies = rng.sample(METHODOLOGIES, len(METHODOLOGIES))
+        contributions = rng.sample(CONTRIBUTIONS, len(CONTRIBUTIONS))
+
+        parts = []
+        for i, title in enumerate(self.select_titles(field, thesis_type, num_ideas, rng)):
+            methodology = methodologies[i % len(methodologies)]
+            contribution = contributions[i % len(contributions)]
+            parts.append(
+                f"\n**Thesis Idea {i + 1}: {title}**\n\n"
+                f"**Research Overview:** {opening} by examining the theoretical foundations and practical "
+                f"implications of the proposed research question. The study will investigate current "
+                f"methodologies, identify gaps in existing literature, and propose innovative solutions that "
+                f"advance both academic understanding and real-world practice.\n\n"
+                f"**Methodology:** {methodology}. The research will employ rigorous data collection techniques, "
+                f"appropriate analysis, and validation through peer review and expert consultation.\n\n"
+                f"**Expected Contributions:** This research will contribute to {field} by {contribution}. "
+                f"The findings will have significant implications for both researchers and practitioners "
+                f"in the field.\n\n"
+                f"---\n"
+            )
+        return "".join(parts)
+
+    def stats(self) -> dict:
+        return {
+            "ideas": len(self.docs),
+            "terms": len(self.postings),
+            "trigrams": len(self.trigram_index),
+            "build_ms": round(self.build_ms, 2)
+        }
+
+_default_engine: Optional[FallbackEngine] = None
+
+def get_fallback_engine() -> FallbackEngine:
+    """Process-wide engine, built on first use"""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = FallbackEngine()
+    return _default_engine
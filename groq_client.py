@@ -0,0 +1,91 @@
+"""
+Shared upstream HTTP client for Groq API calls
+"""
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Process-wide client, owned by the application lifespan
+_client: Optional[httpx.AsyncClient] = None
+
+def _http2_available() -> bool:
+    """Check whether the optional 'h2' package is installed"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def build_client() -> httpx.AsyncClient:
+    """Create a pooled keep-alive client from the upstream settings"""
+    http2 = settings.UPSTREAM_HTTP2 and _http2_available()
+    if settings.UPSTREAM_HTTP2 and not http2:
+        logger.warning("⚠️ UPSTREAM_HTTP2 enabled but 'h2' is not installed, using HTTP/1.1")
+
+    limits = httpx.Limits(
+        max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE,
+        keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY
+    )
+    timeout = httpx.Timeout(
+        connect=settings.UPSTREAM_CONNECT_TIMEOUT,
+        read=settings.UPSTREAM_READ_TIMEOUT,
+        write=settings.UPSTREAM_CONNECT_TIMEOUT,
+        pool=settings.UPSTREAM_CONNECT_TIMEOUT
+    )
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=limits,
+        timeout=timeout,
+        headers={"User-Agent": "ThesisBrainstorming/1.0"}
+    )
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily when the lifespan did not run (serverless)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_client()
+    return _client
+
+async def prewarm(base_url: str) -> int:
+    """Open keep-alive connections to the upstream before the first user request"""
+    count = settings.UPSTREAM_PREWARM_CONNECTIONS
+    if count <= 0:
+        return 0
+
+    client = get_client()
+
+    # HEAD without credentials: completes DNS/TCP/TLS without spending API quota
+    async def _touch() -> bool:
+        try:
+            await client.head(f"{base_url}/models")
+            return True
+        except httpx.HTTPError as e:
+            logger.warning(f"⚠️ Upstream pre-warm failed: {str(e)[:80]}")
+            return False
+
+    results = await asyncio.gather(*(_touch() for _ in range(count)))
+    warmed = sum(results)
+    logger.info(f"🔥 Pre-warmed {warmed}/{count} upstream connections")
+    return warmed
+
+async def startup(base_url: str) -> None:
+    """Create the shared client and pre-warm its pool"""
+    get_client()
+    try:
+        await prewarm(base_url)
+    except Exception as e:
+        logger.warning(f"⚠️ Upstream pre-warm skipped: {str(e)}")
+
+async def shutdown() -> None:
+    """Close the shared client and release pooled connections"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
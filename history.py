@@ -0,0 +1,199 @@
+"""
+Persistent history of generated ideas with full-text search
+
+Every idea served from a Groq generation is kept in a local SQLite file with
+an FTS5 index (porter-stemmed, external content), so "that federated learning
+idea" can be found again in milliseconds instead of paying for a new
+generation. Retention is bounded by age and by row count; all workers on the
+box share the file in WAL mode.
+"""
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Columns indexed for search, with their bm25 weights (a title match outranks a methodology match)
+INDEXED_COLUMNS = ("title", "overview", "methodology", "contributions", "field")
+COLUMN_WEIGHTS = (10.0, 2.0, 1.0, 1.0, 5.0)
+
+MAX_QUERY_TERMS = 16
+
+def build_match_query(text: str) -> str:
+    """FTS5 MATCH expression for free text: every word must match, the last one as a prefix"""
+    terms = re.findall(r"\w+", text.lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        return ""
+    # Quoted terms cannot be read as FTS5 operators or column filters
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+def idea_digest(field: str, title: str, overview: str) -> str:
+    """Identity of an idea, so the same idea served twice is stored once"""
+    text = "\x1f".join(" ".join(part.lower().split()) for part in (field, title, overview))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+class IdeaHistory:
+    """Generated ideas in SQLite with an FTS5 index; blocking, call from a worker thread"""
+
+    def __init__(self, path: str, max_entries: int = 50000, max_age: float = 90 * 86400.0,
+                 prune_every: int = 200):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.prune_every = prune_every
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.searches = 0
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS ideas ("
+            "id INTEGER PRIMARY KEY, digest TEXT NOT NULL UNIQUE, created REAL NOT NULL, "
+            "field TEXT NOT NULL, thesis_type TEXT NOT NULL, tone TEXT NOT NULL, model TEXT NOT NULL, "
+            "title TEXT NOT NULL, overview TEXT NOT NULL, methodology TEXT NOT NULL, contributions TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ideas_created ON ideas (created)")
+        columns = ", ".join(INDEXED_COLUMNS)
+        new_columns = ", ".join(f"new.{column}" for column in INDEXED_COLUMNS)
+        old_columns = ", ".join(f"old.{column}" for column in INDEXED_COLUMNS)
+        # Raises sqlite3.OperationalError when SQLite was built without FTS5
+        self._db.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS ideas_fts USING fts5("
+            f"{columns}, content='ideas', content_rowid='id', tokenize='porter unicode61')"
+        )
+        # The index follows the table; retention deletes clean it up too
+        self._db.execute(
+            f"CREATE TRIGGER IF NOT EXISTS ideas_ai AFTER INSERT ON ideas BEGIN "
+            f"INSERT INTO ideas_fts (rowid, {columns}) VALUES (new.id, {new_columns}); END"
+        )
+        self._db.execute(
+            f"CREATE TRIGGER IF NOT EXISTS ideas_ad AFTER DELETE ON ideas BEGIN "
+            f"INSERT INTO ideas_fts (ideas_fts, rowid, {columns}) VALUES ('delete', old.id, {old_columns}); END"
+        )
+
+    def add(self, field: str, thesis_type: str, tone: str, model: str, ideas: List[Dict[str, str]]) -> int:
+        """Store parsed ideas (records from parse_ideas); returns how many were stored or refreshed"""
+        now = time.time()
+        rows = [
+            (
+                idea_digest(field, idea.get("title", ""), idea.get("overview", "")), now,
+                field.strip(), thesis_type, tone, model, idea.get("title", ""), idea.get("overview", ""),
+                idea.get("methodology", ""), idea.get("contributions", "")
+            )
+            for idea in ideas if idea.get("title") or idea.get("overview")
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # A repeat only refreshes its age, so popular ideas outlive the retention window
+                self._db.executemany(
+                    "INSERT INTO ideas (digest, created, field, thesis_type, tone, model, "
+                    "title, overview, methodology, contributions) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (digest) DO UPDATE SET created = excluded.created",
+                    rows
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self._writes += len(rows)
+            if self._writes >= self.prune_every:
+                self._writes = 0
+                self._prune_locked(now)
+        return len(rows)
+
+    def search(self, query: str, limit: int = 10, offset: int = 0,
+               thesis_type: Optional[str] = None, tone: Optional[str] = None) -> dict:
+        """Ranked matches for free text: {"total", "results"}; best matches first"""
+        match = build_match_query(query)
+        if not match:
+            return {"total": 0, "results": []}
+        filters = ""
+        params: list = [match]
+        if thesis_type:
+            filters += " AND ideas.thesis_type = ?"
+            params.append(thesis_type)
+        if tone:
+            filters += " AND ideas.tone = ?"
+            params.append(tone)
+        weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS)
+        with self._lock:
+            self.searches += 1
+            total = self._db.execute(
+                f"SELECT count(*) FROM ideas_fts JOIN ideas ON ideas.id = ideas_fts.rowid "
+                f"WHERE ideas_fts MATCH ?{filters}",
+                params
+            ).fetchone()[0]
+            rows = self._db.execute(
+                f"SELECT ideas.id, ideas.created, ideas.field, ideas.thesis_type, ideas.tone, ideas.model, "
+                f"ideas.title, ideas.overview, ideas.methodology, ideas.contributions, "
+                f"bm25(ideas_fts, {weights}) AS rank "
+                f"FROM ideas_fts JOIN ideas ON ideas.id = ideas_fts.rowid "
+                f"WHERE ideas_fts MATCH ?{filters} ORDER BY rank LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall() if offset < total else []
+        results = []
+        for row in rows:
+            record = {
+                "id": row[0],
+                "created": row[1],
+                "field_of_study": row[2],
+                "thesis_type": row[3],
+                "tone": row[4],
+                "model": row[5],
+                "title": row[6]
+            }
+            for name, content in zip(("overview", "methodology", "contributions"), row[7:10]):
+                if content:
+                    record[name] = content
+            # bm25() is lower-is-better; report higher-is-better
+            record["score"] = round(-row[10], 4)
+            results.append(record)
+        return {"total": total, "results": results}
+
+    def _prune_locked(self, now: float) -> None:
+        removed = self._db.execute("DELETE FROM ideas WHERE created < ?", (now - self.max_age,)).rowcount
+        removed += self._db.execute(
+            "DELETE FROM ideas WHERE id IN (SELECT id FROM ideas ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        ).rowcount
+        if removed:
+            logger.info(f"🧹 Pruned {removed} ideas from the history")
+
+    def prune(self) -> None:
+        """Apply the retention policy now"""
+        with self._lock:
+            self._prune_locked(time.time())
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM ideas").fetchone()[0]
+
+    def stats(self) -> dict:
+        return {
+            "entries": self.count(),
+            "max_entries": self.max_entries,
+            "max_age_days": round(self.max_age / 86400, 1),
+            "searches": self.searches
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+def create_idea_history(path: str, max_entries: int, max_age: float) -> Optional[IdeaHistory]:
+    """Open the history, or None (history off) if SQLite or its FTS5 module is unusable"""
+    try:
+        return IdeaHistory(path, max_entries=max_entries, max_age=max_age)
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ Idea history unavailable ({path}): {str(e)}")
+        return None
@@ -0,0 +1,155 @@
+"""
+Helpers for working with generated thesis idea text
+"""
+import html
+import re
+from typing import Dict, List
+
+# A numbered line: "1.", "1. **Title**", "**1. Title**", "### Thesis Idea 2:", "**Idea 3:**"
+IDEA_HEADER = re.compile(
+    r"^(?P<prefix>(?:#{1,6}[ \t]*)?(?:\*\*)?[ \t]*(?P<word>Thesis[ \t]+Idea[ \t]+|Idea[ \t]+)?)"
+    r"(?P<number>\d{1,2})(?P<suffix>[.:)])(?P<bold>[ \t]*\*\*)?",
+    re.IGNORECASE | re.MULTILINE
+)
+
+def _is_marked(match: re.Match) -> bool:
+    """Headers with a heading, bold or 'Idea' marker, as opposed to plain list items"""
+    return "#" in match.group("prefix") or "**" in match.group("prefix") or bool(
+        match.group("word") or match.group("bold")
+    )
+
+def find_idea_headers(text: str) -> List[re.Match]:
+    """Locate idea headers, ignoring numbered sub-lists inside an idea"""
+    matches = list(IDEA_HEADER.finditer(text))
+    marked = [m for m in matches if _is_marked(m)]
+    candidates = marked or matches
+
+    # Ideas are numbered 1, 2, 3...; anything out of sequence is a nested list
+    headers = []
+    for match in candidates:
+        if int(match.group("number")) == len(headers) + 1:
+            headers.append(match)
+    return headers
+
+def split_ideas(text: str) -> List[str]:
+    """Split generated text into one block per numbered idea (preamble dropped)"""
+    starts = [match.start() for match in find_idea_headers(text)]
+    if not starts:
+        return [text.strip()] if text.strip() else []
+    bounds = starts + [len(text)]
+    return [text[bounds[i]:bounds[i + 1]].strip() for i in range(len(starts))]
+
+def renumber_idea(block: str, number: int) -> str:
+    """Rewrite the number in an idea block's header"""
+    return IDEA_HEADER.sub(
+        lambda m: f"{m.group('prefix')}{number}{m.group('suffix')}{m.group('bold') or ''}", block, count=1
+    )
+
+def merge_idea_chunks(chunks: List[str]) -> str:
+    """Merge outputs of parallel completions into one list numbered from 1"""
+    merged = []
+    for chunk in chunks:
+        for block in split_ideas(chunk):
+            merged.append(renumber_idea(block, len(merged) + 1))
+    return "\n\n".join(merged)
+
+def take_ideas(text: str, num_ideas: int) -> str:
+    """The first num_ideas ideas of a generated list"""
+    blocks = split_ideas(text)
+    return "\n\n".join(renumber_idea(block, i + 1) for i, block in enumerate(blocks[:num_ideas]))
+
+# A labelled section line: "**Research Overview:** ...", "Methodology - ...", "3. Expected Contributions:"
+SECTION_LABEL = re.compile(
+    r"^[ \t]*(?:[-*+][ \t]+)?(?:\d\.[ \t]*)?(?:\*\*|__)?[ \t]*"
+    r"(?P<label>(?:brief[ \t]+)?(?:research[ \t]+)?overview|summary|description|"
+    r"(?:suggested[ \t]+|proposed[ \t]+|research[ \t]+)?(?:methodology|methods|approach)|"
+    r"(?:expected[ \t]+|potential[ \t]+|key[ \t]+)?contributions?(?:[ \t]+to[ \t]+the[ \t]+field)?|significance)"
+    r"[ \t]*(?:\*\*|__)?[ \t]*[:\-\u2013\u2014][ \t]*(?:\*\*|__)?",
+    re.IGNORECASE | re.MULTILINE
+)
+
+SECTIONS = ("overview", "methodology", "contributions")
+
+def _section_for(label: str) -> str:
+    label = label.lower()
+    if "method" in label or "approach" in label:
+        return "methodology"
+    if "contribution" in label or "significance" in label:
+        return "contributions"
+    return "overview"
+
+def _clean(text: str) -> str:
+    """Plain text: markdown emphasis, rules and extra whitespace removed"""
+    text = re.sub(r"^[ \t]*(?:-{3,}|\*{3,}|_{3,})[ \t]*$", "", text, flags=re.MULTILINE)
+    text = text.replace("**", "").replace("__", "")
+    text = re.sub(r"^#{1,6}[ \t]*", "", text, flags=re.MULTILINE)
+    paragraphs = []
+    for part in re.split(r"\n[ \t]*\n", text):
+        lines = [" ".join(line.split()) for line in part.split("\n")]
+        paragraphs.append("\n".join(line for line in lines if line))
+    return "\n\n".join(part for part in paragraphs if part)
+
+def _split_title(block: str) -> tuple:
+    """(title, rest of block) for one idea block"""
+    match = IDEA_HEADER.match(block)
+    if match is None:
+        return "", block
+    line, _, remainder = block[match.end():].partition("\n")
+    if match.group("bold") or line.lstrip().startswith("**"):
+        # "1. **Title** explanation" - the title is the bold run
+        title, _, tail = line.lstrip().removeprefix("**").partition("**")
+    elif "**" in match.group("prefix"):
+        # "**Thesis Idea 1: Title**"
+        title, _, tail = line.partition("**")
+    else:
+        title, tail = line, ""
+    title = title.strip(" \t*:#").removeprefix("Title:").strip()
+    if not title:
+        # Header on its own line; the title is the next non-empty line
+        lines = remainder.lstrip("\n").split("\n", 1)
+        title, remainder = lines[0].strip(" \t*:#"), lines[1] if len(lines) > 1 else ""
+    return title, (tail.strip(" \t*:") + "\n" + remainder).strip()
+
+def parse_ideas(text: str) -> List[Dict[str, str]]:
+    """Parse generated text once into compact records: title, overview, methodology, contributions"""
+    records = []
+    headers_found = bool(find_idea_headers(text))
+    for block in split_ideas(text):
+        title, body = _split_title(block) if headers_found else ("", block)
+        sections = {name: [] for name in SECTIONS}
+        current = "overview"
+        position = 0
+        for match in SECTION_LABEL.finditer(body):
+            sections[current].append(body[position:match.start()])
+            current = _section_for(match.group("label"))
+            position = match.end()
+        sections[current].append(body[position:])
+
+        record = {"title": _clean(title)}
+        for name in SECTIONS:
+            content = _clean("\n\n".join(sections[name]))
+            if content:
+                record[name] = content
+        records.append(record)
+    return records
+
+SECTION_HEADINGS = {"overview": "Research Overview", "methodology": "Methodology", "contributions": "Expected Contributions"}
+
+def render_ideas_html(ideas: List[Dict[str, str]]) -> str:
+    """Escaped HTML for parsed ideas, in the markup the page styles (.thesis-idea)"""
+    parts = []
+    for number, idea in enumerate(ideas, start=1):
+        title = html.escape(idea.get("title") or "")
+        heading = f"Thesis Idea {number}: {title}" if title else f"Thesis Idea {number}"
+        # An idea with only free text gets no section labels
+        labelled = any(idea.get(name) for name in SECTIONS[1:])
+        sections = []
+        for name in SECTIONS:
+            content = idea.get(name)
+            if not content:
+                continue
+            paragraphs = [html.escape(paragraph).replace("\n", "<br>") for paragraph in content.split("\n\n")]
+            label = f"<strong>{SECTION_HEADINGS[name]}:</strong> " if labelled else ""
+            sections.append(f"<p>{label}{'</p><p>'.join(paragraphs)}</p>")
+        parts.append(f'<div class="thesis-idea"><h3>{heading}</h3>{"".join(sections)}</div>')
+    return "".join(parts)
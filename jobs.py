@@ -0,0 +1,135 @@
+"""
+Asynchronous generation jobs persisted in the state backend
+
+A job is submitted, answered with its id right away, and run by a bounded
+worker pool in the accepting process. Its record lives in the shared state
+backend, so any worker (or a later invocation) can report status and result.
+The owning process heartbeats the record while the job waits or runs, so only
+a job whose owner went away is reported abandoned, and a finished record is
+never overwritten.
+"""
+import asyncio
+import logging
+import secrets
+import time
+from typing import Awaitable, Callable, Optional, Set
+
+from state_backend import StateBackend
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+class JobStore:
+    """Job records keyed by id in the "jobs" namespace; blocking, call from a worker thread"""
+
+    namespace = "jobs"
+
+    def __init__(self, backend: StateBackend, ttl: float = 3600.0, stale_after: float = 120.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_after = stale_after
+
+    def create(self, request: dict) -> dict:
+        now = time.time()
+        job = {
+            "job_id": secrets.token_urlsafe(12),
+            "state": QUEUED,
+            "request": request,
+            "created_at": now,
+            "updated_at": now
+        }
+        self.save(job)
+        return job
+
+    def save(self, job: dict) -> bool:
+        """Persist the job (also its heartbeat); False if its record already reached a final state"""
+        entry = self.backend.get(self.namespace, job["job_id"])
+        if entry is not None and entry[1]["state"] in FINISHED:
+            return False
+        job["updated_at"] = time.time()
+        # A copy, so the process-memory backend does not share the caller's dict
+        self.backend.set(self.namespace, job["job_id"], dict(job), self.ttl)
+        return True
+
+    def get(self, job_id: str) -> Optional[dict]:
+        entry = self.backend.get(self.namespace, job_id)
+        if entry is None:
+            return None
+        job = dict(entry[1])
+        # No heartbeat: the owning process went away (restart, frozen serverless instance).
+        # The verdict is stored so the job cannot flip to another final state later
+        if job["state"] not in FINISHED and time.time() - job["updated_at"] > self.stale_after:
+            job.update({"state": FAILED, "error": "Job was abandoned by its worker"})
+            self.backend.set(self.namespace, job_id, job, self.ttl)
+        return job
+
+class JobQueue:
+    """Runs submitted jobs as background tasks, at most `concurrency` at a time"""
+
+    def __init__(self, concurrency: int = 4, max_pending: int = 100, heartbeat_interval: float = 30.0):
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.heartbeat_interval = heartbeat_interval
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        self.submitted = 0
+        self.rejected = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    def submit(self, run: Callable[[], Awaitable[None]],
+               heartbeat: Optional[Callable[[], Awaitable[object]]] = None) -> bool:
+        """Schedule run(), calling heartbeat() periodically while it waits or runs; False when the queue is full"""
+        if len(self._tasks) >= self.max_pending:
+            self.rejected += 1
+            return False
+        task = asyncio.create_task(self._run(run, heartbeat))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.submitted += 1
+        return True
+
+    async def _run(self, run: Callable[[], Awaitable[None]],
+                   heartbeat: Optional[Callable[[], Awaitable[object]]]) -> None:
+        beat = asyncio.create_task(self._beat(heartbeat)) if heartbeat is not None else None
+        try:
+            async with self._semaphore:
+                try:
+                    await run()
+                except Exception as e:
+                    logger.error(f"❌ Job failed: {str(e)}")
+        finally:
+            if beat is not None:
+                beat.cancel()
+
+    async def _beat(self, heartbeat: Callable[[], Awaitable[object]]) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await heartbeat()
+            except Exception as e:
+                logger.warning(f"⚠️ Job heartbeat failed: {str(e)}")
+
+    async def drain(self, timeout: float) -> None:
+        """Give running jobs a chance to finish on shutdown, then cancel the rest"""
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "concurrency": self.concurrency,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "rejected": self.rejected
+        }
@@ -1,18 +1,41 @@
 import os
+import json
+import asyncio
 import logging
 import httpx
 import time
+from contextlib import aclosing, asynccontextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Dict
-from fastapi import FastAPI, Request, Form, HTTPException, status
-from fastapi.responses import HTMLResponse, JSONResponse, Response
+from typing import AsyncIterator, Awaitable, List, Optional
+from fastapi import FastAPI, Request, Form, HTTPException, Query, status
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from prompt_templates import get_prompt_template, generate_mock_ideas
+from pydantic import BaseModel, Field
+from prompt_templates import get_prompt_template, get_chunk_prompt, get_system_prompt, generate_mock_ideas
 from dotenv import load_dotenv
-from collections import defaultdict
+import groq_client
+from config import settings
+from result_cache import ResultCache, make_cache_key
+from singleflight import SingleFlight, StreamFlight
+from rate_limiter import SharedTokenBucketLimiter, TokenBucketLimiter, route_cost
+from state_backend import create_state_backend
+from static_assets import PrerenderedPage, StaticAssetCache, asset_response
+from swr_cache import SWRCache
+from circuit_breaker import CircuitBreaker, LatencyTracker
+from model_router import ModelRouter, ERROR, OK, THROTTLED, parse_retry_after
+import metrics
+from request_middleware import SecurityTimingMiddleware, timed
+from idea_parser import merge_idea_chunks, parse_ideas, render_ideas_html, split_ideas, take_ideas
+from fallback_engine import get_fallback_engine
+from popularity import IdeaPool, PopularityTracker, normalize_combo
+from jobs import FAILED, FINISHED, RUNNING, SUCCEEDED, JobQueue, JobStore
+from upstream_scheduler import UpstreamScheduler, current_client
+from admission import SHED, AdmissionController
+from history import create_idea_history
+from prefetch import PrefetchStore
 
 # Load environment variables
 load_dotenv()
@@ -24,8 +47,155 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Rate limiting storage
-rate_limit_store: Dict[str, list] = defaultdict(list)
+
+# State shared across worker processes (rate limits, cached results, upstream health)
+state_backend = create_state_backend(
+    settings.STATE_BACKEND,
+    settings.STATE_DB_PATH,
+    bucket_idle_ttl=settings.RATE_LIMIT_IDLE_TTL
+)
+if settings.WORKERS > 1 and state_backend.name == "memory":
+    logger.warning("⚠️ Multiple workers with the memory state backend: limits and caches are per process")
+
+# Offline fallback: the idea index is built once per process, before the first outage
+fallback_engine = get_fallback_engine()
+
+# Result cache for /generate; the persistent tier only makes sense on a shared backend
+result_cache = ResultCache(
+    max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+    ttl=settings.RESULT_CACHE_TTL,
+    store=state_backend if state_backend.name != "memory" else None
+) if settings.RESULT_CACHE_ENABLED else None
+
+# Identical concurrent /generate requests share one upstream call, identical streams one upstream stream
+upstream_flights = SingleFlight()
+stream_flights = StreamFlight()
+
+# Fail fast to the fallback while Groq is degraded; timeouts follow observed latency
+groq_breaker = CircuitBreaker(
+    "groq",
+    failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+    recovery_timeout=settings.CIRCUIT_RECOVERY_TIMEOUT
+)
+groq_latency = LatencyTracker()
+
+# Honor the requested model while it is healthy; fail over to faster models when it is not
+model_router = ModelRouter(
+    settings.ROUTER_FAILOVER_MODELS,
+    slow_latency=settings.ROUTER_SLOW_LATENCY,
+    max_error_rate=settings.ROUTER_MAX_ERROR_RATE,
+    throttle_cooldown=settings.ROUTER_THROTTLE_COOLDOWN
+)
+
+# Every Groq call waits for a fair-share slot within the account's limits (each worker gets its share)
+upstream_scheduler = UpstreamScheduler(
+    max_concurrency=settings.UPSTREAM_MAX_CONCURRENCY,
+    requests_per_minute=settings.GROQ_REQUESTS_PER_MINUTE / max(settings.WORKERS, 1),
+    tokens_per_minute=settings.GROQ_TOKENS_PER_MINUTE / max(settings.WORKERS, 1),
+    weights={"pregen": settings.SCHEDULER_PREGEN_WEIGHT},
+    jitter=settings.SCHEDULER_BACKOFF_JITTER
+)
+
+# Past these limits new upstream work is shed (503) or served by the fallback, so latency stays bounded
+admission = AdmissionController(
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    max_queue_delay=settings.ADMISSION_MAX_QUEUE_DELAY,
+    policy=settings.ADMISSION_POLICY,
+    oldest_wait=upstream_scheduler.oldest_wait,
+    retry_after=settings.ADMISSION_RETRY_AFTER
+)
+
+# Long generations can run as jobs; records live in the state backend so any worker can report them
+job_store = JobStore(state_backend, ttl=settings.JOBS_TTL, stale_after=settings.JOBS_STALE_AFTER)
+job_queue = JobQueue(
+    concurrency=settings.JOBS_CONCURRENCY,
+    max_pending=settings.JOBS_MAX_PENDING,
+    heartbeat_interval=settings.JOBS_STALE_AFTER / 4
+)
+
+# Popular field/type/tone combinations are pre-generated while idle, within a share of Groq's rate limit
+popularity = PopularityTracker(top_k=settings.PREGEN_TOP_K)
+idea_pool = IdeaPool(
+    batches_per_combo=settings.PREGEN_BATCHES_PER_KEY,
+    ttl=settings.PREGEN_TTL,
+    max_combos=settings.PREGEN_TOP_K
+) if settings.PREGEN_ENABLED else None
+
+# One alternate batch per browser session is prefetched so "Generate New Ideas" is answered at once
+prefetches = PrefetchStore(
+    ttl=settings.PREFETCH_TTL,
+    max_sessions=settings.PREFETCH_MAX_SESSIONS
+) if settings.PREFETCH_ENABLED else None
+
+# Generated ideas are kept in a local full-text index, so students can find them again without regenerating
+idea_history = create_idea_history(
+    settings.HISTORY_DB_PATH,
+    max_entries=settings.HISTORY_MAX_ENTRIES,
+    max_age=settings.HISTORY_MAX_AGE_DAYS * 86400
+) if settings.HISTORY_ENABLED else None
+
+# Models in Groq's list that cannot serve chat completions
+NON_CHAT_MODEL_MARKERS = ("whisper", "tts", "guard")
+
+def resolve_model(requested: Optional[str]) -> str:
+    """The requested model if Groq can serve it for chat, otherwise the default model"""
+    requested = (requested or "").strip()
+    if requested in settings.ROUTER_FAILOVER_MODELS:
+        return requested
+    snapshot = models_cache.peek()
+    if requested and snapshot and not any(marker in requested.lower() for marker in NON_CHAT_MODEL_MARKERS):
+        if any(entry.get("id") == requested for entry in snapshot.get("data", [])):
+            return requested
+    return settings.DEFAULT_MODEL
+
+# When the request's latency budget runs out (time.monotonic()); unset for background generations
+generation_deadline: ContextVar[Optional[float]] = ContextVar("generation_deadline", default=None)
+
+def upstream_timeout() -> float:
+    """Total time allowed for one Groq completion, adapted from recent latencies"""
+    return groq_latency.adaptive_timeout(
+        percentile=settings.ADAPTIVE_TIMEOUT_PERCENTILE,
+        multiplier=settings.ADAPTIVE_TIMEOUT_MULTIPLIER,
+        minimum=settings.ADAPTIVE_TIMEOUT_MIN,
+        maximum=REQUEST_TIMEOUT,
+        min_samples=settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES
+    )
+
+def call_timeout() -> float:
+    """Upstream timeout capped by what is left of the latency budget, so a hung Groq times out (and counts
+    as a failure) before the budget's cancellation does"""
+    timeout = upstream_timeout()
+    deadline = generation_deadline.get()
+    if deadline is not None:
+        timeout = min(timeout, max(deadline - time.monotonic() - 0.05, 0.1))
+    return timeout
+
+# Configuration
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1").rstrip("/")  # Point at a local stub for benchmarks
+MAX_REQUESTS_PER_MINUTE = int(os.getenv("MAX_REQUESTS_PER_MINUTE", "60"))  # Increased from 10 to 60
+REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "30"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own process-wide resources: the pooled upstream client and state backend"""
+    pregen_task = None
+    if GROQ_API_KEY:
+        await groq_client.startup(GROQ_BASE_URL)
+        models_cache.refresh_in_background()
+        if idea_pool is not None:
+            await warm_up_popularity()
+            pregen_task = asyncio.create_task(pregeneration_loop())
+    yield
+    if pregen_task is not None:
+        pregen_task.cancel()
+    if prefetches is not None:
+        prefetches.cancel_all()
+    await job_queue.drain(timeout=settings.GENERATION_LATENCY_BUDGET)
+    await groq_client.shutdown()
+    state_backend.close()
+    if idea_history is not None:
+        idea_history.close()
 
 # Initialize FastAPI with production settings
 app = FastAPI(
@@ -33,7 +203,8 @@ app = FastAPI(
     description="AI-powered thesis idea generator for academic research",
     version="1.0.0",
     docs_url="/docs" if not os.getenv('VERCEL') else None,
-    redoc_url="/redoc" if not os.getenv('VERCEL') else None
+    redoc_url="/redoc" if not os.getenv('VERCEL') else None,
+    lifespan=lifespan
 )
 
 # Security middleware
@@ -57,70 +228,74 @@ static_directory = os.path.join(os.path.dirname(__file__), "static")
 templates_directory = os.path.join(os.path.dirname(__file__), "templates")
 templates = Jinja2Templates(directory=templates_directory)
 
-# Mount static files (required for url_for to work)
-app.mount("/static", StaticFiles(directory=static_directory), name="static")
+# Static assets are read once and served from memory with precompressed variants
+static_assets = StaticAssetCache(static_directory, max_age=settings.STATIC_CACHE_MAX_AGE)
+templates.env.globals["static_url"] = static_assets.url_for
 
-# Configuration
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_BASE_URL = "https://api.groq.com/openai/v1"
-MAX_REQUESTS_PER_MINUTE = int(os.getenv("MAX_REQUESTS_PER_MINUTE", "60"))  # Increased from 10 to 60
-REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "30"))
+# The landing page is identical for every visitor: render it once (and on template edits), not per request
+index_page = PrerenderedPage(templates.env, "index.html", os.path.join(templates_directory, "index.html"))
 
-# Rate limiting function
-def check_rate_limit(client_ip: str) -> bool:
-    """Check if client has exceeded rate limit"""
-    now = time.time()
-    minute_ago = now - 60
-    
-    # Clean old requests
-    rate_limit_store[client_ip] = [
-        req_time for req_time in rate_limit_store[client_ip] 
-        if req_time > minute_ago
-    ]
-    
-    # Check if under limit
-    if len(rate_limit_store[client_ip]) >= MAX_REQUESTS_PER_MINUTE:
-        return False
-    
-    # Add current request
-    rate_limit_store[client_ip].append(now)
-    return True
+# Rate limiting: per-IP token buckets, in process or shared through the state backend
+if settings.SHARED_RATE_LIMIT:
+    rate_limiter = SharedTokenBucketLimiter(
+        state_backend,
+        rate_per_minute=MAX_REQUESTS_PER_MINUTE,
+        burst=settings.RATE_LIMIT_BURST or None
+    )
+else:
+    rate_limiter = TokenBucketLimiter(
+        rate_per_minute=MAX_REQUESTS_PER_MINUTE,
+        burst=settings.RATE_LIMIT_BURST or None,
+        idle_ttl=settings.RATE_LIMIT_IDLE_TTL,
+        max_keys=settings.RATE_LIMIT_MAX_KEYS
+    )
 
-# Security headers middleware
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next):
-    start_time = time.time()
-    
-    # Rate limiting
-    client_ip = request.client.host if request.client else "unknown"
-    if not check_rate_limit(client_ip):
+async def check_rate_limit(client_ip: str, method: str, path: str) -> tuple:
+    """Check if client has exceeded rate limit; returns (allowed, retry_after_seconds)"""
+    cost = route_cost(method, path, settings.RATE_LIMIT_LIGHT_COST)
+    if cost is None:
+        return True, 0.0
+    if rate_limiter.shared:
+        return await asyncio.to_thread(rate_limiter.check, client_ip, cost)
+    return rate_limiter.check(client_ip, cost)
+
+async def charge_rate_limit(client_ip: str, extra_cost: float) -> None:
+    """Charge work beyond the one token the middleware took (batch items); 429 when the bucket cannot cover it"""
+    # Like the upstream budgets, a cost larger than the whole bucket is admitted once the bucket is full
+    extra_cost = min(extra_cost, rate_limiter.capacity - 1)
+    if extra_cost <= 0:
+        return
+    if rate_limiter.shared:
+        allowed, retry_after = await asyncio.to_thread(rate_limiter.check, client_ip, extra_cost)
+    else:
+        allowed, retry_after = rate_limiter.check(client_ip, extra_cost)
+    if not allowed:
         logger.warning(f"Rate limit exceeded for IP: {client_ip}")
-        return JSONResponse(
+        metrics.rate_limit_rejections.inc()
+        raise HTTPException(
             status_code=429,
-            content={"error": "Rate limit exceeded. Please try again later."}
+            detail="Rate limit exceeded. Please try again later.",
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
         )
-    
-    response = await call_next(request)
-    
-    # Add security headers
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    response.headers["Content-Security-Policy"] = (
-        "default-src 'self'; "
-        "style-src 'self' 'unsafe-inline' https://cdnjs.cloudflare.com https://fonts.googleapis.com; "
-        "font-src 'self' https://fonts.gstatic.com; "
-        "script-src 'self' 'unsafe-inline'; "
-        "img-src 'self' data:; "
-        "connect-src 'self' https://api.groq.com;"
-    )
-    
-    # Add performance headers
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    
-    return response
+
+async def record_upstream_health(ok: bool, detail: str) -> None:
+    """Publish the latest upstream outcome so every worker reports the same health"""
+    snapshot = {"ok": ok, "detail": detail, "checked_at": datetime.utcnow().isoformat()}
+    try:
+        await asyncio.to_thread(state_backend.set, "upstream", "groq", snapshot, 600)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not record upstream health: {str(e)}")
+
+async def get_upstream_health() -> Optional[dict]:
+    """Latest upstream outcome recorded by any worker"""
+    try:
+        entry = await asyncio.to_thread(state_backend.get, "upstream", "groq")
+    except Exception:
+        return None
+    return entry[1] if entry else None
+
+# Rate limiting, security headers, request metrics and Server-Timing, as pure ASGI (outermost)
+app.add_middleware(SecurityTimingMiddleware, check_rate_limit=check_rate_limit)
 
 # Health check endpoints
 @app.get("/health")
@@ -150,15 +325,31 @@ async def readiness_check():
         content={
             "ready": all_ready,
             "checks": checks,
+            "state_backend": state_backend.name,
+            "upstream": await get_upstream_health(),
+            "circuit": groq_breaker.stats(),
+            "upstream_latency": {**groq_latency.stats(), "timeout": round(upstream_timeout(), 2)},
+            "model_router": model_router.stats(),
+            "fallback_engine": fallback_engine.stats(),
+            "jobs": job_queue.stats(),
+            "upstream_scheduler": upstream_scheduler.stats(),
+            "admission": admission.stats(),
+            "prefetch": prefetches.stats() if prefetches is not None else None,
+            "history": await asyncio.to_thread(idea_history.stats) if idea_history is not None else None,
+            "pregeneration": {
+                **idea_pool.stats(),
+                "hot": [[*combo, count] for combo, count in popularity.hottest(settings.PREGEN_MIN_HITS)]
+            } if idea_pool is not None else None,
             "timestamp": datetime.utcnow().isoformat()
         }
     )
 
-@app.get("/", response_class=HTMLResponse)
+@app.api_route("/", methods=["GET", "HEAD"], response_class=HTMLResponse)
 async def read_root(request: Request):
-    """Main application page"""
+    """Main application page, served prerendered and precompressed"""
     try:
-        return templates.TemplateResponse("index.html", {"request": request})
+        # no-cache: browsers revalidate with the ETag, so a deploy is picked up on the next visit
+        return asset_response(index_page.current(), request.headers, "no-cache")
     except Exception as e:
         logger.error(f"Error serving main page: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -176,139 +367,325 @@ async def debug_static():
         "script_dir": os.path.dirname(__file__)
     }
 
-@app.get("/static/{file_path:path}")
-async def serve_static_files(file_path: str):
-    """Serve static files with proper content types and security"""
-    try:
-        full_path = os.path.join(static_directory, file_path)
-        
-        if not os.path.exists(full_path):
-            raise HTTPException(status_code=404, detail="File not found")
-        
-        # Security check - prevent directory traversal
-        if not os.path.abspath(full_path).startswith(os.path.abspath(static_directory)):
-            raise HTTPException(status_code=403, detail="Access denied")
-        
-        # Determine content type
-        content_type = "text/plain"
-        if file_path.endswith('.css'):
-            content_type = "text/css"
-        elif file_path.endswith('.js'):
-            content_type = "application/javascript"
-        elif file_path.endswith('.png'):
-            content_type = "image/png"
-        elif file_path.endswith('.jpg') or file_path.endswith('.jpeg'):
-            content_type = "image/jpeg"
-        elif file_path.endswith('.gif'):
-            content_type = "image/gif"
-        elif file_path.endswith('.svg'):
-            content_type = "image/svg+xml"
-        
-        # Read file
-        if content_type.startswith('text/') or content_type == 'application/javascript':
-            with open(full_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        else:
-            with open(full_path, 'rb') as f:
-                content = f.read()
-        
-        # Create response with caching headers
-        response = Response(content=content, media_type=content_type)
-        response.headers["Cache-Control"] = "public, max-age=86400"  # 24 hours
-        response.headers["ETag"] = f'"{hash(content)}"'
-        
-        return response
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error serving static file {file_path}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error serving file")
+@app.api_route("/static/{file_path:path}", methods=["GET", "HEAD"])
+async def serve_static_files(request: Request, file_path: str):
+    """Serve static files from memory with precompressed variants and conditional requests"""
+    found = static_assets.lookup(file_path)
+    if found is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    asset, immutable = found
+    return static_assets.respond(asset, request.headers, immutable)
 
-async def call_groq_api(prompt: str, num_ideas: int = 2, tone: str = "academic") -> dict:
+class GroqStreamError(Exception):
+    """Raised when a streaming Groq completion cannot be started or is interrupted"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        # False when another model would fail the same way (bad key, open circuit)
+        self.retryable = retryable
+
+def completion_token_budget(num_ideas: int) -> int:
+    """max_tokens proportional to the number of ideas requested"""
+    return settings.COMPLETION_BASE_TOKENS + settings.COMPLETION_TOKENS_PER_IDEA * num_ideas
+
+def chunk_sizes(num_ideas: int, chunk_size: int) -> list:
+    """Split a request into chunks of at most chunk_size ideas (10 -> [2, 2, 2, 2, 2])"""
+    if chunk_size <= 0 or num_ideas <= chunk_size:
+        return [num_ideas]
+    sizes = [chunk_size] * (num_ideas // chunk_size)
+    if num_ideas % chunk_size:
+        sizes.append(num_ideas % chunk_size)
+    return sizes
+
+def build_groq_request(prompt: str, num_ideas: int, tone: str, model: str) -> tuple:
+    """Build the headers and chat-completion payload for a Groq call"""
+    headers = {
+        "Authorization": f"Bearer {GROQ_API_KEY}",
+        "Content-Type": "application/json",
+        "User-Agent": "ThesisBrainstorming/1.0"
+    }
+    
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": get_system_prompt(num_ideas, tone)},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.7,
+        "max_tokens": completion_token_budget(num_ideas),
+        "top_p": 0.9
+    }
+    return headers, payload
+
+def estimated_tokens(payload: dict) -> int:
+    """Prompt tokens (about 4 characters each) plus the completion budget"""
+    return sum(len(message["content"]) for message in payload["messages"]) // 4 + payload["max_tokens"]
+
+async def acquire_upstream_slot(model: str, payload: dict):
+    """Wait in the fair-share queue for permission to call Groq"""
+    with timed("queue"):
+        lease = await upstream_scheduler.acquire(current_client.get(), model, estimated_tokens(payload))
+    metrics.upstream_queue_wait.observe(lease.waited)
+    admission.observe_wait(lease.waited)
+    return lease
+
+def usage_tokens(usage: Optional[dict]) -> Optional[int]:
+    return usage.get("total_tokens") if isinstance(usage, dict) else None
+
+async def call_groq_api(prompt: str, num_ideas: int = 2, tone: str = "academic",
+                        model: str = settings.DEFAULT_MODEL) -> dict:
     """Call Groq API with proper error handling and timeouts"""
     if not GROQ_API_KEY:
         logger.warning("No GROQ_API_KEY provided")
-        return {"status": "error", "message": "API key not configured"}
+        return {"status": "error", "message": "API key not configured", "retryable": False}
+    
+    # A failover attempt with no budget left would only time out and blame a healthy model.
+    # Checked before the breaker, which would otherwise hand out (and lose) its half-open probe
+    deadline = generation_deadline.get()
+    if deadline is not None and deadline - time.monotonic() <= 0.1:
+        return {"status": "error", "message": "Latency budget exceeded", "retryable": False}
     
+    if not groq_breaker.allow_request():
+        logger.warning("⚡ Groq circuit open, skipping upstream call")
+        return {"status": "error", "message": "API temporarily bypassed (circuit open)", "retryable": False}
+    
+    lease = None
+    # Tokens to settle the lease with. Without a 200 there is no sign the model ran (throttled, failed,
+    # timed out or cancelled before answering), so the reservation is handed back
+    used_tokens: Optional[int] = 0
     try:
-        logger.info(f"Calling Groq API for {num_ideas} ideas with {tone} tone")
+        logger.info(f"Calling Groq API ({model}) for {num_ideas} ideas with {tone} tone")
         
-        system_prompt = f"""You are an expert academic researcher and thesis advisor. Generate {num_ideas} detailed, innovative thesis ideas based on the given prompt. 
-
-For each thesis idea, provide:
-1. A clear, compelling title
-2. A brief research overview (2-3 sentences)
-3. Suggested methodology
-4. Expected contributions to the field
-
-Use a {tone} tone and ensure each idea is:
-- Specific and innovative
-- Academically rigorous
-- Feasible as a research project
-- Relevant to current academic discourse
-
-Format each idea clearly with numbers and clear sections."""
-
-        headers = {
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json",
-            "User-Agent": "ThesisBrainstorming/1.0"
-        }
+        headers, payload = build_groq_request(prompt, num_ideas, tone, model)
         
-        payload = {
-            "model": "llama-3.3-70b-versatile",
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.7,
-            "max_tokens": 1500,
-            "top_p": 0.9
-        }
-        
-        async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-            response = await client.post(
-                f"{GROQ_BASE_URL}/chat/completions",
-                headers=headers,
-                json=payload
+        client = groq_client.get_client()
+        lease = await acquire_upstream_slot(model, payload)
+        started = time.monotonic()
+        metrics.upstream_in_flight.inc()
+        try:
+            response = await asyncio.wait_for(
+                client.post(
+                    f"{GROQ_BASE_URL}/chat/completions",
+                    headers=headers,
+                    json=payload
+                ),
+                timeout=call_timeout()
             )
+        finally:
+            metrics.upstream_in_flight.dec()
+            upstream_scheduler.release(lease)
+        
+        logger.info(f"Groq API response status: {response.status_code}")
+        metrics.upstream_responses.inc(model=model, status=response.status_code)
+        
+        # Server errors count towards opening the circuit; 429s are per model and handled by the router
+        if response.status_code >= 500:
+            groq_breaker.record_failure()
+        elif response.status_code != 429:
+            groq_breaker.record_success()
+        
+        if response.status_code == 200:
+            elapsed = time.monotonic() - started
+            groq_latency.record(elapsed)
+            model_router.record(model, elapsed, OK)
+            metrics.upstream_duration.observe(elapsed, model=model)
+            result = response.json()
+            metrics.record_usage(model, result.get("usage"))
+            # Without a usage report the estimate stands
+            used_tokens = usage_tokens(result.get("usage"))
+            content = result["choices"][0]["message"]["content"]
+            logger.info(f"✅ Groq API SUCCESS - Generated {len(content)} characters")
             
-            logger.info(f"Groq API response status: {response.status_code}")
-            
-            if response.status_code == 200:
-                result = response.json()
-                content = result["choices"][0]["message"]["content"]
-                logger.info(f"✅ Groq API SUCCESS - Generated {len(content)} characters")
-                
-                return {
-                    "status": "success",
-                    "ideas": content,
-                    "api_used": "Groq (Live API)",
-                    "model": payload["model"]
-                }
-            elif response.status_code == 401:
-                logger.error("❌ Groq API: Invalid API key")
-                return {"status": "error", "message": "Invalid API key"}
-            elif response.status_code == 429:
-                logger.error("❌ Groq API: Rate limit exceeded")
-                return {"status": "error", "message": "API rate limit exceeded. Please try again later."}
-            elif response.status_code == 503:
-                logger.error("❌ Groq API: Service unavailable")
-                return {"status": "error", "message": "API service temporarily unavailable"}
-            else:
-                logger.error(f"❌ Groq API error: {response.status_code}")
-                return {"status": "error", "message": f"API error: {response.status_code}"}
+            return {
+                "status": "success",
+                "ideas": content,
+                "api_used": "Groq (Live API)",
+                "model": payload["model"]
+            }
+        elif response.status_code == 401:
+            logger.error("❌ Groq API: Invalid API key")
+            return {"status": "error", "message": "Invalid API key", "retryable": False}
+        elif response.status_code == 429:
+            # A per-model throttle says nothing about Groq's health, but a half-open probe must be handed back
+            groq_breaker.record_cancelled()
+            retry_after = parse_retry_after(response.headers.get("retry-after"))
+            model_router.record(model, None, THROTTLED, retry_after)
+            upstream_scheduler.backoff(model, retry_after or settings.ROUTER_THROTTLE_COOLDOWN)
+            logger.error(f"❌ Groq API: Rate limit exceeded for {model}")
+            return {
+                "status": "error",
+                "message": "API rate limit exceeded. Please try again later.",
+                "retry_after": retry_after
+            }
+        elif response.status_code == 503:
+            model_router.record(model, None, ERROR)
+            logger.error("❌ Groq API: Service unavailable")
+            return {"status": "error", "message": "API service temporarily unavailable"}
+        else:
+            model_router.record(model, None, ERROR)
+            logger.error(f"❌ Groq API error: {response.status_code}")
+            return {"status": "error", "message": f"API error: {response.status_code}"}
                 
-    except httpx.TimeoutException:
+    except asyncio.CancelledError:
+        # The client left: the pooled connection is released here; upstream slowness surfaces as a timeout
+        groq_breaker.record_cancelled()
+        metrics.upstream_cancelled.inc(model=model)
+        raise
+    except (httpx.TimeoutException, asyncio.TimeoutError):
+        groq_breaker.record_failure()
+        model_router.record(model, None, ERROR)
+        metrics.upstream_responses.inc(model=model, status="timeout")
         logger.error("❌ Groq API timeout")
         return {"status": "error", "message": "API request timed out"}
     except httpx.RequestError as e:
+        groq_breaker.record_failure()
+        model_router.record(model, None, ERROR)
+        metrics.upstream_responses.inc(model=model, status="connection_error")
         logger.error(f"❌ Groq API request error: {str(e)}")
         return {"status": "error", "message": "API connection failed"}
     except Exception as e:
+        # No-op if the response was already recorded (the breaker has left half-open by then)
+        groq_breaker.record_cancelled()
         logger.error(f"❌ Groq API unexpected error: {str(e)}")
         return {"status": "error", "message": "Unexpected API error"}
+    finally:
+        if lease is not None:
+            upstream_scheduler.settle(lease, used_tokens)
+
+async def call_groq_routed(prompt: str, num_ideas: int, tone: str, model: str) -> dict:
+    """Call Groq with the resolved model, failing over to healthier or faster models"""
+    result = {"status": "error", "message": "No model available"}
+    candidate = model
+    for candidate in model_router.candidates(model)[:max(1, settings.ROUTER_MAX_ATTEMPTS)]:
+        result = await call_groq_api(prompt, num_ideas, tone, candidate)
+        if result["status"] == "success":
+            break
+        if not result.get("retryable", True):
+            return result
+    
+    # Every model was throttled: a short Retry-After is waited out in the scheduler rather than falling back
+    if "retry_after" in result and (result["retry_after"] or float("inf")) <= settings.SCHEDULER_MAX_RETRY_WAIT:
+        logger.info(f"⏳ Retrying {candidate} after Retry-After of {result['retry_after']}s")
+        result = await call_groq_api(prompt, num_ideas, tone, candidate)
+    
+    if result["status"] == "success":
+        if candidate != model:
+            model_router.record_failover(model, candidate)
+        result["requested_model"] = model
+    return result
+
+async def stream_groq_api(headers: dict, payload: dict, info: Optional[dict] = None) -> AsyncIterator[str]:
+    """Stream content deltas from a Groq chat completion (stream=true); `info` gets the queue wait"""
+    # Checked before the breaker, as in call_groq_api
+    deadline = generation_deadline.get()
+    if deadline is not None and deadline - time.monotonic() <= 0.1:
+        raise GroqStreamError("Latency budget exceeded", retryable=False)
+    if not groq_breaker.allow_request():
+        logger.warning("⚡ Groq circuit open, skipping upstream stream")
+        raise GroqStreamError("API temporarily bypassed (circuit open)", retryable=False)
+    
+    model = payload["model"]
+    lease = await acquire_upstream_slot(model, payload)
+    if info is not None:
+        info["queue_wait"] = lease.waited
+    metrics.upstream_in_flight.inc()
+    usage = None
+    # Once Groq answered 200 the model is producing (and billing) tokens, even if the stream is abandoned:
+    # those are charged as the prompt plus what arrived. Before that the whole reservation is handed back
+    answered = False
+    received_chars = 0
+    try:
+        started = time.monotonic()
+        client = groq_client.get_client()
+        async with client.stream(
+            "POST",
+            f"{GROQ_BASE_URL}/chat/completions",
+            headers=headers,
+            json={**payload, "stream": True}
+        ) as response:
+            logger.info(f"Groq API stream status: {response.status_code}")
+            metrics.upstream_responses.inc(model=model, status=response.status_code)
+            if response.status_code >= 500:
+                groq_breaker.record_failure()
+            elif response.status_code != 429:
+                groq_breaker.record_success()
+            if response.status_code == 429:
+                groq_breaker.record_cancelled()
+                retry_after = parse_retry_after(response.headers.get("retry-after"))
+                model_router.record(model, None, THROTTLED, retry_after)
+                upstream_scheduler.backoff(model, retry_after or settings.ROUTER_THROTTLE_COOLDOWN)
+            elif response.status_code != 200 and response.status_code != 401:
+                model_router.record(model, None, ERROR)
+            if response.status_code != 200:
+                raise GroqStreamError(f"API error: {response.status_code}", retryable=response.status_code != 401)
+            answered = True
+            
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                # Groq reports usage on the final chunk under x_groq
+                usage = chunk.get("usage") or chunk.get("x_groq", {}).get("usage") or usage
+                metrics.record_usage(model, chunk.get("usage") or chunk.get("x_groq", {}).get("usage"))
+                choices = chunk.get("choices") or [{}]
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    received_chars += len(delta)
+                    yield delta
+            elapsed = time.monotonic() - started
+            model_router.record(model, elapsed, OK)
+            metrics.upstream_duration.observe(elapsed, model=model)
+    except (asyncio.CancelledError, GeneratorExit):
+        groq_breaker.record_cancelled()
+        metrics.upstream_cancelled.inc(model=model)
+        raise
+    except httpx.TimeoutException:
+        groq_breaker.record_failure()
+        model_router.record(model, None, ERROR)
+        metrics.upstream_responses.inc(model=model, status="timeout")
+        logger.error("❌ Groq API stream timeout")
+        raise GroqStreamError("API request timed out")
+    except httpx.RequestError as e:
+        groq_breaker.record_failure()
+        model_router.record(model, None, ERROR)
+        metrics.upstream_responses.inc(model=model, status="connection_error")
+        logger.error(f"❌ Groq API stream request error: {str(e)}")
+        raise GroqStreamError("API connection failed")
+    except (ValueError, KeyError) as e:
+        logger.error(f"❌ Groq API stream parse error: {str(e)}")
+        raise GroqStreamError("Malformed stream from API")
+    finally:
+        metrics.upstream_in_flight.dec()
+        upstream_scheduler.release(lease)
+        if usage:
+            used_tokens = usage_tokens(usage)
+        elif answered:
+            used_tokens = estimated_tokens(payload) - payload["max_tokens"] + received_chars // 4
+        else:
+            used_tokens = 0
+        upstream_scheduler.settle(lease, used_tokens)
+
+async def first_delta_within(deltas: AsyncIterator[str], deadline: float) -> AsyncIterator[str]:
+    """Relay deltas, raising asyncio.TimeoutError if the first one has not arrived by the deadline"""
+    try:
+        first = await asyncio.wait_for(deltas.__anext__(), timeout=max(deadline - time.monotonic(), 0.0))
+    except StopAsyncIteration:
+        return
+    yield first
+    async for delta in deltas:
+        yield delta
+
+async def stream_mock_ideas(research_field: str, num_ideas: int, tone: str, thesis_type: str) -> AsyncIterator[str]:
+    """Stream enhanced mock ideas paragraph by paragraph, like the live API"""
+    mock_ideas = generate_mock_ideas(research_field, num_ideas, tone, thesis_type)
+    paragraphs = mock_ideas.split("\n\n")
+    for i, paragraph in enumerate(paragraphs):
+        yield paragraph + ("\n\n" if i < len(paragraphs) - 1 else "")
+        await asyncio.sleep(0)
 
 async def fallback_to_mock(research_field: str, num_ideas: int, tone: str, thesis_type: str) -> dict:
     """Enhanced fallback with intelligent mock data"""
@@ -328,6 +705,392 @@ async def fallback_to_mock(research_field: str, num_ideas: int, tone: str, thesi
             "message": "Both API and fallback system failed"
         }
 
+def validate_thesis_options(thesis_type: str, tone: str) -> None:
+    """Reject unknown thesis types and tones"""
+    valid_thesis_types = ["argumentative", "analytical", "expository", "comparative"]
+    valid_tones = ["academic", "persuasive", "neutral", "critical"]
+    
+    if thesis_type not in valid_thesis_types:
+        raise HTTPException(status_code=400, detail="Invalid thesis type")
+    if tone not in valid_tones:
+        raise HTTPException(status_code=400, detail="Invalid tone")
+
+OUTPUT_FORMATS = ("markdown", "json", "html")
+
+def validate_output_format(output_format: str) -> None:
+    """Reject unknown response formats"""
+    if output_format not in OUTPUT_FORMATS:
+        raise HTTPException(status_code=400, detail="Invalid format")
+
+def with_structured(result: dict) -> dict:
+    """Parse the ideas once and keep the records alongside the raw text"""
+    if result.get("status") == "success" and "structured" not in result:
+        result["structured"] = parse_ideas(result["ideas"])
+    return result
+
+def format_result(result: dict, output_format: str) -> dict:
+    """Shape a result for the requested format: raw markdown, parsed records or rendered HTML"""
+    if result.get("status") != "success":
+        return result
+    structured = with_structured(result)["structured"]
+    shaped = {key: value for key, value in result.items() if key != "structured"}
+    if output_format == "json":
+        shaped["ideas"] = structured
+    elif output_format == "html":
+        shaped["ideas"] = render_ideas_html(structured)
+    shaped["format"] = output_format
+    return shaped
+
+async def call_groq_api_chunked(research_field: str, num_ideas: int, tone: str, thesis_type: str, model: str) -> dict:
+    """Generate a large request as concurrent smaller completions and merge them"""
+    sizes = chunk_sizes(num_ideas, settings.GENERATION_CHUNK_SIZE)
+    if len(sizes) == 1:
+        with timed("prompt"):
+            prompt = get_prompt_template(research_field, num_ideas, tone, thesis_type)
+        return await call_groq_routed(prompt, num_ideas, tone, model)
+    
+    logger.info(f"🧩 Splitting {num_ideas} ideas into {len(sizes)} parallel completions")
+    with timed("prompt"):
+        prompts = [
+            get_chunk_prompt(research_field, size, tone, thesis_type, i, len(sizes), num_ideas)
+            for i, size in enumerate(sizes)
+        ]
+    tasks = [
+        asyncio.ensure_future(call_groq_routed(prompt, size, tone, model))
+        for prompt, size in zip(prompts, sizes)
+    ]
+    try:
+        # Stop spending upstream budget as soon as any chunk fails
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            if result["status"] != "success":
+                return result
+    finally:
+        for task in tasks:
+            task.cancel()
+    
+    results = [task.result() for task in tasks]
+    # Chunks may have been routed to different models
+    models_used = list(dict.fromkeys(result["model"] for result in results))
+    return {
+        "status": "success",
+        "ideas": merge_idea_chunks([result["ideas"] for result in results]),
+        "api_used": "Groq (Live API)",
+        "model": ", ".join(models_used),
+        "requested_model": model
+    }
+
+async def record_history(result: dict, research_field: str, thesis_type: str, tone: str) -> None:
+    """Add the ideas of a Groq result to the searchable history"""
+    if idea_history is None or result.get("status") != "success":
+        return
+    try:
+        await asyncio.to_thread(
+            idea_history.add, research_field, thesis_type, tone, result["model"], with_structured(result)["structured"]
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Could not record ideas in the history: {str(e)}")
+
+async def generate_and_cache(cache_key: str, research_field: str, num_ideas: int, tone: str, thesis_type: str, model: str) -> dict:
+    """Call Groq once and store a successful result in the result cache"""
+    result = await call_groq_api_chunked(research_field, num_ideas, tone, thesis_type, model)
+    if GROQ_API_KEY:
+        await record_upstream_health(result["status"] == "success", result.get("message", "ok"))
+    # Failover answers are not cached, so the next request tries the requested model again
+    if result["status"] == "success" and result_cache and result["model"] == model:
+        await result_cache.set(cache_key, with_structured(result))
+    await record_history(result, research_field, thesis_type, tone)
+    return result
+
+# Upstream calls spent on pre-generation, shared by all workers on a shared state backend
+pregen_budget = SharedTokenBucketLimiter(
+    state_backend,
+    rate_per_minute=settings.PREGEN_BUDGET_SHARE * settings.GROQ_REQUESTS_PER_MINUTE
+    / (1 if state_backend.name != "memory" else max(settings.WORKERS, 1)),
+    burst=len(chunk_sizes(settings.PREGEN_NUM_IDEAS, settings.GENERATION_CHUNK_SIZE))
+)
+
+# Upstream calls spent on speculative prefetch, shared by all workers on a shared state backend
+prefetch_budget = SharedTokenBucketLimiter(
+    state_backend,
+    rate_per_minute=settings.PREFETCH_BUDGET_SHARE * settings.GROQ_REQUESTS_PER_MINUTE
+    / (1 if state_backend.name != "memory" else max(settings.WORKERS, 1)),
+    burst=len(chunk_sizes(settings.MAX_IDEAS, settings.GENERATION_CHUNK_SIZE))
+)
+
+def parse_warmup_entry(entry: str) -> tuple:
+    """'field' or 'field/thesis_type/tone' -> normalized combo"""
+    parts = [part.strip() for part in entry.split("/")]
+    field = parts[0]
+    thesis_type = parts[1] if len(parts) > 1 and parts[1] else "argumentative"
+    tone = parts[2] if len(parts) > 2 and parts[2] else "academic"
+    return normalize_combo(field, thesis_type, tone)
+
+async def warm_up_popularity() -> None:
+    """Seed the popularity sketch from configured combos and the last persisted top-k"""
+    try:
+        entry = await asyncio.to_thread(state_backend.get, "popularity", "top")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not load popularity snapshot: {str(e)}")
+        entry = None
+    if entry:
+        popularity.restore(entry[1])
+    for warmup in settings.PREGEN_WARMUP:
+        combo = parse_warmup_entry(warmup)
+        if combo[1] in settings.VALID_THESIS_TYPES and combo[2] in settings.VALID_TONES:
+            popularity.record(combo, settings.PREGEN_MIN_HITS)
+        else:
+            logger.warning(f"⚠️ Ignoring invalid PREGEN_WARMUP entry '{warmup}'")
+    hot = popularity.hottest(settings.PREGEN_MIN_HITS)
+    if hot:
+        logger.info(f"🔥 Pre-generation warm-up with {len(hot)} popular combinations")
+
+def upstream_idle() -> bool:
+    """No user request or Groq call in progress in this worker"""
+    return metrics.http_in_flight.value() <= 0 and metrics.upstream_in_flight.value() <= 0
+
+async def pregenerate_once() -> bool:
+    """Fill the pool for the hottest combination that needs it; returns True if Groq was called"""
+    hot = [combo for combo, _ in popularity.hottest(settings.PREGEN_MIN_HITS)]
+    idea_pool.drop(set(hot))
+    if not upstream_idle() or groq_breaker.state != "closed":
+        return False
+    combo = next((combo for combo in hot if idea_pool.needs(combo)), None)
+    if combo is None:
+        return False
+    allowed, _ = await asyncio.to_thread(pregen_budget.check, "pregen", pregen_budget.capacity)
+    if not allowed:
+        return False
+    
+    field, thesis_type, tone = combo
+    num_ideas = settings.PREGEN_NUM_IDEAS
+    model = settings.DEFAULT_MODEL
+    logger.info(f"🔥 Pre-generating {num_ideas} ideas for '{field}' ({thesis_type}, {tone})")
+    result = await call_groq_api_chunked(field, num_ideas, tone, thesis_type, model)
+    # Failover answers or short lists could not stand in for a default-model response
+    if result["status"] == "success" and result["model"] == model and len(split_ideas(result["ideas"])) >= num_ideas:
+        idea_pool.add(combo, num_ideas, model, result)
+        metrics.generations.inc(endpoint="pregenerate", source="groq")
+    return True
+
+async def pregeneration_loop() -> None:
+    """Background task: pre-generate popular combinations while the worker is idle"""
+    current_client.set("pregen")
+    while True:
+        await asyncio.sleep(settings.PREGEN_INTERVAL)
+        try:
+            await pregenerate_once()
+            await asyncio.to_thread(state_backend.set, "popularity", "top", popularity.snapshot(), 7 * 86400)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Pre-generation failed: {str(e)}")
+
+def take_pooled(combo: tuple, num_ideas: int, model: str) -> Optional[dict]:
+    """A pre-generated result trimmed to num_ideas, if the pool has one for this request"""
+    if idea_pool is None or model != settings.DEFAULT_MODEL:
+        return None
+    entry = idea_pool.take(combo, num_ideas, model)
+    if entry is None:
+        return None
+    _, result = entry
+    return {**result, "ideas": take_ideas(result["ideas"], num_ideas)}
+
+async def prefetch_alternate(research_field: str, num_ideas: int, tone: str, thesis_type: str, model: str) -> Optional[dict]:
+    """Generate the batch a regenerate of this request would ask for; None if over budget or failed"""
+    cost = len(chunk_sizes(num_ideas, settings.GENERATION_CHUNK_SIZE))
+    allowed, _ = await asyncio.to_thread(prefetch_budget.check, "prefetch", cost)
+    if not allowed:
+        return None
+    logger.info(f"🔮 Prefetching the next {num_ideas} ideas for '{research_field}'")
+    result = await call_groq_api_chunked(research_field, num_ideas, tone, thesis_type, model)
+    if result["status"] != "success":
+        return None
+    metrics.generations.inc(endpoint="prefetch", source="groq")
+    return result
+
+def schedule_prefetch(
+    session_id: Optional[str], field_of_study: str, num_ideas: int, thesis_type: str, tone: str, model: str
+) -> None:
+    """Start prefetching the next batch for this session's request in the background, from spare capacity only"""
+    if prefetches is None or not session_id or not GROQ_API_KEY:
+        return
+    model = resolve_model(model)
+    cache_key = make_cache_key(field_of_study, num_ideas, thesis_type, tone, model)
+    if prefetches.has(session_id, cache_key):
+        return
+    # Speculative calls never queue in front of real requests
+    if (groq_breaker.state != "closed" or upstream_scheduler.oldest_wait() > 0
+            or admission.in_flight >= admission.max_in_flight // 2):
+        return
+    # Fire and forget: the budget check runs inside the task, off the response path
+    prefetches.start(
+        session_id, cache_key,
+        lambda: prefetch_alternate(field_of_study, num_ideas, tone, thesis_type, model)
+    )
+
+async def take_prefetched(session_id: Optional[str], cache_key: str) -> Optional[dict]:
+    """The batch prefetched for this session's regenerate, waiting for it if still running"""
+    if prefetches is None or not session_id:
+        return None
+    task = prefetches.take(session_id, cache_key)
+    if task is None or task.cancelled():
+        return None
+    try:
+        with timed("prefetch"):
+            result = await task
+    except Exception:
+        # Already logged by the store
+        result = None
+    prefetches.record_outcome(result is not None)
+    return result
+
+async def wait_for_disconnect(request: Request) -> None:
+    """Return once the client has closed the connection (the request body is already read)"""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+async def unless_disconnected(request: Request, work: Awaitable, endpoint: str):
+    """Await work, cancelling it and its upstream calls if the client goes away first; None then"""
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+    if task.done():
+        return task.result()
+    
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    metrics.client_disconnects.inc(endpoint=endpoint)
+    logger.info(f"🔌 Client disconnected, cancelled {endpoint} request")
+    return None
+
+async def cancel_on_disconnect(events: AsyncIterator[str], endpoint: str) -> AsyncIterator[str]:
+    """Count streams the client abandoned; the response cancels them, which reaches the upstream call"""
+    try:
+        async for event in events:
+            yield event
+    except asyncio.CancelledError:
+        metrics.client_disconnects.inc(endpoint=endpoint)
+        logger.info(f"🔌 Client disconnected, cancelled {endpoint} response")
+        raise
+
+def admit_generation(endpoint: str) -> Optional[str]:
+    """Admission check for new upstream work: raises 503 under the shed policy, returns the reason to degrade"""
+    reason = admission.check()
+    if reason is None:
+        return None
+    metrics.admission_rejections.inc(reason=reason, policy=admission.policy)
+    logger.warning(f"🚦 Overloaded ({reason}), {admission.policy} for {endpoint}")
+    if admission.policy == SHED:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": str(admission.retry_after_seconds())}
+        )
+    return reason
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+async def run_generation(
+    field_of_study: str,
+    num_ideas: int,
+    thesis_type: str,
+    tone: str,
+    model: str,
+    refresh: bool,
+    endpoint: str = "generate",
+    session_id: Optional[str] = None
+) -> tuple:
+    """Cache lookup, coalesced upstream call and fallback; returns (result, cache_status)"""
+    model = resolve_model(model)
+    combo = normalize_combo(field_of_study, thesis_type, tone)
+    popularity.record(combo)
+    
+    # Serve repeat requests from the result cache unless the user asked for new ideas
+    cache_key = make_cache_key(field_of_study, num_ideas, thesis_type, tone, model)
+    if result_cache:
+        if refresh:
+            result_cache.record_bypass()
+        else:
+            with timed("cache"):
+                cached = await result_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"⚡ Serving cached thesis ideas for '{field_of_study}'")
+                metrics.generations.inc(endpoint=endpoint, source="cache")
+                return cached, "HIT"
+    
+    # "Generate New Ideas" takes the batch prefetched for this session after its last generation
+    if refresh:
+        prefetched = await take_prefetched(session_id, cache_key)
+        if prefetched is not None:
+            logger.info(f"🔮 Serving prefetched thesis ideas for '{field_of_study}'")
+            if result_cache and prefetched["model"] == model:
+                await result_cache.set(cache_key, with_structured(prefetched))
+            await record_history(prefetched, field_of_study, thesis_type, tone)
+            metrics.generations.inc(endpoint=endpoint, source="prefetch")
+            return prefetched, "PREFETCH"
+    
+    # Popular requests, including "regenerate", can be answered from pre-generated ideas
+    pooled = take_pooled(combo, num_ideas, model)
+    if pooled is not None:
+        logger.info(f"🔥 Serving pre-generated thesis ideas for '{field_of_study}'")
+        if result_cache:
+            await result_cache.set(cache_key, with_structured(pooled))
+        await record_history(pooled, field_of_study, thesis_type, tone)
+        metrics.generations.inc(endpoint=endpoint, source="pool")
+        return pooled, "POOL"
+    
+    # Joining an identical in-flight call adds no upstream work; anything else has to be admitted
+    if GROQ_API_KEY and not upstream_flights.joinable(cache_key) and admit_generation(endpoint) is not None:
+        metrics.generations.inc(endpoint=endpoint, source="fallback")
+        with timed("fallback"):
+            return await fallback_to_mock(field_of_study, num_ideas, tone, thesis_type), None
+    
+    # Try Groq API first, sharing the call with identical in-flight requests,
+    # and fall back once the request's latency budget is spent
+    with admission.track():
+        # Inherited by the coalesced call's task, which is created inside upstream_flights.do
+        deadline_token = generation_deadline.set(time.monotonic() + settings.GENERATION_LATENCY_BUDGET)
+        try:
+            with timed("upstream"):
+                result = await asyncio.wait_for(
+                    upstream_flights.do(
+                        cache_key,
+                        lambda: generate_and_cache(cache_key, field_of_study, num_ideas, tone, thesis_type, model)
+                    ),
+                    timeout=settings.GENERATION_LATENCY_BUDGET
+                )
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ Latency budget of {settings.GENERATION_LATENCY_BUDGET}s exhausted")
+            result = {"status": "error", "message": "Latency budget exceeded"}
+        finally:
+            generation_deadline.reset(deadline_token)
+    
+    if result["status"] == "success":
+        logger.info(f"✅ Successfully generated thesis ideas using {result['api_used']}")
+        metrics.generations.inc(endpoint=endpoint, source="groq")
+        return result, "BYPASS" if refresh else "MISS"
+    
+    # If API fails, use enhanced mock system
+    logger.warning("⚠️ Groq API failed, using enhanced fallback")
+    metrics.generations.inc(endpoint=endpoint, source="fallback")
+    with timed("fallback"):
+        return await fallback_to_mock(field_of_study, num_ideas, tone, thesis_type), None
+
 @app.post("/generate")
 async def generate_thesis(
     request: Request,
@@ -335,37 +1098,37 @@ async def generate_thesis(
     num_ideas: int = Form(..., ge=1, le=10),
     thesis_type: str = Form(...),
     tone: str = Form(...),
-    model: str = Form("llama-3.3-70b-versatile")
+    model: str = Form(settings.DEFAULT_MODEL),
+    refresh: bool = Form(False),
+    output_format: str = Form("markdown", alias="format"),
+    session_id: Optional[str] = Form(None, max_length=64)
 ):
     """Generate thesis ideas with comprehensive validation and error handling"""
     client_ip = request.client.host if request.client else "unknown"
     
     try:
         # Input validation
-        valid_thesis_types = ["argumentative", "analytical", "expository", "comparative"]
-        valid_tones = ["academic", "persuasive", "neutral", "critical"]
-        
-        if thesis_type not in valid_thesis_types:
-            raise HTTPException(status_code=400, detail="Invalid thesis type")
-        if tone not in valid_tones:
-            raise HTTPException(status_code=400, detail="Invalid tone")
+        with timed("validation"):
+            validate_thesis_options(thesis_type, tone)
+            validate_output_format(output_format)
         
         logger.info(f"🎯 Generating {num_ideas} thesis ideas for '{field_of_study}' from IP: {client_ip}")
         
-        # Create prompt
-        prompt = get_prompt_template(field_of_study, num_ideas, tone, thesis_type)
-        
-        # Try Groq API first
-        result = await call_groq_api(prompt, num_ideas, tone)
-        
-        if result["status"] == "success":
-            logger.info(f"✅ Successfully generated thesis ideas using {result['api_used']}")
-            return JSONResponse(content=result)
-        
-        # If API fails, use enhanced mock system
-        logger.warning("⚠️ Groq API failed, using enhanced fallback")
-        fallback_result = await fallback_to_mock(field_of_study, num_ideas, tone, thesis_type)
-        return JSONResponse(content=fallback_result)
+        outcome = await unless_disconnected(
+            request,
+            run_generation(field_of_study, num_ideas, thesis_type, tone, model, refresh, session_id=session_id),
+            "generate"
+        )
+        if outcome is None:
+            # Nobody is listening; 499 only shows up in logs and metrics
+            return Response(status_code=499)
+        result, cache_status = outcome
+        # Fallback answers have no cache status; only real generations are worth a speculative follow-up
+        if cache_status:
+            schedule_prefetch(session_id, field_of_study, num_ideas, thesis_type, tone, model)
+        headers = {"X-Cache": cache_status} if cache_status else None
+        with timed("serialization"):
+            return JSONResponse(content=format_result(result, output_format), headers=headers)
         
     except HTTPException:
         raise
@@ -373,9 +1136,380 @@ async def generate_thesis(
         logger.error(f"❌ Generate endpoint error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@app.get("/check-api-status")
-async def check_api_status():
-    """Check the status of available APIs"""
+class BatchItem(BaseModel):
+    """One request spec in a batch; same constraints as the /generate form"""
+    id: Optional[str] = Field(None, max_length=100)
+    field_of_study: str = Field(..., min_length=2, max_length=200)
+    num_ideas: int = Field(..., ge=1, le=10)
+    thesis_type: str
+    tone: str
+    model: str = settings.DEFAULT_MODEL
+    refresh: bool = False
+    format: str = "markdown"
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem] = Field(..., min_length=1, max_length=settings.BATCH_MAX_ITEMS)
+    stream: bool = True
+
+async def run_batch_item(index: int, item: BatchItem, semaphore: asyncio.Semaphore) -> dict:
+    """Run one batch entry under the concurrency cap and report its own status"""
+    async with semaphore:
+        started = time.monotonic()
+        outcome = {"index": index, "id": item.id, "field_of_study": item.field_of_study}
+        try:
+            validate_thesis_options(item.thesis_type, item.tone)
+            validate_output_format(item.format)
+            result, cache_status = await run_generation(
+                item.field_of_study, item.num_ideas, item.thesis_type, item.tone, item.model, item.refresh,
+                endpoint="batch"
+            )
+            outcome.update(format_result(result, item.format))
+            outcome["cache"] = cache_status
+        except HTTPException as e:
+            outcome.update({"status": "error", "message": e.detail})
+        except Exception as e:
+            logger.error(f"❌ Batch item {index} failed: {str(e)}")
+            outcome.update({"status": "error", "message": "Internal server error"})
+        outcome["duration_ms"] = round((time.monotonic() - started) * 1000, 1)
+        return outcome
+
+async def run_batch(items: List[BatchItem]) -> AsyncIterator[dict]:
+    """Fan out batch items concurrently, yielding each result as it completes"""
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+    tasks = [asyncio.ensure_future(run_batch_item(i, item, semaphore)) for i, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+@app.post("/generate/batch")
+async def generate_thesis_batch(request: Request, batch: BatchRequest):
+    """Generate ideas for many request specs in one call (NDJSON stream or JSON)"""
+    client_ip = request.client.host if request.client else "unknown"
+    # Each item is a generation: the request itself paid for one
+    await charge_rate_limit(client_ip, len(batch.items) - 1)
+    logger.info(f"📚 Batch of {len(batch.items)} generation requests from IP: {client_ip}")
+    
+    if not batch.stream:
+        async def collect() -> list:
+            return [outcome async for outcome in run_batch(batch.items)]
+        results = await unless_disconnected(request, collect(), "batch")
+        if results is None:
+            return Response(status_code=499)
+        results.sort(key=lambda outcome: outcome["index"])
+        return JSONResponse(content={
+            "results": results,
+            "succeeded": sum(outcome["status"] == "success" for outcome in results),
+            "failed": sum(outcome["status"] != "success" for outcome in results)
+        })
+    
+    async def ndjson_lines() -> AsyncIterator[str]:
+        async for outcome in run_batch(batch.items):
+            yield json.dumps(outcome) + "\n"
+    
+    return StreamingResponse(cancel_on_disconnect(ndjson_lines(), "batch"), media_type="application/x-ndjson")
+
+async def groq_thesis_events(
+    prompt: str,
+    field_of_study: str,
+    num_ideas: int,
+    tone: str,
+    thesis_type: str,
+    model: str,
+    cache_key: str
+) -> AsyncIterator[tuple]:
+    """Relay Groq tokens as (event, data) pairs, ending with "done" only on success; shared by identical streams"""
+    parts = []
+    # Only the first token is held to the latency budget; once ideas are flowing the page is live
+    deadline = time.monotonic() + settings.GENERATION_LATENCY_BUDGET
+    deadline_token = generation_deadline.set(deadline)
+    try:
+        with admission.track():
+            # Fail over to another model only while nothing has been sent to the browser
+            for candidate in model_router.candidates(model)[:max(1, settings.ROUTER_MAX_ATTEMPTS)]:
+                headers, payload = build_groq_request(prompt, num_ideas, tone, candidate)
+                # Response headers (and Server-Timing) are long gone by the time a slot is granted
+                info = {}
+                try:
+                    async for delta in first_delta_within(stream_groq_api(headers, payload, info), deadline):
+                        if not parts:
+                            yield "meta", {
+                                "api_used": "Groq (Live API)",
+                                "model": candidate,
+                                "queue_ms": round(info.get("queue_wait", 0.0) * 1000, 1)
+                            }
+                        parts.append(delta)
+                        yield None, {"delta": delta}
+                    
+                    result = {
+                        "status": "success",
+                        "ideas": "".join(parts),
+                        "api_used": "Groq (Live API)",
+                        "model": candidate,
+                        "requested_model": model
+                    }
+                    logger.info(f"✅ Groq API stream SUCCESS - Generated {len(result['ideas'])} characters")
+                    with_structured(result)
+                    if candidate != model:
+                        model_router.record_failover(model, candidate)
+                    elif result_cache:
+                        await result_cache.set(cache_key, result)
+                    await record_history(result, field_of_study, thesis_type, tone)
+                    yield "done", {
+                        "status": "success",
+                        "api_used": result["api_used"],
+                        "html": render_ideas_html(result["structured"])
+                    }
+                    return
+                except GroqStreamError as e:
+                    logger.warning(f"⚠️ Groq stream failed on {candidate} ({e})")
+                    if parts or not e.retryable:
+                        return
+                except asyncio.TimeoutError:
+                    logger.warning(f"⏱️ Latency budget of {settings.GENERATION_LATENCY_BUDGET}s exhausted before the first token")
+                    # Still queued is our backlog; a granted call that produced nothing is a hung upstream
+                    if "queue_wait" in info:
+                        groq_breaker.record_failure()
+                        model_router.record(candidate, None, ERROR)
+                    return
+    finally:
+        generation_deadline.reset(deadline_token)
+
+async def stream_thesis_events(
+    prompt: str,
+    field_of_study: str,
+    num_ideas: int,
+    tone: str,
+    thesis_type: str,
+    model: str,
+    cache_key: str,
+    cached: Optional[dict],
+    degraded: bool = False,
+    session_id: Optional[str] = None,
+    cached_source: str = "cache"
+) -> AsyncIterator[str]:
+    """Relay Groq tokens as SSE, falling back to streamed mock ideas"""
+    if cached is not None:
+        metrics.generations.inc(endpoint="stream", source=cached_source)
+        yield sse_event({"api_used": cached.get("api_used"), "cached": True}, "meta")
+        yield sse_event({"delta": cached["ideas"]})
+        yield sse_event({
+            "status": "success",
+            "api_used": cached.get("api_used"),
+            "html": render_ideas_html(with_structured(cached)["structured"])
+        }, "done")
+        schedule_prefetch(session_id, field_of_study, num_ideas, thesis_type, tone, model)
+        return
+    
+    partial = False
+    if GROQ_API_KEY and degraded:
+        logger.warning("🚦 Overloaded, streaming enhanced fallback")
+    elif GROQ_API_KEY:
+        # Identical concurrent streams share one upstream stream; a late joiner gets it replayed from the start
+        shared = stream_flights.subscribe(
+            cache_key,
+            lambda: groq_thesis_events(prompt, field_of_study, num_ideas, tone, thesis_type, model, cache_key)
+        )
+        async with aclosing(shared) as events:
+            async for event, data in events:
+                yield sse_event(data, event)
+                partial = partial or event is None
+                if event == "done":
+                    metrics.generations.inc(endpoint="stream", source="groq")
+                    schedule_prefetch(session_id, field_of_study, num_ideas, thesis_type, tone, model)
+                    return
+        logger.warning("⚠️ Streaming enhanced fallback")
+    else:
+        logger.warning("No GROQ_API_KEY provided")
+    
+    # Discard any partial upstream output before streaming the fallback
+    if partial:
+        yield sse_event({}, "reset")
+    
+    api_used = "Enhanced Mock System (Fallback)"
+    metrics.generations.inc(endpoint="stream", source="fallback")
+    try:
+        yield sse_event({"api_used": api_used}, "meta")
+        mock_parts = []
+        async for delta in stream_mock_ideas(field_of_study, num_ideas, tone, thesis_type):
+            mock_parts.append(delta)
+            yield sse_event({"delta": delta})
+        yield sse_event({
+            "status": "success",
+            "api_used": api_used,
+            "html": render_ideas_html(parse_ideas("".join(mock_parts)))
+        }, "done")
+    except Exception as e:
+        logger.error(f"❌ Mock stream failed: {str(e)}")
+        yield sse_event({"status": "error", "message": "Both API and fallback system failed"}, "error")
+
+async def run_job(job: dict, item: BatchItem) -> None:
+    """Run one queued job and persist its outcome"""
+    job["state"] = RUNNING
+    if not await asyncio.to_thread(job_store.save, job):
+        return
+    started = time.monotonic()
+    try:
+        result, cache_status = await run_generation(
+            item.field_of_study, item.num_ideas, item.thesis_type, item.tone, item.model, item.refresh,
+            endpoint="jobs"
+        )
+        job.update({"state": SUCCEEDED, "result": format_result(result, item.format), "cache": cache_status})
+    except HTTPException as e:
+        job.update({"state": FAILED, "error": e.detail})
+    except Exception as e:
+        logger.error(f"❌ Job {job['job_id']} failed: {str(e)}")
+        job.update({"state": FAILED, "error": "Internal server error"})
+    job["duration_ms"] = round((time.monotonic() - started) * 1000, 1)
+    if not await asyncio.to_thread(job_store.save, job):
+        logger.warning(f"⚠️ Job {job['job_id']} was already reported as {FAILED}, result dropped")
+
+async def load_job(job_id: str) -> dict:
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Request, item: BatchItem):
+    """Queue a generation and return its id immediately; poll /jobs/{id} or subscribe to its events"""
+    validate_thesis_options(item.thesis_type, item.tone)
+    validate_output_format(item.format)
+    if job_queue.pending >= job_queue.max_pending:
+        raise HTTPException(status_code=503, detail="Job queue is full", headers={"Retry-After": "5"})
+    
+    job = await asyncio.to_thread(job_store.create, item.model_dump())
+    if not job_queue.submit(lambda: run_job(job, item), heartbeat=lambda: asyncio.to_thread(job_store.save, job)):
+        job.update({"state": FAILED, "error": "Job queue is full"})
+        await asyncio.to_thread(job_store.save, job)
+        raise HTTPException(status_code=503, detail="Job queue is full", headers={"Retry-After": "5"})
+    client_ip = request.client.host if request.client else "unknown"
+    logger.info(f"📥 Queued job {job['job_id']} for '{item.field_of_study}' from IP: {client_ip}")
+    
+    status_url = f"/jobs/{job['job_id']}"
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "success",
+            "job_id": job["job_id"],
+            "state": job["state"],
+            "status_url": status_url,
+            "events_url": f"{status_url}/events"
+        },
+        headers={"Location": status_url}
+    )
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Current state of a job, with its result once finished"""
+    job = await load_job(job_id)
+    headers = {"Cache-Control": "no-store"}
+    if job["state"] not in FINISHED:
+        headers["Retry-After"] = "1"
+    return JSONResponse(content={"status": "success", **job}, headers=headers)
+
+async def job_events(request: Request, job: dict) -> AsyncIterator[str]:
+    """Emit state changes of a job until it finishes or the client goes away"""
+    last_state = None
+    while True:
+        if job["state"] in FINISHED:
+            yield sse_event(job, event="done")
+            return
+        if job["state"] != last_state:
+            last_state = job["state"]
+            yield sse_event({"job_id": job["job_id"], "state": last_state}, event="status")
+        await asyncio.sleep(settings.JOBS_POLL_INTERVAL)
+        if await request.is_disconnected():
+            return
+        job = await asyncio.to_thread(job_store.get, job["job_id"]) or {**job, "state": FAILED, "error": "Job expired"}
+
+@app.get("/jobs/{job_id}/events")
+async def get_job_events(request: Request, job_id: str):
+    """Server-Sent Events for a job: status changes, then a final "done" event with the result"""
+    job = await load_job(job_id)
+    return StreamingResponse(
+        job_events(request, job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/generate/stream")
+async def generate_thesis_stream(
+    request: Request,
+    field_of_study: str = Form(..., min_length=2, max_length=200),
+    num_ideas: int = Form(..., ge=1, le=10),
+    thesis_type: str = Form(...),
+    tone: str = Form(...),
+    model: str = Form(settings.DEFAULT_MODEL),
+    refresh: bool = Form(False),
+    session_id: Optional[str] = Form(None, max_length=64)
+):
+    """Stream thesis ideas to the browser as Server-Sent Events"""
+    client_ip = request.client.host if request.client else "unknown"
+    with timed("validation"):
+        validate_thesis_options(thesis_type, tone)
+    
+    logger.info(f"🎯 Streaming {num_ideas} thesis ideas for '{field_of_study}' from IP: {client_ip}")
+    
+    model = resolve_model(model)
+    combo = normalize_combo(field_of_study, thesis_type, tone)
+    popularity.record(combo)
+    cache_key = make_cache_key(field_of_study, num_ideas, thesis_type, tone, model)
+    cached = None
+    cache_status = "BYPASS" if refresh else "MISS"
+    if result_cache:
+        if refresh:
+            result_cache.record_bypass()
+        else:
+            with timed("cache"):
+                cached = await result_cache.get(cache_key)
+            if cached is not None:
+                cache_status = "HIT"
+    # "Generate New Ideas" takes the batch prefetched for this session after its last generation
+    if refresh:
+        cached = await take_prefetched(session_id, cache_key)
+        if cached is not None:
+            cache_status = "PREFETCH"
+            if result_cache and cached["model"] == model:
+                await result_cache.set(cache_key, with_structured(cached))
+            await record_history(cached, field_of_study, thesis_type, tone)
+    # Popular requests, including "regenerate", are replayed from pre-generated ideas
+    if cached is None:
+        cached = take_pooled(combo, num_ideas, model)
+        if cached is not None:
+            cache_status = "POOL"
+            logger.info(f"🔥 Streaming pre-generated thesis ideas for '{field_of_study}'")
+            if result_cache:
+                await result_cache.set(cache_key, with_structured(cached))
+            await record_history(cached, field_of_study, thesis_type, tone)
+    
+    # Shedding answers 503 here, before the stream starts; joining an identical stream adds no upstream work
+    degraded = (cached is None and bool(GROQ_API_KEY) and not stream_flights.joinable(cache_key)
+                and admit_generation("stream") is not None)
+    
+    with timed("prompt"):
+        prompt = get_prompt_template(field_of_study, num_ideas, tone, thesis_type)
+    
+    return StreamingResponse(
+        cancel_on_disconnect(
+            stream_thesis_events(
+                prompt, field_of_study, num_ideas, tone, thesis_type, model, cache_key, cached, degraded,
+                session_id=session_id, cached_source={"PREFETCH": "prefetch", "POOL": "pool"}.get(cache_status, "cache")
+            ),
+            "stream"
+        ),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "X-Cache": cache_status
+        }
+    )
+
+async def fetch_api_status() -> tuple:
+    """Probe the Groq API; the observed status is always a valid snapshot"""
     statuses = {}
     
     # Check if API key is provided
@@ -386,40 +1520,122 @@ async def check_api_status():
         # Check Groq API
         try:
             headers = {"Authorization": f"Bearer {GROQ_API_KEY}"}
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(f"{GROQ_BASE_URL}/models", headers=headers)
-                if response.status_code == 200:
-                    models = response.json()
-                    model_count = len(models.get("data", []))
-                    statuses["Groq"] = f"✅ Connected ({model_count} models available)"
-                elif response.status_code == 401:
-                    statuses["Groq"] = "❌ Invalid API Key"
-                else:
-                    statuses["Groq"] = f"❌ Error ({response.status_code})"
+            client = groq_client.get_client()
+            response = await client.get(f"{GROQ_BASE_URL}/models", headers=headers, timeout=10.0)
+            if response.status_code == 200:
+                models = response.json()
+                model_count = len(models.get("data", []))
+                statuses["Groq"] = f"✅ Connected ({model_count} models available)"
+            elif response.status_code == 401:
+                statuses["Groq"] = "❌ Invalid API Key"
+            else:
+                statuses["Groq"] = f"❌ Error ({response.status_code})"
         except Exception as e:
             statuses["Groq"] = f"❌ Failed ({str(e)[:50]})"
+        await record_upstream_health(statuses["Groq"].startswith("✅"), statuses["Groq"])
     
     # Enhanced Mock System is always available
     statuses["Enhanced Mock System"] = "✅ Ready (Intelligent Fallback)"
     
-    return JSONResponse(content={"statuses": statuses})
+    return {"statuses": statuses}, True
 
-@app.get("/models")
-async def get_available_models():
-    """Get available models from Groq"""
+async def fetch_models() -> tuple:
+    """Fetch the model list from Groq; failures never replace a good snapshot"""
     if not GROQ_API_KEY:
-        return {"error": "No GROQ_API_KEY provided", "setup_url": "https://console.groq.com/keys"}
+        return {"error": "No GROQ_API_KEY provided", "setup_url": "https://console.groq.com/keys"}, False
     
     try:
         headers = {"Authorization": f"Bearer {GROQ_API_KEY}"}
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(f"{GROQ_BASE_URL}/models", headers=headers)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"error": f"API returned status {response.status_code}"}
+        client = groq_client.get_client()
+        response = await client.get(f"{GROQ_BASE_URL}/models", headers=headers, timeout=10.0)
+        if response.status_code == 200:
+            return response.json(), True
+        else:
+            return {"error": f"API returned status {response.status_code}"}, False
+    except Exception as e:
+        return {"error": str(e)}, False
+
+# Upstream snapshots served instantly and refreshed in the background
+api_status_cache = SWRCache(
+    "API status", fetch_api_status,
+    ttl=settings.STATUS_CACHE_TTL, max_stale=settings.STATUS_CACHE_TTL * 10
+)
+models_cache = SWRCache(
+    "Model list", fetch_models,
+    ttl=settings.MODELS_CACHE_TTL, max_stale=settings.MODELS_CACHE_MAX_STALE,
+    error_ttl=settings.MODELS_CACHE_ERROR_TTL
+)
+
+@app.get("/check-api-status")
+async def check_api_status():
+    """Check the status of available APIs (cached snapshot)"""
+    snapshot, age = await api_status_cache.get()
+    return JSONResponse(content=snapshot, headers={"Age": str(int(age))})
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Result cache hit/miss counters and in-flight coalescing"""
+    if not result_cache:
+        return {"enabled": False, "singleflight": upstream_flights.stats(), "stream_singleflight": stream_flights.stats()}
+    return {
+        "enabled": True,
+        **result_cache.stats(),
+        "singleflight": upstream_flights.stats(),
+        "stream_singleflight": stream_flights.stats()
+    }
+
+@app.get("/history/search")
+async def search_history(
+    q: str = Query(..., min_length=1, max_length=200),
+    page: int = Query(1, ge=1, le=1000),
+    page_size: int = Query(10, ge=1),
+    thesis_type: Optional[str] = None,
+    tone: Optional[str] = None
+):
+    """Previously generated ideas matching free text, best matches first"""
+    if idea_history is None:
+        raise HTTPException(status_code=503, detail="Idea history is disabled")
+    page_size = min(page_size, settings.HISTORY_MAX_PAGE_SIZE)
+    started = time.perf_counter()
+    try:
+        found = await asyncio.to_thread(
+            idea_history.search, q, limit=page_size, offset=(page - 1) * page_size,
+            thesis_type=thesis_type, tone=tone
+        )
     except Exception as e:
-        return {"error": str(e)}
+        logger.error(f"❌ History search failed: {str(e)}")
+        raise HTTPException(status_code=500, detail="History search failed")
+    took = time.perf_counter() - started
+    metrics.history_search_duration.observe(took)
+    return {
+        "status": "success",
+        "query": q,
+        "page": page,
+        "page_size": page_size,
+        "total": found["total"],
+        "has_more": page * page_size < found["total"],
+        "results": found["results"],
+        "took_ms": round(took * 1000, 2)
+    }
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus text-format metrics for this worker process"""
+    if result_cache:
+        cache = result_cache.stats()
+        for outcome in ("memory_hits", "disk_hits", "misses", "bypasses"):
+            metrics.cache_events.set(cache[outcome], outcome=outcome)
+        metrics.cache_hit_ratio.set(cache["hit_ratio"])
+        metrics.cache_entries.set(cache["memory_entries"])
+    metrics.singleflight_in_flight.set(upstream_flights.stats()["in_flight"] + stream_flights.stats()["in_flight"])
+    metrics.circuit_open.set(0 if groq_breaker.state == "closed" else 1)
+    return Response(content=metrics.registry.render(), media_type=metrics.registry.content_type)
+
+@app.get("/models")
+async def get_available_models():
+    """Get available models from Groq (cached snapshot)"""
+    snapshot, age = await models_cache.get()
+    return JSONResponse(content=snapshot, headers={"Age": str(int(age))})
 
 # Error handlers
 @app.exception_handler(404)
@@ -454,5 +1670,10 @@ if __name__ == "__main__":
     print(f"📊 Environment: {'Production' if os.getenv('VERCEL') else 'Development'}")
     print(f"🔑 API Status: {'Configured' if GROQ_API_KEY else 'Using Fallback'}")
     print(f"🛡️  Rate Limit: {MAX_REQUESTS_PER_MINUTE} requests/minute")
+    print(f"👷 Workers: {settings.WORKERS} (state backend: {state_backend.name})")
     
-    uvicorn.run(app, **config)
\ No newline at end of file
+    if settings.WORKERS > 1:
+        # Workers are separate processes, so uvicorn needs an import string
+        uvicorn.run("main:app", workers=settings.WORKERS, **config)
+    else:
+        uvicorn.run(app, **config)
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+Minimal Prometheus text-format metrics (counters, gauges, histograms)
+"""
+import bisect
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Request and upstream latencies span milliseconds (cache hits) to tens of seconds (70B completions)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class Metric:
+    """Base for a metric family; children are keyed by their label values.
+
+    Updates are plain dict/float operations on the event loop thread, so the
+    request path never takes a lock.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        # Counts are stored per bucket and made cumulative only when rendered
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+class Registry:
+    """Holds metric families and renders the Prometheus exposition format"""
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Optional[Iterable[float]] = None) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets or LATENCY_BUCKETS))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# HTTP layer
+http_requests = registry.counter(
+    "thesis_http_requests_total", "HTTP requests by route template, method and status", ("route", "method", "status")
+)
+http_request_duration = registry.histogram(
+    "thesis_http_request_duration_seconds", "Time to produce the response head, by route template", ("route", "method")
+)
+http_in_flight = registry.gauge("thesis_http_requests_in_flight", "HTTP requests currently being handled")
+rate_limit_rejections = registry.counter(
+    "thesis_rate_limit_rejections_total", "Requests rejected with 429 by the per-IP rate limiter"
+)
+
+# Generation outcomes: source is groq, cache or fallback
+generations = registry.counter(
+    "thesis_generations_total", "Completed generations by where the ideas came from", ("endpoint", "source")
+)
+
+# Upstream Groq calls
+upstream_in_flight = registry.gauge("thesis_upstream_requests_in_flight", "Groq calls currently in progress")
+upstream_duration = registry.histogram(
+    "thesis_upstream_request_duration_seconds", "Groq chat completion latency", ("model",)
+)
+upstream_responses = registry.counter(
+    "thesis_upstream_responses_total", "Groq responses by model and status code (or timeout/connection_error)",
+    ("model", "status")
+)
+upstream_tokens = registry.counter(
+    "thesis_upstream_tokens_total", "Tokens reported in Groq's usage field", ("model", "kind")
+)
+
+# Snapshots refreshed at scrape time from component stats
+cache_events = registry.gauge("thesis_result_cache_events", "Result cache lookups since start by outcome", ("outcome",))
+cache_hit_ratio = registry.gauge("thesis_result_cache_hit_ratio", "Result cache hit ratio since start")
+cache_entries = registry.gauge("thesis_result_cache_memory_entries", "Entries in the in-memory result cache tier")
+singleflight_in_flight = registry.gauge("thesis_singleflight_in_flight", "Distinct upstream generations in flight")
+circuit_open = registry.gauge("thesis_circuit_open", "1 while the Groq circuit breaker is not closed")
+upstream_queue_wait = registry.histogram(
+    "thesis_upstream_queue_wait_seconds", "Time Groq calls waited in the fair-share scheduler"
+)
+admission_rejections = registry.counter(
+    "thesis_admission_rejections_total", "Generations shed or degraded by admission control", ("reason", "policy")
+)
+history_search_duration = registry.histogram(
+    "thesis_history_search_duration_seconds", "Time to answer /history/search from the local full-text index"
+)
+client_disconnects = registry.counter(
+    "thesis_client_disconnects_total", "Generations cancelled because the client went away", ("endpoint",)
+)
+upstream_cancelled = registry.counter(
+    "thesis_upstream_cancelled_total", "Groq calls cancelled before completing because nobody was waiting", ("model",)
+)
+
+def record_usage(model: str, usage: Optional[dict]) -> None:
+    """Count prompt/completion tokens from a Groq usage object"""
+    if not usage:
+        return
+    for kind in ("prompt", "completion"):
+        tokens = usage.get(f"{kind}_tokens")
+        if tokens:
+            upstream_tokens.inc(tokens, model=model, kind=kind)
@@ -0,0 +1,133 @@
+"""
+Latency-aware routing between Groq models
+"""
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Outcomes reported back to the router after each upstream call
+OK = "ok"
+ERROR = "error"
+THROTTLED = "throttled"
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class ModelStats:
+    """EWMA latency and error rate for one model, plus any active throttle window"""
+
+    __slots__ = ("ewma_latency", "ewma_error", "updated_at", "throttled_until", "requests", "errors", "throttles")
+
+    def __init__(self):
+        self.ewma_latency: Optional[float] = None
+        self.ewma_error = 0.0
+        self.updated_at = 0.0
+        self.throttled_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.throttles = 0
+
+class ModelRouter:
+    """Honors the requested model while it is healthy, otherwise fails over to faster models"""
+
+    def __init__(self, failover_models: Iterable[str], alpha: float = 0.3, slow_latency: float = 8.0,
+                 max_error_rate: float = 0.5, throttle_cooldown: float = 30.0):
+        self.failover_models = [model for model in failover_models if model]
+        self.alpha = alpha
+        self.slow_latency = slow_latency
+        self.max_error_rate = max_error_rate
+        self.throttle_cooldown = throttle_cooldown
+        self._stats: Dict[str, ModelStats] = {}
+        self.failovers = 0
+
+    def _get(self, model: str) -> ModelStats:
+        stats = self._stats.get(model)
+        if stats is None:
+            stats = self._stats[model] = ModelStats()
+        return stats
+
+    def _error_rate(self, stats: ModelStats, now: float) -> float:
+        # Decay with a half-life of throttle_cooldown so a model nobody routes to can recover
+        return stats.ewma_error * 0.5 ** ((now - stats.updated_at) / self.throttle_cooldown)
+
+    def is_healthy(self, model: str, now: Optional[float] = None) -> bool:
+        stats = self._stats.get(model)
+        if stats is None:
+            return True
+        now = now if now is not None else time.monotonic()
+        return stats.throttled_until <= now and self._error_rate(stats, now) <= self.max_error_rate
+
+    def _latency(self, model: str) -> float:
+        stats = self._stats.get(model)
+        # Unmeasured models sort as moderately fast so they get probed
+        return stats.ewma_latency if stats and stats.ewma_latency is not None else self.slow_latency / 2
+
+    def candidates(self, requested: str) -> List[str]:
+        """Models to try in order: the requested one first unless throttled, failing or slow"""
+        now = time.monotonic()
+        alternatives = sorted(
+            (model for model in self.failover_models if model != requested and self.is_healthy(model, now)),
+            key=self._latency
+        )
+        requested_ok = self.is_healthy(requested, now)
+        requested_slow = self._latency(requested) > self.slow_latency and any(
+            self._latency(model) < self._latency(requested) for model in alternatives
+        )
+        if requested_ok and not requested_slow:
+            return [requested] + alternatives
+        # Keep the requested model as the last resort before the mock fallback
+        return alternatives + [requested]
+
+    def record(self, model: str, latency: Optional[float], outcome: str,
+               retry_after: Optional[float] = None) -> None:
+        """Update a model's statistics after an upstream call"""
+        stats = self._get(model)
+        now = time.monotonic()
+        stats.requests += 1
+        failed = outcome != OK
+        stats.ewma_error = self.alpha * (1.0 if failed else 0.0) + (1 - self.alpha) * self._error_rate(stats, now)
+        stats.updated_at = now
+        if failed:
+            stats.errors += 1
+        if latency is not None and outcome == OK:
+            stats.ewma_latency = latency if stats.ewma_latency is None else (
+                self.alpha * latency + (1 - self.alpha) * stats.ewma_latency
+            )
+        if outcome == THROTTLED:
+            stats.throttles += 1
+            stats.throttled_until = now + (retry_after or self.throttle_cooldown)
+            logger.warning(f"🚦 Model {model} throttled for {retry_after or self.throttle_cooldown:.0f}s")
+
+    def record_failover(self, requested: str, used: str) -> None:
+        self.failovers += 1
+        logger.info(f"🔀 Routed request for {requested} to {used}")
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "failovers": self.failovers,
+            "models": {
+                model: {
+                    "ewma_latency": round(stats.ewma_latency, 3) if stats.ewma_latency is not None else None,
+                    "ewma_error_rate": round(self._error_rate(stats, now), 3),
+                    "throttled_for": round(max(0.0, stats.throttled_until - now), 1),
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "throttles": stats.throttles
+                }
+                for model, stats in self._stats.items()
+            }
+        }
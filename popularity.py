@@ -0,0 +1,165 @@
+"""
+Bounded request-popularity tracking (count-min sketch + top-k) and the pre-generated idea pool
+"""
+import hashlib
+import logging
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (normalized field of study, thesis type, tone)
+Combo = Tuple[str, str, str]
+
+def normalize_combo(field_of_study: str, thesis_type: str, tone: str) -> Combo:
+    """Same normalization as the result cache key"""
+    return " ".join(field_of_study.lower().split()), thesis_type.strip().lower(), tone.strip().lower()
+
+class CountMinSketch:
+    """Fixed-size frequency estimates; never under-counts, memory independent of distinct keys"""
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self._rows = [[0] * width for _ in range(depth)]
+
+    def _indexes(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8 * self.depth).digest()
+        for row in range(self.depth):
+            yield row, int.from_bytes(digest[row * 8:(row + 1) * 8], "little") % self.width
+
+    def add(self, key: str, count: int = 1) -> int:
+        """Count key and return its new estimate"""
+        estimate = None
+        for row, index in self._indexes(key):
+            self._rows[row][index] += count
+            value = self._rows[row][index]
+            estimate = value if estimate is None else min(estimate, value)
+        return estimate
+
+    def estimate(self, key: str) -> int:
+        return min(self._rows[row][index] for row, index in self._indexes(key))
+
+    def decay(self) -> None:
+        """Halve every counter so popularity follows recent traffic"""
+        for row in self._rows:
+            for i, value in enumerate(row):
+                row[i] = value >> 1
+
+class PopularityTracker:
+    """Count-min sketch over all combos plus the k hottest combos with their estimates"""
+
+    def __init__(self, top_k: int = 20, width: int = 2048, depth: int = 4, decay_interval: float = 3600.0):
+        self.top_k = top_k
+        self.sketch = CountMinSketch(width, depth)
+        self.decay_interval = decay_interval
+        self._top: Dict[Combo, int] = {}
+        self._last_decay = time.monotonic()
+
+    @staticmethod
+    def _key(combo: Combo) -> str:
+        return "\x1f".join(combo)
+
+    def _maybe_decay(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decay < self.decay_interval:
+            return
+        self._last_decay = now
+        self.sketch.decay()
+        self._top = {combo: count >> 1 for combo, count in self._top.items() if count >> 1}
+
+    def record(self, combo: Combo, count: int = 1) -> int:
+        """Count one request for a combo; returns its estimated popularity"""
+        self._maybe_decay()
+        estimate = self.sketch.add(self._key(combo), count)
+        if combo in self._top or len(self._top) < self.top_k:
+            self._top[combo] = estimate
+        else:
+            coldest = min(self._top, key=self._top.get)
+            if estimate > self._top[coldest]:
+                del self._top[coldest]
+                self._top[combo] = estimate
+        return estimate
+
+    def hottest(self, min_count: int = 1) -> List[Tuple[Combo, int]]:
+        """Tracked combos with at least min_count hits, hottest first"""
+        return sorted(
+            ((combo, count) for combo, count in self._top.items() if count >= min_count),
+            key=lambda item: -item[1]
+        )
+
+    def snapshot(self) -> List[list]:
+        """Top-k as JSON-friendly rows, for persisting across restarts"""
+        return [[*combo, count] for combo, count in self.hottest()]
+
+    def restore(self, rows: List[list]) -> None:
+        for field, thesis_type, tone, count in rows:
+            self.record((field, thesis_type, tone), int(count))
+
+class IdeaPool:
+    """Pre-generated results per hot combo; each batch is served once, then refilled in the background"""
+
+    def __init__(self, batches_per_combo: int = 2, ttl: float = 3600.0, max_combos: int = 20):
+        self.batches_per_combo = batches_per_combo
+        self.ttl = ttl
+        self.max_combos = max_combos
+        # combo -> deque of (created, num_ideas, model, result)
+        self._batches: Dict[Combo, deque] = {}
+        self.served = 0
+        self.misses = 0
+        self.generated = 0
+        self.expired = 0
+
+    def _live(self, combo: Combo) -> deque:
+        batches = self._batches.get(combo)
+        if batches is None:
+            return deque()
+        now = time.time()
+        while batches and now - batches[0][0] > self.ttl:
+            batches.popleft()
+            self.expired += 1
+        if not batches:
+            del self._batches[combo]
+        return batches
+
+    def depth(self, combo: Combo) -> int:
+        return len(self._live(combo))
+
+    def needs(self, combo: Combo) -> bool:
+        if combo not in self._batches and len(self._batches) >= self.max_combos:
+            return False
+        return self.depth(combo) < self.batches_per_combo
+
+    def add(self, combo: Combo, num_ideas: int, model: str, result: dict) -> None:
+        self._batches.setdefault(combo, deque()).append((time.time(), num_ideas, model, result))
+        self.generated += 1
+
+    def take(self, combo: Combo, num_ideas: int, model: str) -> Optional[Tuple[int, dict]]:
+        """Pop the oldest batch with at least num_ideas ideas from model; returns (batch_size, result)"""
+        batches = self._live(combo)
+        for i, (_, size, batch_model, result) in enumerate(batches):
+            if size >= num_ideas and batch_model == model:
+                del batches[i]
+                if not batches:
+                    self._batches.pop(combo, None)
+                self.served += 1
+                return size, result
+        self.misses += 1
+        return None
+
+    def drop(self, combos) -> None:
+        """Forget pooled batches for combos that are no longer hot"""
+        for combo in list(self._batches):
+            if combo not in combos:
+                del self._batches[combo]
+
+    def stats(self) -> dict:
+        return {
+            "combos": len(self._batches),
+            "batches": sum(len(batches) for batches in self._batches.values()),
+            "served": self.served,
+            "misses": self.misses,
+            "generated": self.generated,
+            "expired": self.expired
+        }
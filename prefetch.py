@@ -0,0 +1,85 @@
+"""
+Speculative prefetch of the next "Generate New Ideas" batch
+
+After a successful generation the page's next action is often regenerate,
+which resubmits the same request with refresh=true. One alternate batch per
+session is generated in the background and handed to that regenerate, then
+dropped; a regenerate that arrives while it is still running waits for it
+instead of starting a second upstream call.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class PrefetchStore:
+    """At most one prefetched batch per session, keyed by (session, request key); process-local"""
+
+    def __init__(self, ttl: float = 600.0, max_sessions: int = 1000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        # session -> (request key, started, task); least recently prefetched first
+        self._entries: "OrderedDict[str, Tuple[str, float, asyncio.Task]]" = OrderedDict()
+        self.started = 0
+        self.served = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def has(self, session: str, key: str) -> bool:
+        entry = self._entries.get(session)
+        return entry is not None and entry[0] == key and time.monotonic() - entry[1] <= self.ttl
+
+    def start(self, session: str, key: str, fetch: Callable[[], Awaitable[dict]]) -> None:
+        """Prefetch for this session, replacing whatever it had prefetched before"""
+        self._discard(session)
+        while len(self._entries) >= self.max_sessions:
+            self._discard(next(iter(self._entries)))
+        task = asyncio.ensure_future(fetch())
+        # Most prefetches are never taken; their failures must still be retrieved
+        task.add_done_callback(self._log_failure)
+        self._entries[session] = (key, time.monotonic(), task)
+        self.started += 1
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"⚠️ Prefetch failed: {str(task.exception())}")
+
+    def take(self, session: str, key: str) -> Optional[asyncio.Task]:
+        """The prefetch for this request, removed so it is used once; None if there is none"""
+        entry = self._entries.get(session)
+        if entry is None or entry[0] != key or time.monotonic() - entry[1] > self.ttl:
+            self.misses += 1
+            return None
+        del self._entries[session]
+        return entry[2]
+
+    def record_outcome(self, served: bool) -> None:
+        """Whether a taken prefetch produced a batch (it can be over budget or fail)"""
+        if served:
+            self.served += 1
+        else:
+            self.misses += 1
+
+    def _discard(self, session: str) -> None:
+        entry = self._entries.pop(session, None)
+        if entry is not None:
+            entry[2].cancel()
+            self.discarded += 1
+
+    def cancel_all(self) -> None:
+        for session in list(self._entries):
+            self._discard(session)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": len(self._entries),
+            "in_flight": sum(not task.done() for _, _, task in self._entries.values()),
+            "started": self.started,
+            "served": self.served,
+            "misses": self.misses,
+            "discarded": self.discarded
+        }
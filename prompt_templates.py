@@ -1,5 +1,5 @@
 # This file contains templates for prompts used in the thesis generator application
-import random
+from fallback_engine import get_fallback_engine
 
 THESIS_BRAINSTORM_PROMPT = """
 Generate {num_ideas} thesis ideas in the field of {field_of_study}, focusing on {thesis_type} topics. 
@@ -44,121 +44,48 @@ def get_prompt_template(research_field: str, num_ideas: int, tone: str, thesis_t
     """Generate a formatted prompt for the AI API"""
     return f"Generate {num_ideas} {thesis_type} thesis ideas in the field of {research_field}. Use a {tone} tone. Make the ideas specific and innovative. Format each idea with a number and a brief explanation."
 
-def generate_mock_ideas(research_field: str, num_ideas: int, tone: str, thesis_type: str) -> str:
-    """Generate intelligent mock thesis ideas as fallback"""
-    
-    # Enhanced thesis templates by field and type
-    templates = {
-        "machine learning": {
-            "argumentative": [
-                "Federated Learning Privacy-Preservation is Essential for Healthcare AI Adoption",
-                "Explainable AI Should Be Mandatory for Financial Decision-Making Systems",
-                "Quantum Machine Learning Will Revolutionize Drug Discovery Processes"
-            ],
-            "analytical": [
-                "Decomposing the Impact of Bias in Facial Recognition Systems Across Demographics",
-                "Analyzing the Convergence Properties of Neural Architecture Search Algorithms",
-                "Examining the Trade-offs Between Model Accuracy and Computational Efficiency in Edge AI"
-            ],
-            "expository": [
-                "Understanding the Mathematical Foundations of Transformer Architecture",
-                "Exploring the Evolution of Reinforcement Learning from Q-Learning to Deep RL",
-                "Illuminating the Role of Attention Mechanisms in Natural Language Processing"
-            ],
-            "comparative": [
-                "Comparing Supervised vs. Unsupervised Learning Approaches for Anomaly Detection",
-                "Contrasting Classical Optimization with Evolutionary Algorithms in Neural Network Training",
-                "Evaluating Centralized vs. Decentralized Learning in Multi-Agent Systems"
-            ]
-        },
-        "computer science": {
-            "argumentative": [
-                "Blockchain Technology is Overhyped and Unsuitable for Most Enterprise Applications",
-                "Open Source Software Development Models Produce Higher Quality Code Than Proprietary Methods",
-                "Quantum Computing Will Make Current Cryptographic Standards Obsolete Within a Decade"
-            ],
-            "analytical": [
-                "Analyzing the Scalability Bottlenecks in Distributed Database Systems",
-                "Examining the Security Vulnerabilities in Internet of Things (IoT) Networks",
-                "Decomposing the Performance Trade-offs in Microservices Architecture"
-            ],
-            "expository": [
-                "Understanding the Principles of Distributed Consensus Algorithms",
-                "Exploring the Evolution of Programming Paradigms from Procedural to Functional",
-                "Illuminating the Role of Compilers in Modern Software Development"
-            ],
-            "comparative": [
-                "Comparing SQL vs. NoSQL Database Performance in Big Data Applications",
-                "Contrasting Agile vs. Waterfall Methodologies in Large-Scale Software Projects",
-                "Evaluating Cloud vs. Edge Computing for Real-Time Data Processing"
-            ]
-        },
-        "cybersecurity": {
-            "argumentative": [
-                "Zero Trust Architecture is the Only Viable Security Model for Modern Enterprises",
-                "Biometric Authentication Systems Create More Security Risks Than They Solve",
-                "Artificial Intelligence in Cybersecurity Will Replace Human Security Analysts"
-            ],
-            "analytical": [
-                "Analyzing the Attack Vectors in 5G Network Infrastructure",
-                "Examining the Effectiveness of Machine Learning in Malware Detection",
-                "Decomposing the Root Causes of Data Breaches in Healthcare Organizations"
-            ],
-            "expository": [
-                "Understanding the Technical Mechanisms of Advanced Persistent Threats",
-                "Exploring the Cryptographic Principles Behind Secure Communication Protocols",
-                "Illuminating the Role of Social Engineering in Modern Cyber Attacks"
-            ],
-            "comparative": [
-                "Comparing Signature-Based vs. Behavior-Based Intrusion Detection Systems",
-                "Contrasting Public Key vs. Symmetric Key Cryptography for Different Use Cases",
-                "Evaluating Network-Based vs. Host-Based Security Monitoring Approaches"
-            ]
-        }
-    }
-    
-    # Methodology templates
-    methodologies = [
-        "Literature review, empirical analysis, and case study methodology",
-        "Mixed-methods approach combining quantitative analysis and qualitative interviews",
-        "Experimental design with control groups and statistical validation",
-        "Systematic literature review and meta-analysis of existing research",
-        "Prototype development and comparative performance evaluation",
-        "Survey research and statistical modeling techniques"
-    ]
-    
-    # Contribution templates
-    contributions = [
-        "providing new theoretical frameworks for understanding complex systems",
-        "developing novel algorithms with improved efficiency and accuracy",
-        "establishing best practices for industry implementation",
-        "bridging the gap between theoretical research and practical applications",
-        "offering comprehensive solutions to persistent challenges in the field",
-        "advancing the state-of-the-art through innovative methodological approaches"
+# Distinct angles handed to parallel chunks so they do not propose the same ideas
+CHUNK_ANGLES = [
+    "theoretical foundations and conceptual frameworks",
+    "applied systems, tools and real-world deployments",
+    "social, ethical, legal and policy dimensions",
+    "methodology, measurement and evaluation",
+    "emerging and interdisciplinary research directions"
+]
+
+def get_chunk_prompt(research_field: str, num_ideas: int, tone: str, thesis_type: str,
+                     chunk_index: int, chunk_count: int, total_ideas: int) -> str:
+    """Prompt for one slice of a larger request, steered to its own angle to avoid duplicates"""
+    angle = CHUNK_ANGLES[chunk_index % len(CHUNK_ANGLES)]
+    other_angles = [
+        CHUNK_ANGLES[i % len(CHUNK_ANGLES)] for i in range(chunk_count) if i != chunk_index
     ]
-    
-    # Get appropriate templates
-    field_key = research_field.lower()
-    if field_key not in templates:
-        field_key = "computer science"  # Default fallback
-    
-    type_key = thesis_type.lower()
-    if type_key not in templates[field_key]:
-        type_key = "argumentative"  # Default fallback
-    
-    ideas = templates[field_key][type_key]
-    
-    # Generate the specified number of ideas
-    result = ""
-    for i in range(min(num_ideas, len(ideas))):
-        idea = ideas[i]
-        methodology = random.choice(methodologies)
-        contribution = random.choice(contributions)
-        
-        result += f"\n**Thesis Idea {i+1}: {idea}**\n\n"
-        result += f"**Research Overview:** This {thesis_type} thesis addresses a critical challenge in {research_field} by examining the theoretical foundations and practical implications of the proposed research question. The study will investigate current methodologies, identify gaps in existing literature, and propose innovative solutions that advance both academic understanding and industry applications.\n\n"
-        result += f"**Methodology:** {methodology}. The research will employ rigorous data collection techniques, statistical analysis, and validation through peer review and expert consultation.\n\n"
-        result += f"**Expected Contributions:** This research will contribute to {research_field} by {contribution}. The findings will have significant implications for both researchers and practitioners in the field.\n\n"
-        result += "---\n"
-    
-    return result
\ No newline at end of file
+    avoid = f" Other advisors are covering {'; '.join(other_angles)}, so do not propose ideas on those." if other_angles else ""
+    return (
+        f"Generate {num_ideas} {thesis_type} thesis ideas in the field of {research_field}, "
+        f"as part {chunk_index + 1} of {chunk_count} of a set of {total_ideas} distinct ideas. "
+        f"Focus only on {angle}.{avoid} Use a {tone} tone. Make the ideas specific and innovative. "
+        f"Format each idea with a number and a brief explanation."
+    )
+
+def get_system_prompt(num_ideas: int, tone: str) -> str:
+    """System prompt that frames the model as a thesis advisor"""
+    return f"""You are an expert academic researcher and thesis advisor. Generate {num_ideas} detailed, innovative thesis ideas based on the given prompt. 
+
+For each thesis idea, provide:
+1. A clear, compelling title
+2. A brief research overview (2-3 sentences)
+3. Suggested methodology
+4. Expected contributions to the field
+
+Use a {tone} tone and ensure each idea is:
+- Specific and innovative
+- Academically rigorous
+- Feasible as a research project
+- Relevant to current academic discourse
+
+Format each idea clearly with numbers and clear sections."""
+
+def generate_mock_ideas(research_field: str, num_ideas: int, tone: str, thesis_type: str) -> str:
+    """Generate intelligent mock thesis ideas as fallback (retrieved from the indexed idea corpus)"""
+    return get_fallback_engine().generate(research_field, num_ideas, tone, thesis_type)
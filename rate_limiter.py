@@ -0,0 +1,109 @@
+"""
+Constant-time, memory-bounded per-client rate limiting (token bucket)
+"""
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from state_backend import StateBackend
+
+# Routes that never count against a client's budget
+EXEMPT_PREFIXES = ("/static/", "/health", "/metrics")
+
+# Routes that trigger upstream generation and pay the full cost
+GENERATION_PREFIXES = ("/generate", "/jobs")
+
+def route_cost(method: str, path: str, light_cost: float) -> Optional[float]:
+    """Token cost of a request, or None when the route is exempt"""
+    if path.startswith(EXEMPT_PREFIXES) or path == "/favicon.ico":
+        return None
+    if method == "POST" and path.startswith(GENERATION_PREFIXES):
+        return 1.0
+    return light_cost
+
+class TokenBucketLimiter:
+    """Per-key token buckets kept in LRU order so idle keys are evicted in O(1) amortized time"""
+
+    shared = False
+
+    def __init__(self, rate_per_minute: int, burst: Optional[int] = None,
+                 idle_ttl: float = 300.0, max_keys: int = 100000):
+        self.capacity = float(burst or rate_per_minute)
+        self.refill_per_second = max(rate_per_minute, 1) / 60.0
+        self.idle_ttl = idle_ttl
+        self.max_keys = max_keys
+        # key -> [tokens, last_seen]; least recently seen first
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self.rejections = 0
+        self.evictions = 0
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while buckets:
+            key, bucket = next(iter(buckets.items()))
+            if now - bucket[1] < self.idle_ttl and len(buckets) <= self.max_keys:
+                break
+            buckets.popitem(last=False)
+            self.evictions += 1
+
+    def check(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """Consume tokens for a request; returns (allowed, retry_after_seconds)"""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [self.capacity, now]
+            self._buckets[key] = bucket
+        else:
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.refill_per_second)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+
+        self._evict(now)
+
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return True, 0.0
+
+        self.rejections += 1
+        return False, (cost - bucket[0]) / self.refill_per_second
+
+    def allow(self, key: str, cost: float = 1.0) -> bool:
+        return self.check(key, cost)[0]
+
+    def stats(self) -> dict:
+        return {
+            "tracked_keys": len(self._buckets),
+            "rejections": self.rejections,
+            "evictions": self.evictions,
+            "capacity": self.capacity,
+            "refill_per_second": round(self.refill_per_second, 4)
+        }
+
+class SharedTokenBucketLimiter:
+    """Token buckets kept in a state backend so all worker processes share one budget"""
+
+    shared = True
+
+    def __init__(self, backend: StateBackend, rate_per_minute: int, burst: Optional[int] = None):
+        self.backend = backend
+        self.capacity = float(burst or rate_per_minute)
+        self.refill_per_second = max(rate_per_minute, 1) / 60.0
+        self.rejections = 0
+
+    def check(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """Consume tokens for a request; blocking, call from a worker thread"""
+        allowed, retry_after = self.backend.take_tokens(key, cost, self.capacity, self.refill_per_second)
+        if not allowed:
+            self.rejections += 1
+        return allowed, retry_after
+
+    def allow(self, key: str, cost: float = 1.0) -> bool:
+        return self.check(key, cost)[0]
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "rejections": self.rejections,
+            "capacity": self.capacity,
+            "refill_per_second": round(self.refill_per_second, 4)
+        }
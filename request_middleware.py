@@ -0,0 +1,117 @@
+"""
+Pure ASGI middleware for rate limiting, security headers, request metrics and Server-Timing
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import metrics
+from upstream_scheduler import current_client
+
+logger = logging.getLogger(__name__)
+
+CONTENT_SECURITY_POLICY = (
+    "default-src 'self'; "
+    "style-src 'self' 'unsafe-inline' https://cdnjs.cloudflare.com https://fonts.googleapis.com; "
+    "font-src 'self' https://fonts.gstatic.com; "
+    "script-src 'self' 'unsafe-inline'; "
+    "img-src 'self' data:; "
+    "connect-src 'self' https://api.groq.com;"
+)
+
+# Encoded once; appended to every response as-is
+SECURITY_HEADERS = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    (b"content-security-policy", CONTENT_SECURITY_POLICY.encode("latin-1"))
+]
+
+RATE_LIMITED_BODY = json.dumps({"error": "Rate limit exceeded. Please try again later."}).encode("utf-8")
+
+# Phase name -> seconds spent, for the request being handled in this context
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("server_timing", default=None)
+
+@contextmanager
+def timed(phase: str):
+    """Add the duration of the block to the current request's Server-Timing phase"""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - started
+
+def server_timing_header(timings: Dict[str, float], total: float) -> bytes:
+    parts = [f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in timings.items()]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts).encode("latin-1")
+
+RateLimitCheck = Callable[[str, str, str], Awaitable[Tuple[bool, float]]]
+
+class SecurityTimingMiddleware:
+    """Rate limit, then add the precomputed security headers, X-Process-Time and Server-Timing"""
+
+    def __init__(self, app, check_rate_limit: RateLimitCheck):
+        self.app = app
+        self.check_rate_limit = check_rate_limit
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        token = _timings.set(timings)
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+        # Upstream calls made for this request queue under the client's fair share
+        client_token = current_client.set(client_ip)
+        status_code = 500
+        metrics.http_in_flight.inc()
+
+        async def send_with_headers(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                total = time.perf_counter() - started
+                headers = list(message.get("headers", []))
+                headers.extend(SECURITY_HEADERS)
+                headers.append((b"x-process-time", str(total).encode("latin-1")))
+                headers.append((b"server-timing", server_timing_header(timings, total)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            with timed("ratelimit"):
+                allowed, retry_after = await self.check_rate_limit(client_ip, scope["method"], scope["path"])
+            if allowed:
+                await self.app(scope, receive, send_with_headers)
+            else:
+                logger.warning(f"Rate limit exceeded for IP: {client_ip}")
+                metrics.rate_limit_rejections.inc()
+                await send_with_headers({
+                    "type": "http.response.start",
+                    "status": 429,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(RATE_LIMITED_BODY)).encode("latin-1")),
+                        (b"retry-after", str(max(1, int(retry_after + 0.999))).encode("latin-1"))
+                    ]
+                })
+                await send({"type": "http.response.body", "body": RATE_LIMITED_BODY})
+        finally:
+            _timings.reset(token)
+            current_client.reset(client_token)
+            metrics.http_in_flight.dec()
+            # The router records the matched route in the scope; raw paths would make label cardinality unbounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            metrics.http_requests.inc(route=route, method=scope["method"], status=status_code)
+            metrics.http_request_duration.observe(time.perf_counter() - started, route=route, method=scope["method"])
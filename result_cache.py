@@ -0,0 +1,111 @@
+"""
+Two-tier result cache for thesis generation (memory LRU + shared state backend)
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from state_backend import StateBackend
+
+logger = logging.getLogger(__name__)
+
+def make_cache_key(field_of_study: str, num_ideas: int, thesis_type: str, tone: str, model: str) -> str:
+    """Build a stable key from the normalized request parameters"""
+    normalized = [
+        " ".join(field_of_study.lower().split()),
+        int(num_ideas),
+        thesis_type.strip().lower(),
+        tone.strip().lower(),
+        model.strip().lower()
+    ]
+    raw = json.dumps(normalized, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """Bounded in-memory LRU with TTL in front of a persistent state backend (SQLite)"""
+
+    namespace = "results"
+
+    def __init__(self, max_entries: int, ttl: int, store: Optional[StateBackend] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.store = store
+        self._memory: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+
+        # Counters
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    # Memory tier
+    def _memory_get(self, key: str) -> Optional[dict]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        created, value = entry
+        if time.time() - created > self.ttl:
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_set(self, key: str, value: dict, created: float) -> None:
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[dict]:
+        """Look up a result, promoting persistent-tier hits into memory"""
+        value = self._memory_get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+
+        if self.store is not None:
+            try:
+                entry = await asyncio.to_thread(self.store.get, self.namespace, key)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Result cache read failed: {str(e)}")
+                entry = None
+            if entry is not None:
+                created, value = entry
+                self._memory_set(key, value, created)
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: dict) -> None:
+        """Store a result in both tiers"""
+        self._memory_set(key, value, time.time())
+        if self.store is not None:
+            try:
+                await asyncio.to_thread(self.store.set, self.namespace, key, value, self.ttl)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Result cache write failed: {str(e)}")
+
+    def record_bypass(self) -> None:
+        self.bypasses += 1
+
+    def stats(self) -> dict:
+        """Hit/miss counters and tier sizes"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "hit_ratio": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "persistent_backend": self.store.name if self.store is not None else None
+        }
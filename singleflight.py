@@ -0,0 +1,150 @@
+"""
+Single-flight coalescing of identical in-flight upstream calls and streams
+"""
+import asyncio
+import functools
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+class _Call:
+    """One shared upstream task and the number of requests waiting on it"""
+    __slots__ = ("task", "waiters", "abandoned")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+        self.abandoned = False
+
+class SingleFlight:
+    """Run at most one call per key; concurrent callers share its result or error"""
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None or call.abandoned:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(functools.partial(self._forget, key, call))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            # shield: one waiter being cancelled must not cancel the shared task
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            # The last waiter leaving cancels the upstream work nobody will read
+            if call.waiters == 1 and not call.task.done():
+                call.abandoned = True
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def joinable(self, key: str) -> bool:
+        """Whether a call for key is already in flight (joining it costs no upstream work)"""
+        call = self._calls.get(key)
+        return call is not None and not call.abandoned
+
+    def _forget(self, key: str, call: _Call, task: asyncio.Task) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Mark the exception retrieved when every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "started": self.started,
+            "coalesced": self.coalesced
+        }
+
+class _Broadcast:
+    """One shared producer, everything it has emitted so far and the number of subscribers following it"""
+    __slots__ = ("task", "items", "changed", "subscribers", "abandoned")
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.items: List = []
+        self.changed = asyncio.Event()
+        self.subscribers = 0
+        self.abandoned = False
+
+    def notify(self) -> None:
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+class StreamFlight:
+    """Run at most one stream per key; every subscriber gets all of its items, replayed from the start"""
+
+    def __init__(self):
+        self._streams: Dict[str, _Broadcast] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def subscribe(self, key: str, fn: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        broadcast = self._streams.get(key)
+        if broadcast is None or broadcast.abandoned:
+            broadcast = _Broadcast()
+            broadcast.task = asyncio.ensure_future(self._produce(broadcast, fn))
+            self._streams[key] = broadcast
+            broadcast.task.add_done_callback(functools.partial(self._forget, key, broadcast))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        broadcast.subscribers += 1
+        sent = 0
+        try:
+            while True:
+                if sent < len(broadcast.items):
+                    sent += 1
+                    yield broadcast.items[sent - 1]
+                elif broadcast.task.done():
+                    break
+                else:
+                    await broadcast.changed.wait()
+            if broadcast.task.cancelled():
+                raise asyncio.CancelledError()
+            if broadcast.task.exception() is not None:
+                raise broadcast.task.exception()
+        finally:
+            broadcast.subscribers -= 1
+            # The last subscriber leaving cancels the upstream stream nobody will read
+            if broadcast.subscribers == 0 and not broadcast.task.done():
+                broadcast.abandoned = True
+                broadcast.task.cancel()
+
+    @staticmethod
+    async def _produce(broadcast: _Broadcast, fn: Callable[[], AsyncIterator[T]]) -> None:
+        try:
+            async for item in fn():
+                broadcast.items.append(item)
+                broadcast.notify()
+        finally:
+            broadcast.notify()
+
+    def joinable(self, key: str) -> bool:
+        """Whether a stream for key is already in flight (joining it costs no upstream work)"""
+        broadcast = self._streams.get(key)
+        return broadcast is not None and not broadcast.abandoned
+
+    def _forget(self, key: str, broadcast: _Broadcast, task: asyncio.Task) -> None:
+        if self._streams.get(key) is broadcast:
+            del self._streams[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._streams),
+            "started": self.started,
+            "coalesced": self.coalesced
+        }
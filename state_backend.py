@@ -0,0 +1,180 @@
+"""
+Pluggable backends for state shared between worker processes
+
+MemoryStateBackend keeps everything in the current process (single worker).
+SQLiteStateBackend keeps it in a local SQLite file in WAL mode, so every
+uvicorn worker on the box sees the same rate-limit buckets, cached results
+and upstream health without an external service.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class StateBackend:
+    """Interface: a namespaced key/value store with TTL plus atomic token buckets"""
+
+    name = "base"
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[float, Any]]:
+        """Return (created, value) or None when missing or expired"""
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def take_tokens(self, key: str, cost: float, capacity: float, refill_per_second: float) -> Tuple[bool, float]:
+        """Atomically refill and consume a token bucket; returns (allowed, retry_after_seconds)"""
+        raise NotImplementedError
+
+    def prune(self) -> None:
+        """Drop expired entries and idle buckets"""
+
+    def close(self) -> None:
+        pass
+
+class MemoryStateBackend(StateBackend):
+    """Process-local state (only correct with a single worker)"""
+
+    name = "memory"
+
+    def __init__(self, bucket_idle_ttl: float = 300.0):
+        self._kv: Dict[Tuple[str, str], Tuple[float, float, Any]] = {}
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.bucket_idle_ttl = bucket_idle_ttl
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[float, Any]]:
+        entry = self._kv.get((namespace, key))
+        if entry is None:
+            return None
+        created, expires, value = entry
+        if time.time() > expires:
+            self._kv.pop((namespace, key), None)
+            return None
+        return created, value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._kv[(namespace, key)] = (now, now + ttl, value)
+            self._writes += 1
+            if self._writes % 200 == 0:
+                self._prune_locked(now)
+
+    def take_tokens(self, key: str, cost: float, capacity: float, refill_per_second: float) -> Tuple[bool, float]:
+        now = time.time()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = capacity if bucket is None else min(capacity, bucket[0] + (now - bucket[1]) * refill_per_second)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = [tokens, now]
+            self._writes += 1
+            if self._writes % 200 == 0:
+                self._prune_locked(now)
+        return allowed, 0.0 if allowed else (cost - tokens) / refill_per_second
+
+    def _prune_locked(self, now: float) -> None:
+        self._kv = {k: v for k, v in self._kv.items() if v[1] >= now}
+        self._buckets = {k: b for k, b in self._buckets.items() if now - b[1] < self.bucket_idle_ttl}
+
+    def prune(self) -> None:
+        with self._lock:
+            self._prune_locked(time.time())
+
+class SQLiteStateBackend(StateBackend):
+    """State in a local SQLite file shared by all worker processes"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, bucket_idle_ttl: float = 300.0):
+        self.path = path
+        self.bucket_idle_ttl = bucket_idle_ttl
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "created REAL NOT NULL, expires REAL NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created FROM kv WHERE namespace = ? AND key = ? AND expires >= ?",
+                (namespace, key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        return row[1], json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        payload = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, created, expires) VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, payload, now, now + ttl)
+            )
+            self._writes += 1
+            if self._writes % 200 == 0:
+                self._prune_locked(now)
+
+    def take_tokens(self, key: str, cost: float, capacity: float, refill_per_second: float) -> Tuple[bool, float]:
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front so workers cannot interleave
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * refill_per_second)
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                self._db.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                    (key, tokens, now)
+                )
+                self._writes += 1
+                if self._writes % 200 == 0:
+                    self._prune_locked(now)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return allowed, 0.0 if allowed else (cost - tokens) / refill_per_second
+
+    def _prune_locked(self, now: float) -> None:
+        self._db.execute("DELETE FROM kv WHERE expires < ?", (now,))
+        self._db.execute("DELETE FROM buckets WHERE updated < ?", (now - self.bucket_idle_ttl,))
+
+    def prune(self) -> None:
+        with self._lock:
+            self._prune_locked(time.time())
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+def create_state_backend(kind: str, path: str, bucket_idle_ttl: float = 300.0) -> StateBackend:
+    """Build the configured backend, falling back to process memory if SQLite is unusable"""
+    if kind == "sqlite":
+        try:
+            return SQLiteStateBackend(path, bucket_idle_ttl)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ SQLite state backend unavailable ({path}): {str(e)}, using memory")
+    return MemoryStateBackend(bucket_idle_ttl)
@@ -0,0 +1,236 @@
+"""
+In-memory static asset cache with precompressed variants and content-hash ETags
+"""
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Mapping, Optional, Tuple
+
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # Optional: brotli variants are skipped when the package is missing
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    ".css": "text/css; charset=utf-8",
+    ".js": "application/javascript; charset=utf-8",
+    ".html": "text/html; charset=utf-8",
+    ".json": "application/json",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".svg": "image/svg+xml",
+    ".ico": "image/x-icon",
+    ".woff2": "font/woff2"
+}
+
+COMPRESSIBLE_PREFIXES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+# Smallest body worth compressing; below this the headers cost more than they save
+MIN_COMPRESS_SIZE = 256
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+class StaticAsset:
+    """One file held in memory with its encoded variants"""
+
+    __slots__ = ("rel_path", "content_type", "digest", "last_modified", "mtime", "variants")
+
+    def __init__(self, rel_path: str, body: bytes, mtime: float):
+        self.rel_path = rel_path
+        extension = os.path.splitext(rel_path)[1].lower()
+        self.content_type = (
+            CONTENT_TYPES.get(extension)
+            or mimetypes.guess_type(rel_path)[0]
+            or "application/octet-stream"
+        )
+        self.digest = hashlib.sha256(body).hexdigest()
+        self.mtime = int(mtime)
+        self.last_modified = formatdate(self.mtime, usegmt=True)
+        # encoding -> (body, etag)
+        self.variants: Dict[str, Tuple[bytes, str]] = {"identity": (body, f'"{self.digest[:32]}"')}
+
+        if len(body) >= MIN_COMPRESS_SIZE and self.content_type.startswith(COMPRESSIBLE_PREFIXES):
+            gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(gzipped) < len(body):
+                self.variants["gzip"] = (gzipped, f'"{self.digest[:32]}-gzip"')
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    self.variants["br"] = (compressed, f'"{self.digest[:32]}-br"')
+
+    @property
+    def fingerprint(self) -> str:
+        return self.digest[:12]
+
+    @property
+    def fingerprinted_path(self) -> str:
+        root, extension = os.path.splitext(self.rel_path)
+        return f"{root}.{self.fingerprint}{extension}"
+
+def choose_encoding(accept_encoding: str, available) -> str:
+    """Pick the best available content coding from an Accept-Encoding header"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+
+    for encoding in ("br", "gzip"):
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if encoding in available and q > 0:
+            return encoding
+    return "identity"
+
+def is_not_modified(asset: StaticAsset, headers: Mapping[str, str]) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since"""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Any variant's tag matches: the representations share one content hash
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return any(tag.strip('"').split("-")[0] == asset.digest[:32] for tag in tags)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return asset.mtime <= int(parsedate_to_datetime(if_modified_since).timestamp())
+        except (TypeError, ValueError):
+            return False
+    return False
+
+class StaticAssetCache:
+    """Loads every file under a directory once and serves it from memory"""
+
+    def __init__(self, directory: str, max_age: int = 86400):
+        self.directory = directory
+        self.max_age = max_age
+        self.assets: Dict[str, StaticAsset] = {}
+        self.fingerprinted: Dict[str, StaticAsset] = {}
+        self.load()
+
+    def load(self) -> None:
+        """(Re)read the directory and precompute encoded variants"""
+        assets = {}
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.startswith("."):
+                    continue
+                full_path = os.path.join(root, name)
+                rel_path = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+                try:
+                    with open(full_path, "rb") as f:
+                        body = f.read()
+                    assets[rel_path] = StaticAsset(rel_path, body, os.path.getmtime(full_path))
+                except OSError as e:
+                    logger.error(f"Error loading static file {rel_path}: {str(e)}")
+
+        self.assets = assets
+        self.fingerprinted = {asset.fingerprinted_path: asset for asset in assets.values()}
+        total = sum(len(asset.variants["identity"][0]) for asset in assets.values())
+        logger.info(f"📦 Loaded {len(assets)} static assets ({total} bytes) into memory")
+
+    def url_for(self, rel_path: str) -> str:
+        """Fingerprinted, immutable URL for a static file (plain URL if unknown)"""
+        rel_path = rel_path.lstrip("/")
+        asset = self.assets.get(rel_path)
+        if asset is None:
+            return f"/static/{rel_path}"
+        return f"/static/{asset.fingerprinted_path}"
+
+    def lookup(self, rel_path: str) -> Optional[Tuple[StaticAsset, bool]]:
+        """Find an asset by plain or fingerprinted path; returns (asset, immutable)"""
+        asset = self.fingerprinted.get(rel_path)
+        if asset is not None:
+            return asset, True
+        asset = self.assets.get(rel_path)
+        if asset is not None:
+            return asset, False
+        return None
+
+    def respond(self, asset: StaticAsset, headers: Mapping[str, str], immutable: bool) -> Response:
+        """Build a 200 or 304 response for the client's preferred encoding"""
+        cache_control = IMMUTABLE_CACHE_CONTROL if immutable else f"public, max-age={self.max_age}"
+        return asset_response(asset, headers, cache_control)
+
+def asset_response(asset: StaticAsset, headers: Mapping[str, str], cache_control: str) -> Response:
+    """A 200 with the client's preferred encoding, or a 304 when its validator still matches"""
+    encoding = choose_encoding(headers.get("accept-encoding", ""), asset.variants)
+    body, etag = asset.variants[encoding]
+
+    response_headers = {
+        "Cache-Control": cache_control,
+        "ETag": etag,
+        "Last-Modified": asset.last_modified,
+        "Vary": "Accept-Encoding"
+    }
+
+    if is_not_modified(asset, headers):
+        return Response(status_code=304, headers=response_headers)
+
+    if encoding != "identity":
+        response_headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=asset.content_type, headers=response_headers)
+
+class PrerenderedPage:
+    """A template whose output is the same for every request, rendered once into an in-memory asset"""
+
+    def __init__(self, env, name: str, path: str, check_interval: float = 1.0):
+        self.env = env
+        self.name = name
+        self.path = path
+        self.check_interval = check_interval
+        self.asset: Optional[StaticAsset] = None
+        self.renders = 0
+        self._mtime: Optional[float] = None
+        self._checked = 0.0
+        try:
+            self.render()
+        except Exception as e:
+            logger.error(f"Error prerendering {name}: {str(e)}")
+
+    def render(self) -> StaticAsset:
+        """Render the template and precompute its encoded variants"""
+        mtime = os.path.getmtime(self.path)
+        body = self.env.get_template(self.name).render().encode("utf-8")
+        self.asset = StaticAsset(self.name, body, mtime)
+        self._mtime = mtime
+        self._checked = time.monotonic()
+        self.renders += 1
+        sizes = ", ".join(f"{encoding} {len(variant[0])}" for encoding, variant in self.asset.variants.items())
+        logger.info(f"📄 Prerendered {self.name} ({sizes} bytes)")
+        return self.asset
+
+    def current(self) -> StaticAsset:
+        """The rendered page, re-rendered when the template file has changed (checked at most once per interval)"""
+        if self.asset is None:
+            return self.render()
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            self._checked = now
+            try:
+                changed = os.path.getmtime(self.path) != self._mtime
+            except OSError:
+                changed = False
+            if changed:
+                return self.render()
+        return self.asset
@@ -0,0 +1,77 @@
+"""
+Single-value TTL cache with stale-while-revalidate refresh
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class SWRCache:
+    """Serve a snapshot instantly; refresh it in the background once older than ttl.
+
+    The loader returns (value, ok). Failed loads are kept only for error_ttl and
+    never replace a good snapshot, which keeps being served until max_stale.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Awaitable[Tuple[Any, bool]]],
+                 ttl: float, max_stale: float, error_ttl: float = 15.0):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.error_ttl = error_ttl
+        self._value: Any = None
+        self._ok = False
+        self._fetched_at = 0.0
+        self._attempted_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.failures = 0
+
+    def _age(self) -> float:
+        return time.time() - self._fetched_at
+
+    async def _load(self) -> None:
+        self._attempted_at = time.time()
+        try:
+            value, ok = await self.loader()
+        except Exception as e:
+            logger.warning(f"⚠️ {self.name} refresh failed: {str(e)}")
+            value, ok = {"error": str(e)}, False
+
+        self.refreshes += 1
+        if ok:
+            self._value, self._ok, self._fetched_at = value, True, time.time()
+        else:
+            self.failures += 1
+            # Keep serving the last good snapshot; only record the error when there is none
+            if not self._ok or self._age() > self.max_stale:
+                self._value, self._ok, self._fetched_at = value, False, time.time()
+
+    def refresh_in_background(self) -> asyncio.Task:
+        """Start a refresh unless one is already running"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._load())
+        return self._refresh_task
+
+    def peek(self) -> Any:
+        """Last good snapshot, without triggering a load (None if there is none)"""
+        return self._value if self._ok else None
+
+    async def get(self) -> Tuple[Any, float]:
+        """Return (snapshot, age_seconds), loading synchronously only when nothing usable is cached"""
+        age = self._age()
+        fresh_for = self.ttl if self._ok else self.error_ttl
+
+        if self._value is None or (self._ok and age > self.max_stale) or (not self._ok and age > fresh_for):
+            # shield: a client disconnect must not cancel the refresh other callers share
+            await asyncio.shield(self.refresh_in_background())
+            return self._value, self._age()
+
+        # After a failed refresh, wait error_ttl before trying the upstream again
+        last_attempt_failed = self._attempted_at > self._fetched_at
+        if age > fresh_for and (not last_attempt_failed or time.time() - self._attempted_at > self.error_ttl):
+            self.refresh_in_background()
+        return self._value, age
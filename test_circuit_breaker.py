@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the Groq circuit breaker and its half-open probe
+"""
+import time
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+def opened_breaker(recovery_timeout: float = 0.05) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=recovery_timeout)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+def half_open_breaker() -> CircuitBreaker:
+    breaker = opened_breaker()
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    return breaker
+
+def test_opens_after_consecutive_failures_and_short_circuits():
+    breaker = opened_breaker(recovery_timeout=60)
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    assert breaker.stats()["short_circuited"] == 1
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker("test", failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+def test_half_open_allows_a_single_probe():
+    breaker = half_open_breaker()
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+def test_cancelled_probe_is_released():
+    breaker = half_open_breaker()
+    assert breaker.allow_request()
+    breaker.record_cancelled()
+    # The next caller gets the probe instead of waiting out another recovery timeout
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+
+def test_cancelled_outside_half_open_changes_nothing():
+    breaker = CircuitBreaker("test", failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_cancelled()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+def test_probe_outcome_closes_or_reopens():
+    breaker = half_open_breaker()
+    breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+    breaker = half_open_breaker()
+    breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.stats()["times_opened"] == 2
+
+def test_lost_probe_does_not_wedge_the_breaker():
+    breaker = half_open_breaker()
+    assert breaker.allow_request()
+    # The probe never reports back; after another recovery timeout a new one is allowed
+    time.sleep(0.06)
+    assert breaker.allow_request()
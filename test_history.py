@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the idea history and its FTS5 search
+"""
+import time
+
+import pytest
+
+from history import IdeaHistory, build_match_query, create_idea_history
+
+IDEAS = [
+    {"title": "Federated Learning for Rural Clinics", "overview": "Privacy-preserving diagnosis models.",
+     "methodology": "Simulation study.", "contributions": "A deployment guide."},
+    {"title": "Soil Microbiomes and Drought", "overview": "How microbes respond to drought and near-drought stress.",
+     "methodology": "Field sampling.", "contributions": "Resilience indicators."}
+]
+
+@pytest.fixture
+def history(tmp_path):
+    store = IdeaHistory(str(tmp_path / "history.sqlite3"))
+    store.add("Computer Science", "analytical", "academic", "m", IDEAS[:1])
+    store.add("Biology", "argumentative", "neutral", "m", IDEAS[1:])
+    yield store
+    store.close()
+
+def titles(result: dict) -> list:
+    return [record["title"] for record in result["results"]]
+
+def test_match_query_quotes_every_term():
+    assert build_match_query("Federated learn") == '"federated" "learn"*'
+    assert build_match_query("  ") == ""
+    assert build_match_query('"') == ""
+
+@pytest.mark.parametrize("query", [
+    'federated "learning',
+    '"federated learning"',
+    "federated AND OR learning",
+    "NEAR(federated learning)",
+    "title: federated",
+    "federated* -learning ^rural",
+    "federated'); DROP TABLE ideas; --"
+])
+def test_operator_text_is_searched_literally(history, query):
+    # FTS5 syntax in the query must neither raise nor act as an operator
+    result = history.search(query)
+    assert result["total"] <= 1
+    assert history.count() == 2
+
+def test_operators_are_words(history):
+    # "and" and "near" are matched as plain words, not as FTS5 operators
+    assert titles(history.search("microbiomes and drought")) == ["Soil Microbiomes and Drought"]
+    assert titles(history.search("near drought")) == ["Soil Microbiomes and Drought"]
+    assert history.search("federated OR drought")["total"] == 0
+
+def test_prefix_stemming_and_filters(history):
+    assert titles(history.search("federated learn")) == ["Federated Learning for Rural Clinics"]
+    assert titles(history.search("microbe")) == ["Soil Microbiomes and Drought"]
+    assert history.search("drought", thesis_type="analytical")["total"] == 0
+    assert history.search("drought", tone="neutral")["total"] == 1
+
+def test_title_match_outranks_body_match(tmp_path):
+    store = IdeaHistory(str(tmp_path / "history.sqlite3"))
+    store.add("Biology", "analytical", "academic", "m", [
+        {"title": "Wetland Carbon", "overview": "Drought effects on peat."},
+        {"title": "Drought Forecasting", "overview": "Seasonal models."}
+    ])
+    assert titles(store.search("drought")) == ["Drought Forecasting", "Wetland Carbon"]
+    store.close()
+
+def test_repeat_is_stored_once(history):
+    assert history.add("Computer Science", "analytical", "academic", "m", IDEAS[:1]) == 1
+    assert history.count() == 2
+
+def test_paging(history):
+    page = history.search("drought", limit=1, offset=1)
+    assert page["total"] == 1
+    assert page["results"] == []
+
+def test_prune_by_count_keeps_the_newest(tmp_path):
+    store = IdeaHistory(str(tmp_path / "history.sqlite3"), max_entries=2)
+    for number in range(4):
+        store.add("Biology", "analytical", "academic", "m", [{"title": f"Idea {number}", "overview": "x"}])
+        time.sleep(0.001)
+    store.prune()
+    assert store.count() == 2
+    assert sorted(titles(store.search("idea"))) == ["Idea 2", "Idea 3"]
+    store.close()
+
+def test_prune_by_age_also_cleans_the_index(tmp_path):
+    store = IdeaHistory(str(tmp_path / "history.sqlite3"), max_age=60)
+    store.add("Biology", "analytical", "academic", "m", IDEAS[1:])
+    store._db.execute("UPDATE ideas SET created = created - 120")
+    store.prune()
+    assert store.count() == 0
+    assert store.search("drought")["total"] == 0
+    store.close()
+
+def test_prune_runs_automatically_after_enough_writes(tmp_path):
+    store = IdeaHistory(str(tmp_path / "history.sqlite3"), max_entries=3, prune_every=5)
+    for number in range(5):
+        store.add("Biology", "analytical", "academic", "m", [{"title": f"Idea {number}", "overview": "x"}])
+    assert store.count() == 3
+    store.close()
+
+def test_unusable_path_disables_history(tmp_path):
+    assert create_idea_history(str(tmp_path / "missing" / "history.sqlite3"), 10, 60) is None
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for parsing and rendering generated thesis idea text
+"""
+from idea_parser import merge_idea_chunks, parse_ideas, render_ideas_html, split_ideas, take_ideas
+
+NUMBERED = """Here are two ideas:
+
+1. **Federated Learning for Rural Clinics**
+**Research Overview:** Privacy-preserving models.
+**Methodology:** Simulation study.
+1. Collect data
+2. Train models
+**Expected Contributions:** A deployment guide.
+
+2. **Soil Microbiomes and Drought**
+Overview - How microbes respond to drought.
+Methodology - Field sampling.
+"""
+
+def test_numbered_ideas_are_split_and_parsed():
+    ideas = parse_ideas(NUMBERED)
+    assert [idea["title"] for idea in ideas] == [
+        "Federated Learning for Rural Clinics", "Soil Microbiomes and Drought"
+    ]
+    assert ideas[0]["overview"] == "Privacy-preserving models."
+    assert ideas[0]["contributions"] == "A deployment guide."
+    assert ideas[1]["methodology"] == "Field sampling."
+
+def test_nested_numbered_list_stays_inside_its_idea():
+    ideas = parse_ideas(NUMBERED)
+    assert len(ideas) == 2
+    assert "Collect data" in ideas[0]["methodology"]
+    assert "Train models" in ideas[0]["methodology"]
+
+def test_header_variants():
+    text = "### Thesis Idea 1: Quantum Error Correction\nOverview: Codes.\n\n**Idea 2:** Topological Qubits\nOverview: Anyons."
+    assert [idea["title"] for idea in parse_ideas(text)] == ["Quantum Error Correction", "Topological Qubits"]
+
+def test_title_on_its_own_line():
+    ideas = parse_ideas("1.\nCoral Reef Acoustics\nOverview: Listening to reefs.")
+    assert ideas[0]["title"] == "Coral Reef Acoustics"
+    assert ideas[0]["overview"] == "Listening to reefs."
+
+def test_text_without_headers_is_one_untitled_idea():
+    ideas = parse_ideas("Just some prose about **urban heat islands**.")
+    assert ideas == [{"title": "", "overview": "Just some prose about urban heat islands."}]
+
+def test_empty_and_malformed_input():
+    assert parse_ideas("") == []
+    assert parse_ideas("   \n\n  ") == []
+    # Out-of-sequence numbers are not idea headers
+    assert len(parse_ideas("3. **Orphan**\nOverview: x.")) == 1
+    # Unterminated bold and a dangling label must not raise
+    ideas = parse_ideas("1. **Unclosed title\nMethodology:")
+    assert ideas[0]["title"] == "Unclosed title"
+
+def test_merge_renumbers_chunks():
+    merged = merge_idea_chunks(["1. **A**\nx", "1. **B**\ny\n\n2. **C**\nz"])
+    assert [idea["title"] for idea in parse_ideas(merged)] == ["A", "B", "C"]
+    assert "3. **C**" in merged
+
+def test_take_ideas_trims_and_renumbers():
+    assert len(split_ideas(take_ideas(NUMBERED, 1))) == 1
+    assert take_ideas(NUMBERED, 1).startswith("1. **Federated")
+
+def test_render_escapes_html():
+    rendered = render_ideas_html([{"title": "<script>alert(1)</script>", "overview": "a & b"}])
+    assert "<script>" not in rendered
+    assert "&lt;script&gt;" in rendered
+    assert "a &amp; b" in rendered
+    assert rendered.startswith('<div class="thesis-idea"><h3>Thesis Idea 1: ')
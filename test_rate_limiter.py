@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the token-bucket rate limiters
+"""
+import time
+
+import pytest
+
+from rate_limiter import SharedTokenBucketLimiter, TokenBucketLimiter, route_cost
+from state_backend import MemoryStateBackend, SQLiteStateBackend
+
+class FakeClock:
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    # The memory limiter uses the monotonic clock, the shared backends wall-clock time
+    monkeypatch.setattr(time, "monotonic", fake)
+    monkeypatch.setattr(time, "time", fake)
+    yield fake
+
+def test_burst_then_reject_with_retry_after(clock):
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=3)
+    assert [limiter.allow("ip") for _ in range(3)] == [True] * 3
+    allowed, retry_after = limiter.check("ip")
+    assert not allowed
+    assert retry_after == pytest.approx(1.0)
+    assert limiter.rejections == 1
+
+def test_refill_is_proportional_and_capped(clock):
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=3)
+    for _ in range(3):
+        limiter.check("ip")
+    clock.now += 1.5
+    assert limiter.allow("ip")
+    assert not limiter.allow("ip")
+    # A long idle period refills only up to the burst
+    clock.now += 120
+    assert [limiter.allow("ip") for _ in range(4)] == [True, True, True, False]
+
+def test_clients_have_separate_buckets(clock):
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=1)
+    assert limiter.allow("a")
+    assert limiter.allow("b")
+    assert not limiter.allow("a")
+
+def test_cost_above_balance_is_rejected_without_spending(clock):
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=3)
+    assert not limiter.allow("ip", cost=4)
+    assert limiter.allow("ip", cost=3)
+
+def test_idle_and_excess_keys_are_evicted(clock):
+    limiter = TokenBucketLimiter(rate_per_minute=60, idle_ttl=10, max_keys=2)
+    for key in ("a", "b", "c"):
+        limiter.check(key)
+    assert limiter.stats()["tracked_keys"] == 2
+    clock.now += 11
+    limiter.check("d")
+    assert limiter.stats()["tracked_keys"] == 1
+    assert limiter.evictions == 3
+
+@pytest.mark.parametrize("make_backend", [
+    lambda tmp_path: MemoryStateBackend(),
+    lambda tmp_path: SQLiteStateBackend(str(tmp_path / "state.sqlite3"))
+], ids=["memory", "sqlite"])
+def test_shared_limiter_burst_and_refill(clock, tmp_path, make_backend):
+    backend = make_backend(tmp_path)
+    first = SharedTokenBucketLimiter(backend, rate_per_minute=60, burst=2)
+    second = SharedTokenBucketLimiter(backend, rate_per_minute=60, burst=2)
+    # Two workers draw from the same bucket
+    assert first.allow("ip")
+    assert second.allow("ip")
+    allowed, retry_after = first.check("ip")
+    assert not allowed
+    assert retry_after == pytest.approx(1.0)
+    clock.now += 1.0
+    assert second.allow("ip")
+
+def test_route_cost():
+    assert route_cost("GET", "/static/app.css", 0.2) is None
+    assert route_cost("GET", "/health/ready", 0.2) is None
+    assert route_cost("POST", "/generate/stream", 0.2) == 1.0
+    assert route_cost("POST", "/jobs", 0.2) == 1.0
+    assert route_cost("GET", "/jobs/abc", 0.2) == 0.2
+    assert route_cost("GET", "/", 0.2) == 0.2
+
+def test_real_clock_refills():
+    limiter = TokenBucketLimiter(rate_per_minute=6000, burst=1)
+    assert limiter.allow("ip")
+    assert not limiter.allow("ip")
+    time.sleep(0.02)
+    assert limiter.allow("ip")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for single-flight coalescing of upstream calls and streams
+"""
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight, StreamFlight
+
+def test_concurrent_callers_share_one_call():
+    async def run():
+        flights = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "ideas"
+
+        results = await asyncio.gather(*(flights.do("key", work) for _ in range(3)))
+        return results, calls, flights.stats()
+
+    results, calls, stats = asyncio.run(run())
+    assert results == ["ideas"] * 3
+    assert calls == 1
+    assert stats == {"in_flight": 0, "started": 1, "coalesced": 2}
+
+def test_leader_cancelled_while_followers_wait():
+    async def run():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "ideas"
+
+        leader = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return await follower, leader.cancelled()
+
+    result, leader_cancelled = asyncio.run(run())
+    assert leader_cancelled
+    assert result == "ideas"
+
+def test_last_waiter_leaving_cancels_the_call():
+    async def run():
+        flights = SingleFlight()
+        started = asyncio.Event()
+        cancelled = False
+
+        async def work():
+            nonlocal cancelled
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+
+        waiter = asyncio.ensure_future(flights.do("key", work))
+        await started.wait()
+        waiter.cancel()
+        await asyncio.sleep(0.01)
+        return cancelled, flights.joinable("key")
+
+    cancelled, joinable = asyncio.run(run())
+    assert cancelled
+    assert not joinable
+
+def test_errors_reach_every_waiter():
+    async def run():
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream broke")
+
+        return await asyncio.gather(*(flights.do("key", work) for _ in range(2)), return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert all(isinstance(error, ValueError) for error in errors)
+
+async def _ticks(count: int, calls: list):
+    calls.append(1)
+    for i in range(count):
+        await asyncio.sleep(0.01)
+        yield i
+
+async def _collect(flights: StreamFlight, calls: list, delay: float = 0.0) -> list:
+    await asyncio.sleep(delay)
+    return [item async for item in flights.subscribe("key", lambda: _ticks(5, calls))]
+
+def test_late_subscriber_gets_the_whole_stream():
+    async def run():
+        flights = StreamFlight()
+        calls = []
+        results = await asyncio.gather(_collect(flights, calls), _collect(flights, calls, delay=0.03))
+        return results, calls, flights.stats()
+
+    results, calls, stats = asyncio.run(run())
+    assert results == [[0, 1, 2, 3, 4]] * 2
+    assert len(calls) == 1
+    assert stats == {"in_flight": 0, "started": 1, "coalesced": 1}
+
+def test_leaving_subscriber_does_not_stop_the_others():
+    async def run():
+        flights = StreamFlight()
+        calls = []
+        first = asyncio.ensure_future(_collect(flights, calls))
+        second = asyncio.ensure_future(_collect(flights, calls))
+        await asyncio.sleep(0.025)
+        first.cancel()
+        return await second, first.cancelled()
+
+    result, first_cancelled = asyncio.run(run())
+    assert first_cancelled
+    assert result == [0, 1, 2, 3, 4]
+
+def test_last_subscriber_leaving_cancels_the_producer():
+    async def run():
+        flights = StreamFlight()
+        calls = []
+        subscriber = asyncio.ensure_future(_collect(flights, calls))
+        await asyncio.sleep(0.025)
+        assert flights.joinable("key")
+        subscriber.cancel()
+        await asyncio.sleep(0.01)
+        return flights.joinable("key"), flights.stats()["in_flight"]
+
+    joinable, in_flight = asyncio.run(run())
+    assert not joinable
+    assert in_flight == 0
+
+def test_producer_error_reaches_subscribers_after_its_items():
+    async def failing():
+        yield "partial"
+        raise ValueError("upstream broke")
+
+    async def run():
+        flights = StreamFlight()
+        received = []
+        with pytest.raises(ValueError):
+            async for item in flights.subscribe("key", failing):
+                received.append(item)
+        return received
+
+    assert asyncio.run(run()) == ["partial"]
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the upstream scheduler: fair ordering and token accounting
+"""
+import asyncio
+
+from upstream_scheduler import UpstreamScheduler
+
+async def _grant_order(scheduler: UpstreamScheduler, calls) -> list:
+    """Queue `calls` (client, cost) behind one held slot and return the order they are granted in"""
+    order = []
+    blocker = await scheduler.acquire("blocker", "m", 1)
+
+    async def call(client: str, cost: float):
+        lease = await scheduler.acquire(client, "m", cost)
+        order.append(client)
+        scheduler.release(lease)
+
+    tasks = [asyncio.ensure_future(call(client, cost)) for client, cost in calls]
+    await asyncio.sleep(0)
+    scheduler.release(blocker)
+    await asyncio.gather(*tasks)
+    return order
+
+def test_heavy_client_does_not_starve_others():
+    async def run():
+        scheduler = UpstreamScheduler(max_concurrency=1)
+        return await _grant_order(scheduler, [("heavy", 100)] * 3 + [("light", 100)])
+
+    order = asyncio.run(run())
+    # "light" queued last but is served right after heavy's first call
+    assert order[:2] == ["heavy", "light"]
+
+def test_weights_scale_the_fair_share():
+    async def run():
+        scheduler = UpstreamScheduler(max_concurrency=1, weights={"gold": 3.0})
+        return await _grant_order(scheduler, [("plain", 100)] * 2 + [("gold", 100)] * 3)
+
+    order = asyncio.run(run())
+    # Three times the weight: gold's calls cost it a third of the virtual time
+    assert order == ["gold", "gold", "plain", "gold", "plain"]
+
+def test_settle_refunds_and_charges_the_token_budget():
+    async def run():
+        scheduler = UpstreamScheduler(tokens_per_minute=1000)
+        lease = await scheduler.acquire("a", "m", 400)
+        scheduler.release(lease)
+        after_reserve = scheduler._budgets["tokens"][2]
+        scheduler.settle(lease, 100)
+        refunded = scheduler._budgets["tokens"][2] - after_reserve
+        scheduler.settle(lease, None)
+        unchanged = scheduler._budgets["tokens"][2] - after_reserve
+        return after_reserve, refunded, unchanged
+
+    after_reserve, refunded, unchanged = asyncio.run(run())
+    assert after_reserve <= 600.1
+    assert abs(refunded - 300) < 1
+    assert abs(unchanged - 300) < 1
+
+def test_settle_moves_the_fair_share_position_back():
+    async def run():
+        scheduler = UpstreamScheduler()
+        lease = await scheduler.acquire("a", "m", 400)
+        scheduler.release(lease)
+        before = scheduler._client_finish["a"]
+        scheduler.settle(lease, 0)
+        return before, scheduler._client_finish["a"], scheduler._virtual_time
+
+    before, after, virtual_time = asyncio.run(run())
+    assert before == 400
+    assert after == max(virtual_time, 0.0)
+
+def test_cancelled_waiter_gives_back_its_place():
+    async def run():
+        scheduler = UpstreamScheduler(max_concurrency=1)
+        blocker = await scheduler.acquire("blocker", "m", 1)
+        finish_before = scheduler._client_finish.get("a", 0.0)
+        waiter = asyncio.ensure_future(scheduler.acquire("a", "m", 500))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+        queued = len(scheduler._waiting)
+        scheduler.release(blocker)
+        return finish_before, scheduler._client_finish["a"], queued
+
+    finish_before, finish_after, queued = asyncio.run(run())
+    assert queued == 0
+    assert finish_after == finish_before
+
+def test_granted_then_cancelled_releases_and_refunds():
+    async def run():
+        scheduler = UpstreamScheduler(max_concurrency=1, tokens_per_minute=1000)
+        blocker = await scheduler.acquire("blocker", "m", 1)
+        waiter = asyncio.ensure_future(scheduler.acquire("a", "m", 500))
+        await asyncio.sleep(0)
+        # The slot is granted and the caller is cancelled before it resumes
+        scheduler.release(blocker)
+        waiter.cancel()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+        scheduler._refill(scheduler._refilled_at)
+        return scheduler._active, scheduler._budgets["tokens"][2]
+
+    active, tokens = asyncio.run(run())
+    assert active == 0
+    # Only the blocker's single token stays reserved
+    assert tokens > 998
@@ -0,0 +1,239 @@
+"""
+Fair-share scheduler for upstream Groq calls
+
+Every completion waits for a slot: a global concurrency limit plus
+requests-per-minute and tokens-per-minute budgets. Waiting calls are
+ordered by weighted fair queuing over clients (start-time fair queuing on
+estimated tokens), so one heavy user cannot starve the rest. Every call is
+settled with its actual usage, or nothing when it failed. A 429 pauses only
+the throttled model until its Retry-After (plus jitter) has passed.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Who the current upstream work is for (client IP, "pregen", ...); set per request by the middleware
+current_client: ContextVar[str] = ContextVar("upstream_client", default="internal")
+
+class Lease:
+    """A granted slot; `waited` is the time spent queued"""
+
+    __slots__ = ("client", "model", "cost", "waited")
+
+    def __init__(self, client: str, model: str, cost: float, waited: float):
+        self.client = client
+        self.model = model
+        self.cost = cost
+        self.waited = waited
+
+class _Waiter:
+    __slots__ = ("tag", "seq", "client", "model", "cost", "start", "enqueued", "future")
+
+    def __init__(self, tag: float, seq: int, client: str, model: str, cost: float, start: float,
+                 future: asyncio.Future):
+        self.tag = tag
+        self.seq = seq
+        self.client = client
+        self.model = model
+        self.cost = cost
+        self.start = start
+        self.enqueued = time.monotonic()
+        self.future = future
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.tag, self.seq) < (other.tag, other.seq)
+
+class UpstreamScheduler:
+    """Admits upstream calls within concurrency, RPM and TPM budgets in weighted fair order"""
+
+    def __init__(self, max_concurrency: int = 8, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 weights: Optional[Dict[str, float]] = None, jitter: float = 0.25, max_clients: int = 10000):
+        self.max_concurrency = max(1, max_concurrency)
+        self.weights = weights or {}
+        self.jitter = jitter
+        self.max_clients = max_clients
+        # Budgets: [capacity, refill per second, available]; capacity 0 disables a budget
+        self._budgets = {
+            "requests": [float(requests_per_minute), requests_per_minute / 60.0, float(requests_per_minute)],
+            "tokens": [float(tokens_per_minute), tokens_per_minute / 60.0, float(tokens_per_minute)]
+        }
+        self._refilled_at = time.monotonic()
+        self._active = 0
+        self._waiting: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._client_finish: Dict[str, float] = {}
+        self._paused: Dict[str, float] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.granted = 0
+        self.queued = 0
+        self.backoffs = 0
+        self.total_wait = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        for budget in self._budgets.values():
+            capacity, rate, available = budget
+            if capacity:
+                budget[2] = min(capacity, available + elapsed * rate)
+
+    def _shortfall(self, cost: float) -> float:
+        """Seconds until both budgets can pay for a call of `cost` tokens (0 = now)"""
+        wait = 0.0
+        for name, (capacity, rate, available) in self._budgets.items():
+            if not capacity:
+                continue
+            # A call larger than the whole budget is admitted once the bucket is full
+            needed = min(1.0 if name == "requests" else cost, capacity)
+            if available < needed:
+                wait = max(wait, (needed - available) / rate)
+        return wait
+
+    def _dispatch(self) -> None:
+        """Grant slots to waiters in fair order while budgets allow"""
+        now = time.monotonic()
+        self._refill(now)
+        retry_in = None
+        while self._waiting and self._active < self.max_concurrency:
+            # Fair order, skipping models that are backing off after a 429
+            ready = None
+            paused = {model: until for model, until in self._paused.items() if until > now}
+            self._paused = paused
+            for waiter in sorted(self._waiting) if paused else self._waiting[:1]:
+                until = paused.get(waiter.model)
+                if until is None:
+                    ready = waiter
+                    break
+                retry_in = until - now if retry_in is None else min(retry_in, until - now)
+            if ready is None:
+                break
+            shortfall = self._shortfall(ready.cost)
+            if shortfall > 0:
+                retry_in = shortfall if retry_in is None else min(retry_in, shortfall)
+                break
+
+            self._waiting.remove(ready)
+            heapq.heapify(self._waiting)
+            for name, budget in self._budgets.items():
+                if budget[0]:
+                    budget[2] -= 1.0 if name == "requests" else ready.cost
+            self._active += 1
+            self._virtual_time = max(self._virtual_time, ready.start)
+            waited = now - ready.enqueued
+            self.granted += 1
+            self.total_wait += waited
+            ready.future.set_result(Lease(ready.client, ready.model, ready.cost, waited))
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if retry_in is not None and self._waiting:
+            self._timer = asyncio.get_running_loop().call_later(max(retry_in, 0.01), self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    async def acquire(self, client: str, model: str, cost: float) -> Lease:
+        """Wait for a slot for an upstream call estimated at `cost` tokens"""
+        weight = self.weights.get(client, 1.0)
+        if len(self._client_finish) > self.max_clients:
+            self._client_finish = {c: f for c, f in self._client_finish.items() if f > self._virtual_time}
+        start = max(self._virtual_time, self._client_finish.get(client, 0.0))
+        finish = start + cost / weight
+        self._client_finish[client] = finish
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = _Waiter(finish, next(self._seq), client, model, cost, start, future)
+        heapq.heappush(self._waiting, waiter)
+        self._dispatch()
+        if not future.done():
+            self.queued += 1
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as the caller gave up: nothing reached Groq, hand the tokens back
+                lease = future.result()
+                self.release(lease)
+                self.settle(lease, 0)
+            elif waiter in self._waiting:
+                self._waiting.remove(waiter)
+                heapq.heapify(self._waiting)
+                # The client's next call should not queue behind work that never ran
+                finish = self._client_finish.get(client)
+                if finish is not None:
+                    self._client_finish[client] = max(self._virtual_time, finish - cost / weight)
+            raise
+
+    def release(self, lease: Lease) -> None:
+        """Free the slot once the upstream call is over"""
+        self._active -= 1
+        self._dispatch()
+
+    def settle(self, lease: Lease, actual_tokens: Optional[float]) -> None:
+        """Refund (or charge) the difference between the estimated and the actual token usage; None keeps the estimate"""
+        if actual_tokens is None:
+            return
+        difference = lease.cost - actual_tokens
+        # The client's fair-share position moves back (or on) by the same amount
+        finish = self._client_finish.get(lease.client)
+        if finish is not None:
+            self._client_finish[lease.client] = max(
+                self._virtual_time, finish - difference / self.weights.get(lease.client, 1.0)
+            )
+        tokens = self._budgets["tokens"]
+        if tokens[0]:
+            tokens[2] = min(tokens[0], tokens[2] + difference)
+        if difference > 0:
+            self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, client: str, model: str, cost: float):
+        """Hold a slot for the duration of one upstream call"""
+        lease = await self.acquire(client, model, cost)
+        try:
+            yield lease
+        finally:
+            self.release(lease)
+
+    def oldest_wait(self) -> float:
+        """Seconds the longest-waiting call has been queued (0 when nobody waits)"""
+        if not self._waiting:
+            return 0.0
+        return time.monotonic() - min(waiter.enqueued for waiter in self._waiting)
+
+    def backoff(self, model: str, retry_after: float) -> float:
+        """Hold calls to a throttled model until Retry-After, plus jitter so waiters do not stampede"""
+        delay = retry_after * random.uniform(1.0, 1.0 + self.jitter)
+        until = time.monotonic() + delay
+        if until > self._paused.get(model, 0.0):
+            self._paused[model] = until
+            self.backoffs += 1
+            logger.warning(f"⏸️ Holding {model} calls for {delay:.1f}s after a 429")
+        return delay
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        self._refill(now)
+        return {
+            "active": self._active,
+            "waiting": len(self._waiting),
+            "max_concurrency": self.max_concurrency,
+            "requests_available": round(self._budgets["requests"][2], 1) if self._budgets["requests"][0] else None,
+            "tokens_available": round(self._budgets["tokens"][2]) if self._budgets["tokens"][0] else None,
+            "paused_models": {model: round(until - now, 1) for model, until in self._paused.items() if until > now},
+            "granted": self.granted,
+            "queued": self.queued,
+            "backoffs": self.backoffs,
+            "avg_wait_ms": round(self.total_wait / self.granted * 1000, 1) if self.granted else 0.0
+        }